@@ -1,6 +1,15 @@
+import sys
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class LogManagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "log_manager"
+
+    def ready(self):
+        from log_manager.backfill import backfill_device_ip
+        post_migrate.connect(backfill_device_ip, sender=self)
+        if 'runserver' in sys.argv:
+            from log_manager.writer import log_writer
+            log_writer.start()
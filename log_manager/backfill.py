@@ -0,0 +1,28 @@
+from log_manager.models import Logs
+
+
+def backfill_device_ip(batch_size: int = 500, **kwargs) -> int:
+    """
+    Sets the device_ip column of the logs saved before it was added.
+
+    Connected to post_migrate, so it runs once after the column is created and
+    is a single indexed query afterwards.
+
+    Parameters:
+        batch_size (int): Number of logs updated per query.
+
+    Returns:
+        int: Number of updated logs.
+    """
+    updated = 0
+    logs = Logs.objects.filter(device_ip__isnull=True).only("id", "request_json")
+    batch = []
+    for log in logs.iterator(chunk_size=batch_size):
+        log.device_ip = Logs.get_device_ip(log.request_json)
+        batch.append(log)
+        if len(batch) == batch_size:
+            updated += Logs.objects.bulk_update(batch, ["device_ip"])
+            batch = []
+    if batch:
+        updated += Logs.objects.bulk_update(batch, ["device_ip"])
+    return updated
@@ -2,7 +2,7 @@ import datetime
 import time
 from functools import wraps
 
-from log_manager.serializers import LogSerializer
+from log_manager.writer import log_writer
 
 
 def log_request(function):
@@ -15,7 +15,7 @@ def log_request(function):
             start = time.time()
             response = function(request, *args, **kwargs)
             data = {
-                "timestamp": str(datetime.datetime.now(tz=datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")),
+                "timestamp": datetime.datetime.now(tz=datetime.timezone.utc),
                 "processing_time": time.time() - start,
                 "status_code": response.status_code,
                 "http_path": request.path,
@@ -31,9 +31,7 @@ def log_request(function):
                         i["status"] = "failed"
                     else:
                         i["status"] = "success"
-                serializer = LogSerializer(data={**data, **i, "http_method": request.method})
-                if serializer.is_valid():
-                    serializer.save()
+            log_writer.write([{**data, **i, "http_method": request.method} for i in responses])
             return response
         else:
             return function(request, *args, **kwargs)
@@ -5,8 +5,9 @@ class Logs(models.Model):
     """
     Model to create log data base
     """
-    timestamp = models.CharField(max_length=64)
+    timestamp = models.DateTimeField()
     request_json = models.JSONField()
+    device_ip = models.CharField(max_length=64, null=True)
     status = models.CharField(max_length=32)
     processing_time = models.CharField(max_length=32)
     status_code = models.IntegerField()
@@ -15,3 +16,31 @@ class Logs(models.Model):
     http_path = models.CharField(max_length=64)
 
     objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["timestamp", "id"]),
+            models.Index(fields=["device_ip", "timestamp", "id"]),
+            models.Index(fields=["http_path", "timestamp", "id"]),
+            models.Index(fields=["status", "timestamp", "id"]),
+        ]
+
+    @staticmethod
+    def get_device_ip(request_json) -> str:
+        """
+        Returns the device IP a request was sent for.
+
+        Parameters:
+            request_json: The request body, a dict or a list of dicts.
+
+        Returns:
+            str: The device IP, or an empty string if the request isn't for a single device.
+        """
+        device_ips = set()
+        for item in request_json if isinstance(request_json, list) else [request_json]:
+            if isinstance(item, dict):
+                for key in ("mgt_ip", "device_ip", "address"):
+                    if isinstance(value := item.get(key), str) and value:
+                        device_ips.add(value)
+                        break
+        return device_ips.pop() if len(device_ips) == 1 else ""
@@ -0,0 +1,55 @@
+import threading
+
+from django.conf import settings
+
+from log_manager.models import Logs
+
+
+class LogRetention:
+    """
+    Keeps the Logs table bounded to LOG_MAX_ROWS rows.
+
+    Saved logs are only counted in memory, once LOG_PRUNE_BATCH_SIZE writes are
+    recorded the rows above the cap are deleted in one batch. Logs saved by the
+    background log writer are therefore pruned on the writer thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+
+    def record_writes(self, count: int = 1):
+        """
+        Records saved logs and triggers pruning once a full batch was written.
+
+        Parameters:
+            count (int): Number of saved log rows.
+        """
+        with self._lock:
+            self._pending_writes += count
+            if self._pending_writes < settings.LOG_PRUNE_BATCH_SIZE:
+                return
+            self._pending_writes = 0
+        self.prune()
+
+    @staticmethod
+    def prune(max_rows: int = None) -> int:
+        """
+        Deletes all the logs older than the newest max_rows logs.
+
+        Parameters:
+            max_rows (int): Number of logs to keep, defaults to LOG_MAX_ROWS.
+
+        Returns:
+            int: Number of deleted logs.
+        """
+        max_rows = settings.LOG_MAX_ROWS if max_rows is None else max_rows
+        cutoff = Logs.objects.order_by("-id").values_list("id", flat=True)[max_rows:max_rows + 1]
+        cutoff_id = next(iter(cutoff), None)
+        if cutoff_id is None:
+            return 0
+        deleted, _ = Logs.objects.filter(id__lte=cutoff_id).delete()
+        return deleted
+
+
+log_retention = LogRetention()
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from log_manager.models import Logs
+from log_manager.retention import log_retention
 
 
 class LogSerializer(serializers.ModelSerializer):
@@ -23,19 +24,14 @@ class LogSerializer(serializers.ModelSerializer):
             "http_path": {'required': True},
         }
 
+    def validate(self, attrs):
+        attrs["device_ip"] = Logs.get_device_ip(attrs.get("request_json"))
+        return attrs
+
     def save(self, **kwargs):
         """
-        This function save and updates logs based on time stamp and requested data.
+        This function saves the log and records the write for log retention.
         """
         super().save()
-        self._read_adjust_rows_length()  # resets rows count to 1000
-        return self
-
-    def _read_adjust_rows_length(self):
-        """
-        function to delete first row if greater than 1000
-        """
-        items = Logs.objects.all()
-        if items.count() > 1000:
-            items.first().delete()  # deleting first row
+        log_retention.record_writes()  # keeps rows count at LOG_MAX_ROWS in batches
         return self
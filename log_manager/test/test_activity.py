@@ -0,0 +1,88 @@
+import datetime
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_celery_results.models import TaskResult
+
+from log_manager.models import Logs
+from log_manager.test.test_common import TestCommon
+
+
+class TestActivity(TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        for i in range(12):
+            Logs.objects.create(
+                timestamp=start + datetime.timedelta(seconds=i),
+                request_json={"index": i},
+                status="success",
+                processing_time=0,
+                status_code=200,
+                response="ok",
+                http_method="PUT",
+                http_path="/stub/path",
+            )
+        for i in range(6):
+            task = TaskResult.objects.create(
+                task_id=f"task_{i}",
+                status="SUCCESS",
+                content_type="application/json",
+                content_encoding="utf-8",
+                result="{}",
+                task_kwargs=str({"http_path": "/discover", "index": i}),
+            )
+            # tasks share timestamps with some of the logs
+            TaskResult.objects.filter(id=task.id).update(date_created=start + datetime.timedelta(seconds=2 * i))
+        return self
+
+    def tearDown(self):
+        TaskResult.objects.all().delete()
+        Logs.objects.all().delete()
+
+    def test_get_logs_honors_size(self):
+        response = self.client.get("/logs/all/1?size=5")
+        assert response.status_code == 200
+        assert len(response.json()) == 5
+        response = self.client.get("/logs/all/4?size=5")
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+        response = self.client.get("/logs/all/5?size=5")
+        assert response.status_code == 204
+
+    def test_invalid_size(self):
+        for size in ("0", "-1", "x"):
+            assert self.client.get(f"/logs/all/1?size={size}").status_code == 400
+            assert self.client.get("/logs/activity", {"size": size}).status_code == 400
+            assert self.client.get("/logs/", {"size": size}).status_code == 400
+
+    def test_activity_cursor_pagination(self):
+        all_activities = self.client.get("/logs/all/1?size=100").json()
+        assert len(all_activities) == 18
+        timestamps = [i["timestamp"] for i in all_activities]
+        assert timestamps == sorted(timestamps, reverse=True)
+
+        pages = []
+        cursor = None
+        while True:
+            params = {"size": 4, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/logs/activity", params)
+            assert response.status_code == 200
+            pages.extend(response.json()["results"])
+            cursor = response.json()["next_cursor"]
+            if not cursor:
+                break
+        assert pages == all_activities
+
+    def test_activity_page_query_count(self):
+        response = self.client.get("/logs/activity", {"size": 4})
+        cursor = response.json()["next_cursor"]
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get("/logs/activity", {"size": 4, "cursor": cursor})
+        assert response.status_code == 200
+        assert len([q for q in ctx.captured_queries if "django_celery_results" in q["sql"] or "log_manager" in q["sql"]]) == 2
+
+    def test_activity_invalid_cursor(self):
+        response = self.client.get("/logs/activity", {"cursor": "invalid"})
+        assert response.status_code == 400
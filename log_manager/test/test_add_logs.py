@@ -8,7 +8,7 @@ class TestAddLogs(TestCommon):
 
     def test_add_logs(self):
         data = {
-            "timestamp": "timestamp",
+            "timestamp": "2024-01-01T10:00:00Z",
             "request_json": {
                 "key": "value"
             },
@@ -18,6 +18,7 @@ class TestAddLogs(TestCommon):
                 "key": "value"
             },
             "http_method": "POST",
+            "http_path": "/stub/path",
             "status_code": 200
         }
         serializer = LogSerializer(data=data)
@@ -28,7 +29,7 @@ class TestAddLogs(TestCommon):
 
     def test_update_logs(self):
         data = {
-            "timestamp": "timestamp",
+            "timestamp": "2024-01-01T10:00:00Z",
             "request_json": {
                 "key": "value"
             },
@@ -38,6 +39,7 @@ class TestAddLogs(TestCommon):
                 "key": "value"
             },
             "http_method": "POST",
+            "http_path": "/stub/path",
             "status_code": 200
         }
         serializer = LogSerializer(data=data)
@@ -49,7 +51,7 @@ class TestAddLogs(TestCommon):
         assert logs_1.status == "processing"
         data["status"] = "failure"
         data["processing_time"] = 10
-        data["timestamp"] = "timestamp_1"
+        data["timestamp"] = "2024-01-01T10:00:01Z"
         serializer = LogSerializer(data=data)
         if serializer.is_valid():
             serializer.save()
@@ -59,7 +61,7 @@ class TestAddLogs(TestCommon):
         assert logs_2.processing_time == '10'
         data["status"] = "success"
         data["processing_time"] = '15'
-        data["timestamp"] = "timestamp_2"
+        data["timestamp"] = "2024-01-01T10:00:02Z"
         serializer = LogSerializer(data=data)
         if serializer.is_valid():
             serializer.save()
@@ -6,7 +6,7 @@ class TestDeleteLogs(TestCommon):
 
     def test_delete_logs(self):
         data = {
-            "timestamp": "timestamp",
+            "timestamp": "2024-01-01T10:00:00Z",
             "request_json": {
                 "key": "value"
             },
@@ -16,6 +16,7 @@ class TestDeleteLogs(TestCommon):
                 "key": "value"
             },
             "http_method": "POST",
+            "http_path": "/stub/path",
             "status_code": 200
         }
         serializer = LogSerializer(data=data)
@@ -26,7 +27,7 @@ class TestDeleteLogs(TestCommon):
             HTTP_AUTHORIZATION=self.tkn
         )
         assert response.status_code == 200
-        assert any([i["timestamp"] == "timestamp" for i in response.json()])
+        assert any([i["timestamp"] == "2024-01-01 10:00:00" for i in response.json()])
         self.client.delete("/logs/delete", HTTP_AUTHORIZATION=self.tkn)
         response_after_delete = self.client.get(
             "/logs/all/1?size=1000",
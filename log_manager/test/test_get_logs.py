@@ -6,7 +6,7 @@ class TestGetLogs(TestCommon):
 
     def test_get_logs(self):
         data = {
-            "timestamp": "timestamp",
+            "timestamp": "2024-01-01T10:00:00Z",
             "request_json": {
                 "key": "value"
             },
@@ -16,6 +16,7 @@ class TestGetLogs(TestCommon):
                 "key": "value"
             },
             "http_method": "POST",
+            "http_path": "/stub/path",
             "status_code": 200
         }
         serializer = LogSerializer(data=data)
@@ -25,13 +26,13 @@ class TestGetLogs(TestCommon):
             "/logs/all/1?size=1000",
             HTTP_AUTHORIZATION=self.tkn
         )
-        assert any([i["timestamp"] == "timestamp" for i in response.json()])
+        assert any([i["timestamp"] == "2024-01-01 10:00:00" for i in response.json()])
 
     def test_get_paginated_logs(self):
         for i in range(3):
             serializer = LogSerializer(
                 data={
-                    "timestamp": f"timestamp_{i}",
+                    "timestamp": f"2024-01-01T10:00:0{i}Z",
                     "request_json": {
                         "key": "value"
                     },
@@ -41,6 +42,7 @@ class TestGetLogs(TestCommon):
                         "key": "value"
                     },
                     "http_method": "POST",
+                    "http_path": "/stub/path",
                     "status_code": 200
                 }
             )
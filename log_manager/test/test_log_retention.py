@@ -0,0 +1,75 @@
+import datetime
+import time
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from log_manager.models import Logs
+from log_manager.retention import log_retention
+from log_manager.serializers import LogSerializer
+from log_manager.test.test_common import TestCommon
+
+
+def save_log(i):
+    serializer = LogSerializer(
+        data={
+            "timestamp": datetime.datetime.now(tz=datetime.timezone.utc),
+            "request_json": {"index": i},
+            "processing_time": 0,
+            "status": "success",
+            "response": {"key": "value"},
+            "http_method": "POST",
+            "http_path": "/stub/path",
+            "status_code": 200
+        }
+    )
+    if serializer.is_valid():
+        serializer.save()
+
+
+@override_settings(LOG_MAX_ROWS=1000, LOG_PRUNE_BATCH_SIZE=100)
+class TestLogRetention(TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        Logs.objects.all().delete()
+        return self
+
+    def test_prune_keeps_newest_logs(self):
+        for i in range(1050):
+            save_log(i)
+        assert Logs.objects.count() <= 1000 + 100
+        log_retention.prune()
+        assert Logs.objects.count() == 1000
+        indexes = {i["index"] for i in Logs.objects.values_list("request_json", flat=True)}
+        assert indexes == set(range(50, 1050))
+
+    @override_settings(LOG_PRUNE_BATCH_SIZE=10 ** 6)
+    def test_write_is_single_insert(self):
+        save_log(0)
+        with CaptureQueriesContext(connection) as ctx:
+            save_log(1)
+        assert len(ctx.captured_queries) == 1
+
+    def test_write_cost_past_cap(self):
+        """
+        Benchmark, writes 3000 logs in rounds of 500 and compares the cost of
+        the rounds before and after the table reaches LOG_MAX_ROWS.
+        """
+        rounds = []
+        for r in range(6):
+            with CaptureQueriesContext(connection) as ctx:
+                start = time.perf_counter()
+                for i in range(500):
+                    save_log(r * 500 + i)
+                elapsed = time.perf_counter() - start
+            rounds.append((elapsed / 500, len(ctx.captured_queries) / 500))
+            print(
+                f"round {r}: rows={Logs.objects.count()} "
+                f"time/write={rounds[-1][0] * 1000:.3f}ms queries/write={rounds[-1][1]:.2f}"
+            )
+        assert Logs.objects.count() <= 1000 + 100
+        # only one batched prune (select cutoff + delete) per 100 writes
+        assert all(queries <= 1.02 for _, queries in rounds)
+        assert rounds[-1][0] < rounds[0][0] * 3
@@ -0,0 +1,80 @@
+import datetime
+import threading
+
+from django.test import override_settings
+
+from log_manager.models import Logs
+from log_manager.test.test_common import TestCommon
+from log_manager.writer import LogWriter
+
+
+def get_log(i):
+    return {
+        "timestamp": datetime.datetime.now(tz=datetime.timezone.utc),
+        "request_json": {"index": i},
+        "processing_time": 0,
+        "status": "success",
+        "response": {"key": "value"},
+        "http_method": "PUT",
+        "http_path": "/stub/path",
+        "status_code": 200
+    }
+
+
+class RecordingLogWriter(LogWriter):
+    """
+    Log writer recording the saved batches instead of writing them to the database.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+        self.blocked = threading.Event()
+        self.blocked.set()
+
+    def save(self, logs):
+        if threading.current_thread().name == "log_writer":
+            self.blocked.wait()
+        self.batches.append(logs)
+        return len(logs)
+
+
+class TestLogWriter(TestCommon):
+
+    def test_sync_write(self):
+        writer = LogWriter()
+        writer.write([get_log(i) for i in range(3)])
+        assert Logs.objects.filter(http_path="/stub/path").count() == 3
+
+    @override_settings(LOG_WRITER_BATCH_SIZE=50)
+    def test_background_write_in_batches(self):
+        writer = RecordingLogWriter()
+        writer.blocked.clear()
+        writer.start()
+        writer.write([get_log(i) for i in range(200)])
+        writer.blocked.set()
+        writer.flush()
+        writer.stop()
+        assert not writer.running
+        assert sum(len(batch) for batch in writer.batches) == 200
+        assert all(len(batch) <= 50 for batch in writer.batches)
+        assert [log["request_json"]["index"] for batch in writer.batches for log in batch] == list(range(200))
+
+    @override_settings(LOG_WRITER_BUFFER_SIZE=10)
+    def test_full_buffer_saves_synchronously(self):
+        writer = RecordingLogWriter()
+        writer.blocked.clear()
+        writer.start()
+        writer.write([get_log(i) for i in range(15)])
+        writer.blocked.set()
+        writer.stop()
+        assert sum(len(batch) for batch in writer.batches) == 15
+
+    def test_stop_flushes_buffer(self):
+        writer = RecordingLogWriter()
+        writer.blocked.clear()
+        writer.start()
+        writer.write([get_log(i) for i in range(20)])
+        writer.blocked.set()
+        writer.stop()
+        assert sum(len(batch) for batch in writer.batches) == 20
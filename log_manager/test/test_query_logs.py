@@ -0,0 +1,86 @@
+import datetime
+
+from log_manager.backfill import backfill_device_ip
+from log_manager.models import Logs
+from log_manager.serializers import LogSerializer
+from log_manager.test.test_common import TestCommon
+
+
+class TestQueryLogs(TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        for i in range(20):
+            serializer = LogSerializer(
+                data={
+                    "timestamp": self.start + datetime.timedelta(minutes=i),
+                    "request_json": {"mgt_ip": f"10.1.1.{i % 2 + 5}", "name": "Vlan1"},
+                    "processing_time": 0,
+                    "status": "success" if i % 4 else "failed",
+                    "response": "ok",
+                    "http_method": "PUT",
+                    "http_path": "/vlan" if i % 3 else "/interfaces",
+                    "status_code": 200
+                }
+            )
+            if serializer.is_valid():
+                serializer.save()
+        return self
+
+    def tearDown(self):
+        Logs.objects.all().delete()
+
+    def test_device_ip_extracted(self):
+        assert Logs.objects.filter(device_ip="10.1.1.5").count() == 10
+        assert Logs.get_device_ip([{"mgt_ip": "10.1.1.5"}, {"mgt_ip": "10.1.1.5"}]) == "10.1.1.5"
+        assert Logs.get_device_ip([{"mgt_ip": "10.1.1.5"}, {"mgt_ip": "10.1.1.6"}]) == ""
+        assert Logs.get_device_ip({"address": "10.1.1.7"}) == "10.1.1.7"
+        assert Logs.get_device_ip({"filename": "ztp.json"}) == ""
+
+    def test_query_by_device_and_time_range(self):
+        response = self.client.get(
+            "/logs/",
+            {
+                "device_ip": "10.1.1.5",
+                "since": (self.start + datetime.timedelta(minutes=4)).isoformat(),
+                "until": (self.start + datetime.timedelta(minutes=11)).isoformat(),
+            }
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [i["request_json"]["mgt_ip"] for i in results] == ["10.1.1.5"] * 4
+        assert [i["timestamp"] for i in results] == [
+            (self.start + datetime.timedelta(minutes=m)).strftime("%Y-%m-%d %H:%M:%S") for m in (10, 8, 6, 4)
+        ]
+
+    def test_query_by_path_and_status_paginated(self):
+        expected = list(
+            Logs.objects.filter(http_path="/vlan", status="success").order_by("-timestamp").values_list("id", flat=True)
+        )
+        ids = []
+        cursor = None
+        while True:
+            params = {"http_path": "/vlan", "status": "success", "size": 3, **({"cursor": cursor} if cursor else {})}
+            response = self.client.get("/logs/", params)
+            assert response.status_code == 200
+            ids.extend(i["id"] for i in response.json()["results"])
+            cursor = response.json()["next_cursor"]
+            if not cursor:
+                break
+        assert ids == expected
+
+    def test_query_uses_index(self):
+        plan = Logs.objects.filter(device_ip="10.1.1.5").order_by("-timestamp", "-id")[:10].explain()
+        assert "INDEX" in plan.upper()
+
+    def test_invalid_time_range(self):
+        response = self.client.get("/logs/", {"since": "yesterday"})
+        assert response.status_code == 400
+        response = self.client.get("/logs/", {"until": "2024-02-30T00:00"})
+        assert response.status_code == 400
+
+    def test_backfill_device_ip(self):
+        Logs.objects.update(device_ip=None)
+        assert backfill_device_ip(batch_size=7) == 20
+        assert Logs.objects.filter(device_ip="10.1.1.6").count() == 10
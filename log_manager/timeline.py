@@ -0,0 +1,163 @@
+import ast
+import base64
+import datetime
+import heapq
+import json
+
+from django.db.models import Q
+from django_celery_results.models import TaskResult
+
+from log_manager.models import Logs
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Rank of each activity source, breaks the ties between a log and a celery task
+# created in the same instant.
+_TASK_RANK = 0
+_LOG_RANK = 1
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(key: tuple) -> str:
+    """
+    Encodes the sort key of the last returned activity into an opaque cursor.
+
+    Parameters:
+        key (tuple): Tuple of timestamp, source rank and id.
+
+    Returns:
+        str: The cursor.
+    """
+    timestamp, rank, row_id = key
+    return base64.urlsafe_b64encode(
+        f"{timestamp.isoformat()}|{rank}|{row_id}".encode()
+    ).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decodes a cursor created by encode_cursor.
+
+    Parameters:
+        cursor (str): The cursor.
+
+    Returns:
+        tuple: Tuple of timestamp, source rank and id.
+
+    Raises:
+        InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        timestamp, rank, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(timestamp), int(rank), int(row_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def get_activities(limit: int, cursor: tuple = None) -> list:
+    """
+    Returns the newest activities, logs and celery tasks merged by creation time.
+
+    Each source is read with an indexed keyset query limited to `limit` rows,
+    so the cost of a page does not depend on the length of the history.
+
+    Parameters:
+        limit (int): Maximum number of activities.
+        cursor (tuple): Sort key of the last activity of the previous page.
+
+    Returns:
+        list: List of (sort key, activity dict) tuples, newest first.
+    """
+    logs = _after(Logs.objects.all(), "timestamp", _LOG_RANK, cursor)
+    tasks = _after(TaskResult.objects.all(), "date_created", _TASK_RANK, cursor)
+    merged = heapq.merge(
+        (((i.timestamp, _LOG_RANK, i.id), i) for i in logs.order_by("-timestamp", "-id")[:limit]),
+        (((i.date_created, _TASK_RANK, i.id), i) for i in tasks.order_by("-date_created", "-id")[:limit]),
+        key=lambda x: x[0],
+        reverse=True,
+    )
+    return [
+        (key, log_to_activity(row) if key[1] == _LOG_RANK else task_to_activity(row))
+        for key, row in list(merged)[:limit]
+    ]
+
+
+def get_logs_page(limit: int, cursor: tuple = None, **filters) -> list:
+    """
+    Returns the newest logs matching the given filters.
+
+    Parameters:
+        limit (int): Maximum number of logs.
+        cursor (tuple): Sort key of the last log of the previous page.
+        filters: Lookups on the indexed Logs columns, for example device_ip,
+            http_path, status, timestamp__gte and timestamp__lte.
+
+    Returns:
+        list: List of (sort key, log dict) tuples, newest first.
+    """
+    logs = _after(Logs.objects.filter(**filters), "timestamp", _LOG_RANK, cursor)
+    return [
+        ((i.timestamp, _LOG_RANK, i.id), log_to_activity(i))
+        for i in logs.order_by("-timestamp", "-id")[:limit]
+    ]
+
+
+def log_to_activity(log: Logs) -> dict:
+    """
+    Converts a log row to an activity dict.
+    """
+    return {
+        "id": log.id,
+        "timestamp": log.timestamp.strftime(TIMESTAMP_FORMAT),
+        "request_json": log.request_json,
+        "device_ip": log.device_ip,
+        "status": log.status,
+        "processing_time": log.processing_time,
+        "status_code": log.status_code,
+        "response": log.response,
+        "http_method": log.http_method,
+        "http_path": log.http_path,
+    }
+
+
+def task_to_activity(result: TaskResult) -> dict:
+    """
+    Converts a celery task result row to an activity dict.
+    """
+    try:
+        task_kwargs = ast.literal_eval(result.task_kwargs.strip('\"')) if result.task_kwargs else {}
+    except ValueError:
+        task_kwargs = {"result": result.task_kwargs}
+    http_path = task_kwargs.pop("http_path", "")
+    return {
+        "status": result.status,
+        "timestamp": result.date_created.strftime(TIMESTAMP_FORMAT),
+        "status_code": 200,
+        "http_method": "PUT",
+        "processing_time": (result.date_done - result.date_created).total_seconds(),
+        "response": json.loads(result.result),
+        "request_json": task_kwargs,
+        "http_path": http_path,
+        "task_id": result.task_id,
+    }
+
+
+def _after(queryset, timestamp_field: str, rank: int, cursor: tuple):
+    """
+    Filters the queryset to the rows sorting after the cursor, in descending
+    (timestamp, rank, id) order.
+    """
+    if cursor is None:
+        return queryset
+    timestamp, cursor_rank, cursor_id = cursor
+    if rank < cursor_rank:
+        return queryset.filter(**{f"{timestamp_field}__lte": timestamp})
+    if rank > cursor_rank:
+        return queryset.filter(**{f"{timestamp_field}__lt": timestamp})
+    return queryset.filter(
+        Q(**{f"{timestamp_field}__lt": timestamp})
+        | Q(**{timestamp_field: timestamp, "id__lt": cursor_id})
+    )
@@ -2,6 +2,8 @@ from django.urls import path
 from log_manager import views
 
 urlpatterns = [
+    path("", views.query_logs, name="query_logs"),
     path("all/<int:page>", views.get_logs, name="logs"),
+    path("activity", views.get_activity, name="activity"),
     path("delete", views.delete_logs, name="delete_logs"),
 ]
@@ -1,9 +1,9 @@
-import ast
 import datetime
-import json
 
 from celery import states
-from django.core.paginator import Paginator, EmptyPage
+from django.core.paginator import EmptyPage
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_aware, make_aware
 from django_celery_results.models import TaskResult
 from rest_framework import status
 from rest_framework.decorators import api_view
@@ -12,45 +12,144 @@ from rest_framework.response import Response
 
 from log_manager.logger import get_backend_logger
 from log_manager.models import Logs
+from log_manager.timeline import get_activities, get_logs_page, decode_cursor, encode_cursor, InvalidCursor
 from orca_backend.celery import cancel_task
+from orca_backend.renderers import list_response
 
 _logger = get_backend_logger()
 
 
+class InvalidSize(ValueError):
+    pass
+
+
+def get_size(request: Request) -> int:
+    """
+    Returns the page size of a request, its `size` query param, 10 by default.
+
+    Raises:
+        InvalidSize: If the size is not a positive integer.
+    """
+    try:
+        size = int(request.query_params.get("size", 10))
+    except ValueError:
+        size = 0
+    if size < 1:
+        raise InvalidSize(f"Invalid size: {request.query_params.get('size')}, expected a positive integer.")
+    return size
+
+
 @api_view(['get'])
 def get_logs(request: Request, **kwargs):
     """
-    function to get logs save logs
+    function to get logs and celery tasks, newest first
 
     Parameters:
     - request: The Django request object.
 
     Returns:
     - If successful, returns a JSON response with logs list and 200 ok status.
+    - If the size is invalid returns a JSON response with 400 status.
     - If fails returns a JSON response with 500 status.
     """
     try:
-        final_result = []
-        query_params = request.query_params
-        items = Logs.objects.all().order_by("-timestamp")
-        paginator = Paginator(items, query_params.get("size", 10))  # sizeof return list
-        logs_result = paginator.page(kwargs["page"])  # page no
-        final_result.extend(logs_result.object_list.values())  # add logs
-        final_result.extend(get_celery_tasks_data())  # add celery task data
-
-        # sort by timestamp
-        final_result.sort(
-            key=lambda x: datetime.datetime.strptime(
-                x["timestamp"], "%Y-%m-%d %H:%M:%S"
-            ),
-            reverse=True
-        )
-        return Response(final_result, status=status.HTTP_200_OK)
+        page = kwargs["page"]
+        size = get_size(request)  # sizeof return list
+        if page < 1:
+            raise EmptyPage("That page number is less than 1")
+        activities = get_activities(limit=page * size)[(page - 1) * size:]
+        if not activities and page > 1:
+            raise EmptyPage("That page contains no results")
+        if not activities:
+            return Response([], status=status.HTTP_200_OK)
+        return list_response(request, (i for _, i in activities))
     except EmptyPage as e:
-        _logger.error("EmptyPage Error: ", e)
+        _logger.error("EmptyPage Error: %s", e)
         return Response({"message": str(e)}, status=status.HTTP_204_NO_CONTENT)
+    except InvalidSize as e:
+        _logger.error("Error: %s", e)
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
-        _logger.error("Error: ", e)
+        _logger.error("Error: %s", e)
+        return Response({"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['get'])
+def get_activity(request: Request):
+    """
+    function to get a page of logs and celery tasks, newest first, using cursor pagination
+
+    Parameters:
+    - request: The Django request object, query params `size` and `cursor`
+      (the `next_cursor` of the previous page).
+
+    Returns:
+    - If successful, returns a JSON response with activities and the cursor of the next page and 200 ok status.
+    - If the cursor or size is invalid returns a JSON response with 400 status.
+    - If fails returns a JSON response with 500 status.
+    """
+    try:
+        size = get_size(request)
+        cursor = request.query_params.get("cursor")
+        activities = get_activities(limit=size, cursor=decode_cursor(cursor) if cursor else None)
+        return Response(
+            {
+                "results": [i for _, i in activities],
+                "next_cursor": encode_cursor(activities[-1][0]) if len(activities) == size else None,
+            },
+            status=status.HTTP_200_OK
+        )
+    except (InvalidCursor, InvalidSize) as e:
+        _logger.error("Error: %s", e)
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        _logger.error("Error: %s", e)
+        return Response({"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['get'])
+def query_logs(request: Request):
+    """
+    function to query logs by device, path, status and time range, newest first, using cursor pagination
+
+    Parameters:
+    - request: The Django request object, query params `device_ip`, `http_path`, `status`,
+      `since` and `until` (ISO 8601 datetimes), `size` and `cursor` (the `next_cursor` of the previous page).
+
+    Returns:
+    - If successful, returns a JSON response with logs and the cursor of the next page and 200 ok status.
+    - If a query param is invalid returns a JSON response with 400 status.
+    - If fails returns a JSON response with 500 status.
+    """
+    try:
+        query_params = request.query_params
+        filters = {
+            key: query_params[key] for key in ("device_ip", "http_path", "status") if key in query_params
+        }
+        for key, lookup in (("since", "timestamp__gte"), ("until", "timestamp__lte")):
+            if key in query_params:
+                try:
+                    value = parse_datetime(query_params[key])
+                except ValueError:  # well formatted but not a valid datetime
+                    value = None
+                if value is None:
+                    return Response({"message": f"Invalid {key}: {query_params[key]}"}, status=status.HTTP_400_BAD_REQUEST)
+                filters[lookup] = value if is_aware(value) else make_aware(value, datetime.timezone.utc)
+        size = get_size(request)
+        cursor = query_params.get("cursor")
+        logs = get_logs_page(limit=size, cursor=decode_cursor(cursor) if cursor else None, **filters)
+        return Response(
+            {
+                "results": [i for _, i in logs],
+                "next_cursor": encode_cursor(logs[-1][0]) if len(logs) == size else None,
+            },
+            status=status.HTTP_200_OK
+        )
+    except (InvalidCursor, InvalidSize) as e:
+        _logger.error("Error: %s", e)
+        return Response({"message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    except Exception as e:
+        _logger.error("Error: %s", e)
         return Response({"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -88,37 +187,6 @@ def delete_logs(request: Request, **kwargs):
         return Response({"message": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-def get_celery_tasks_data() -> list:
-    """
-    function to get celery tasks data from database
-
-    Returns:
-        - list: celery tasks data
-    """
-    task_results = TaskResult.objects.all()
-    result_data = []
-    for result in task_results:
-        try:
-            task_kwargs = ast.literal_eval(result.task_kwargs.strip('\"')) if result.task_kwargs else {}
-        except ValueError:
-            task_kwargs = {"result": result.task_kwargs}
-        http_path = task_kwargs.pop("http_path", "")
-        result_data.append(
-            {
-                "status": result.status,
-                "timestamp": result.date_created.strftime("%Y-%m-%d %H:%M:%S"),
-                "status_code": 200,
-                "http_method": "PUT",
-                "processing_time": (result.date_done - result.date_created).total_seconds(),
-                "response": json.loads(result.result),
-                "request_json": task_kwargs,
-                "http_path": http_path,
-                "task_id": result.task_id,
-            }
-        )
-    return result_data
-
-
 def delete_celery_tasks_data(task_ids: list = None) -> None:
     """
     function to delete celery tasks data from database
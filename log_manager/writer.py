@@ -0,0 +1,134 @@
+import atexit
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection
+
+from log_manager.logger import get_backend_logger
+from log_manager.models import Logs
+from log_manager.retention import log_retention
+from log_manager.serializers import LogSerializer
+
+_logger = get_backend_logger()
+
+_STOP = object()
+
+
+class LogWriter:
+    """
+    Writes request logs to the Logs table.
+
+    When started, logs are put on a bounded queue of LOG_WRITER_BUFFER_SIZE
+    items and a worker thread saves them with bulk_create in batches of up to
+    LOG_WRITER_BATCH_SIZE. When the writer isn't started, or its buffer is
+    full, logs are saved synchronously by the caller.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Starts the worker thread and registers a flush on interpreter shutdown.
+        """
+        with self._lock:
+            if self.running:
+                return
+            self._queue = queue.Queue(maxsize=settings.LOG_WRITER_BUFFER_SIZE)
+            self._thread = threading.Thread(target=self._run, name="log_writer", daemon=True)
+            self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout: float = 10):
+        """
+        Saves the buffered logs and stops the worker thread.
+
+        Parameters:
+            timeout (float): Seconds to wait for the buffered logs to be saved.
+        """
+        with self._lock:
+            if not self.running:
+                return
+            thread = self._thread
+            self._queue.put(_STOP)
+        thread.join(timeout)
+
+    def flush(self):
+        """
+        Blocks until all the buffered logs are saved.
+        """
+        if self.running:
+            self._queue.join()
+
+    def write(self, logs: list):
+        """
+        Saves the given logs, in background if the writer is running.
+
+        Parameters:
+            logs (list): List of dicts with the Logs fields.
+        """
+        if not self.running:
+            self.save(logs)
+            return
+        for index, log in enumerate(logs):
+            try:
+                self._queue.put_nowait(log)
+            except queue.Full:
+                _logger.warning("Log buffer is full, saving logs synchronously.")
+                self.save(logs[index:])
+                return
+
+    @staticmethod
+    def save(logs: list) -> int:
+        """
+        Validates and saves the given logs with a single bulk insert.
+
+        Parameters:
+            logs (list): List of dicts with the Logs fields.
+
+        Returns:
+            int: Number of saved logs.
+        """
+        objs = []
+        for log in logs:
+            serializer = LogSerializer(data=log)
+            if serializer.is_valid():
+                objs.append(Logs(**serializer.validated_data))
+            else:
+                _logger.error("Invalid log %s, Reason: %s", log, serializer.errors)
+        if objs:
+            Logs.objects.bulk_create(objs)
+            log_retention.record_writes(len(objs))
+        return len(objs)
+
+    def _run(self):
+        batch_size = settings.LOG_WRITER_BATCH_SIZE
+        stop = False
+        while not stop:
+            batch = [self._queue.get()]
+            while len(batch) < batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            logs = [i for i in batch if i is not _STOP]
+            stop = len(logs) != len(batch)
+            try:
+                if logs:
+                    self.save(logs)
+            except Exception as e:
+                _logger.error("Failed to save %s logs, Reason: %s", len(logs), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+        connection.close()
+
+
+log_writer = LogWriter()
@@ -1,3 +1,4 @@
+import os
 import sys
 from django.apps import AppConfig
 
@@ -7,9 +8,8 @@ class NetworkConfig(AppConfig):
     name = "network"
 
     def ready(self):
-        if 'runserver' in sys.argv:
-            from network.models import ReDiscoveryConfig
-            from network.scheduler import add_scheduler
-            objs = ReDiscoveryConfig.objects.all()
-            for obj in objs:
-                add_scheduler(obj.device_ip, obj.interval)
+        # the autoreloader parent of runserver serves no requests, only the
+        # child, with RUN_MAIN set, or a runserver without reloader does
+        if 'runserver' in sys.argv and (os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv):
+            from network.scheduler import start_scheduler
+            start_scheduler()
@@ -0,0 +1,108 @@
+""" Batch of GET requests run in one round trip. """
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from log_manager.logger import get_backend_logger
+from network.bulk import map_concurrent
+
+_logger = get_backend_logger()
+
+# Headers of the batch request not passed to its sub-queries.
+EXCLUDED_META = ("CONTENT_TYPE", "CONTENT_LENGTH", "HTTP_IF_NONE_MATCH", "HTTP_ACCEPT_ENCODING")
+
+
+@api_view(["POST"])
+def batch_get(request):
+    """
+    Runs a batch of GET sub-queries concurrently, under the authentication of
+    the batch request, so that a page needing several routes takes the time
+    of the slowest one instead of the sum of them.
+
+    Parameters:
+    - request: The request object, its body maps the keys of the sub-queries
+      to their route and query parameters:
+        {
+            "device": {"route": "devices", "params": {"mgt_ip": "10.10.130.10"}},
+            "vlans": {"route": "vlan", "params": {"mgt_ip": "10.10.130.10"}}
+        }
+
+    Returns:
+    - A Response object mapping the keys of the sub-queries to their status
+      code and data, with status 200 even if some of them failed:
+        {
+            "device": {"status": 200, "data": {...}},
+            "vlans": {"status": 204, "data": {}}
+        }
+    - A Response object with status 400 if the body is not a map of
+      sub-queries or has more than NETWORK_BATCH_MAX_QUERIES of them.
+    """
+    queries = request.data
+    if not isinstance(queries, dict) or not all(
+        isinstance(query, dict) and query.get("route") for query in queries.values()
+    ):
+        _logger.error("Invalid batch, expected a map of sub-queries with a route.")
+        return Response(
+            {"status": "Invalid batch, expected a map of sub-queries with a route."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    if len(queries) > settings.NETWORK_BATCH_MAX_QUERIES:
+        _logger.error(f"Batch has more than {settings.NETWORK_BATCH_MAX_QUERIES} sub-queries.")
+        return Response(
+            {"status": f"Batch has more than {settings.NETWORK_BATCH_MAX_QUERIES} sub-queries."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    results = map_concurrent(
+        lambda query: _run_query(request, query["route"], query.get("params") or {}),
+        list(queries.values()),
+    )
+    return Response(dict(zip(queries.keys(), results)), status=status.HTTP_200_OK)
+
+
+def _run_query(request, route: str, params: dict) -> dict:
+    """
+    Runs a GET sub-query of a batch.
+
+    Parameters:
+        request (Request): The batch request.
+        route (str): The route of the sub-query.
+        params (dict): The query parameters of the sub-query.
+
+    Returns:
+        dict: The status code and the data of the sub-query response.
+    """
+    path = "/" + route.lstrip("/")
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {"status": status.HTTP_404_NOT_FOUND, "data": {"status": f"Route {route} not found."}}
+    if match.func is batch_get:
+        return {"status": status.HTTP_400_BAD_REQUEST, "data": {"status": "Batches can not be nested."}}
+
+    sub_request = HttpRequest()
+    sub_request.method = "GET"
+    sub_request.path = sub_request.path_info = path
+    sub_request.resolver_match = match
+    query_string = urlencode(params, doseq=True)
+    sub_request.GET = QueryDict(query_string)
+    sub_request.META = {
+        **{name: value for name, value in request.META.items() if name not in EXCLUDED_META},
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query_string,
+        "HTTP_ACCEPT": "application/json",
+    }
+    # the sub-queries are not authenticated again
+    sub_request._force_auth_user = request.user
+    sub_request._force_auth_token = request.auth
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+    except Exception as e:
+        _logger.error(f"Batch sub-query {route} failed, Reason: {e}")
+        return {"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "data": {"status": str(e)}}
+    return {"status": response.status_code, "data": getattr(response, "data", None)}
@@ -22,6 +22,9 @@ from orca_nw_lib.bgp import (
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.bulk import run_per_device
+from network.query import InvalidQuery, ListQuery
 from network.util import (
     add_msg_to_list,
     get_failure_msg,
@@ -32,6 +35,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def device_bgp_global(request):
     """
@@ -148,6 +152,7 @@ def device_bgp_global(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def bgp_nbr_config(request):
     """
@@ -176,15 +181,18 @@ def bgp_nbr_config(request):
                 {"result": "Required field device mgt_ip not found."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        data = get_bgp_neighbors(
-            device_ip=device_ip,
-            neighbor_ip=request.GET.get("neighbor_ip", None),
-        )
-        return (
-            Response(data, status.HTTP_200_OK)
-            if data
-            else Response({}, status.HTTP_204_NO_CONTENT)
+        try:
+            query = ListQuery(request.GET, key="neighbor_ip")
+        except InvalidQuery as e:
+            _logger.error(str(e))
+            return Response({"result": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data, next_cursor = query.select(
+            get_bgp_neighbors(
+                device_ip=device_ip,
+                neighbor_ip=request.GET.get("neighbor_ip", None),
+            )
         )
+        return query.get_response(data, next_cursor)
     if request.method == "PUT":
         req_data_list = (
             request.data if isinstance(request.data, list) else [request.data]
@@ -221,6 +229,13 @@ def bgp_nbr_config(request):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+        def config(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
+            remote_asn = req_data.get("remote_asn")
+            neighbor_ip = req_data.get("neighbor_ip")
+            vrf_name = req_data.get("vrf_name")
             try:
                 config_bgp_neighbors(
                     device_ip=device_ip,
@@ -238,6 +253,9 @@ def bgp_nbr_config(request):
                 print(traceback.format_exc())
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, config)
     elif request.method == "DELETE":
         req_data_list = (
             request.data if isinstance(request.data, list) else [request.data]
@@ -257,6 +275,12 @@ def bgp_nbr_config(request):
                     {"result": "Required field neighbor_ip not found."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+
+        def delete(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
+            neighbor_ip = req_data.get("neighbor_ip", "")
             try:
                 delete_bgp_neighbor(
                     device_ip=device_ip,
@@ -269,6 +293,9 @@ def bgp_nbr_config(request):
                 _logger.error("Failed to delete BGP neighbor on %s: %s", device_ip, err)
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, delete)
 
     return Response(
         {"result": result},
@@ -279,6 +306,7 @@ def bgp_nbr_config(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def bgp_af(request):
     """
@@ -390,6 +418,7 @@ def bgp_af(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def bgp_af_network(request):
     """
@@ -502,6 +531,7 @@ def bgp_af_network(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def bgp_af_aggregate_addr(request):
     """
@@ -613,6 +643,7 @@ def bgp_af_aggregate_addr(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def bgp_neighbor_af(request):
     """
@@ -730,6 +761,7 @@ def bgp_neighbor_af(request):
 
 
 @api_view(["GET"])
+@cache_get
 @log_request
 def bgp_neighbor_sub_interface(request):
     result = []
@@ -768,6 +800,7 @@ def bgp_neighbor_sub_interface(request):
 
 
 @api_view(["GET"])
+@cache_get
 @log_request
 def bgp_neighbor_remote_bgp(request):
     result = []
@@ -807,6 +840,7 @@ def bgp_neighbor_remote_bgp(request):
 
 
 @api_view(["GET"])
+@cache_get
 @log_request
 def bgp_neighbor_local_bgp(request):
     result = []
@@ -0,0 +1,81 @@
+""" Concurrent execution of the bulk requests on the network devices. """
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connection
+
+from network.util import add_msg_to_list
+
+
+def run_per_device(req_data_list: list, func, key="mgt_ip") -> tuple:
+    """
+    Runs func on every request item, concurrently for the different devices.
+
+    Items are grouped by device, the items of a device run one after another in
+    request order, and the devices run in parallel on a pool of at most
+    BULK_MAX_WORKERS threads, so the time taken by a request depends on its
+    slowest device and not on the number of devices.
+
+    Args:
+        req_data_list (list): The request items.
+        func (callable): Function configuring one item, returns a tuple of the
+            list of messages and the success status.
+        key (str): The item field holding the device IP.
+
+    Returns:
+        tuple: The messages of all the items in request order and the success status.
+    """
+    devices = {}
+    for index, req_data in enumerate(req_data_list):
+        devices.setdefault(req_data.get(key, ""), []).append((index, req_data))
+
+    outcomes = [None] * len(req_data_list)
+
+    def run_device(items):
+        try:
+            for index, req_data in items:
+                outcomes[index] = func(req_data)
+        finally:
+            if len(devices) > 1:
+                connection.close()
+
+    if len(devices) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(devices), settings.BULK_MAX_WORKERS)) as executor:
+            for future in [executor.submit(run_device, items) for items in devices.values()]:
+                future.result()
+    else:
+        for items in devices.values():
+            run_device(items)
+
+    result = []
+    for msg in itertools.chain.from_iterable(msgs for msgs, _ in outcomes):
+        if msg != "\n":
+            add_msg_to_list(result, msg)
+    return result, all(success for _, success in outcomes)
+
+
+def map_concurrent(func, items: list) -> list:
+    """
+    Calls func on every item, concurrently on a pool of at most BULK_MAX_WORKERS
+    threads, so that N independent lookups take N / BULK_MAX_WORKERS round trips
+    instead of N.
+
+    Args:
+        func (callable): Function called with each item.
+        items (list): The items.
+
+    Returns:
+        list: The results in the order of the items.
+    """
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    def run(item):
+        try:
+            return func(item)
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=min(len(items), settings.BULK_MAX_WORKERS)) as executor:
+        return list(executor.map(run, items))
@@ -0,0 +1,266 @@
+""" Read-through cache of the network GET responses. """
+import hashlib
+import threading
+import time
+from concurrent.futures import Future
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from rest_framework.response import Response
+
+from log_manager.logger import get_backend_logger
+from network.models import CacheGeneration
+from orca_backend.renderers import streams
+
+_logger = get_backend_logger()
+
+RESPONSE_KEY_PREFIX = "orca:response:"
+
+# Generation of the responses not scoped to a device, bumped by every change.
+ALL_DEVICES = "all"
+# Generation of all the responses, bumped when all the devices are invalidated.
+RESET = "reset"
+
+
+class CacheStats:
+    """
+    Counters of the response cache of this process.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._counters = {}
+
+    def incr(self, name: str, count: int = 1):
+        with self._mutex:
+            self._counters[name] = self._counters.get(name, 0) + count
+
+    def get(self) -> dict:
+        with self._mutex:
+            stats = {
+                name: self._counters.get(name, 0)
+                for name in ("hits", "misses", "bypasses", "coalesced", "not_modified", "invalidations")
+            }
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0
+        return stats
+
+    def clear(self):
+        with self._mutex:
+            self._counters.clear()
+
+
+cache_stats = CacheStats()
+
+
+class SingleFlight:
+    """
+    Runs one call at a time per key, the calls with the same key made while it
+    runs wait for it and share its result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._calls = {}
+
+    def do(self, key: str, func) -> tuple:
+        """
+        Calls func, unless a call with the same key is in flight.
+
+        Parameters:
+            key (str): The key of the call.
+            func (callable): The function to call.
+
+        Returns:
+            tuple: The result of the call and whether it was shared with another caller.
+        """
+        with self._mutex:
+            future = self._calls.get(key)
+            shared = future is not None
+            if not shared:
+                future = self._calls[key] = Future()
+        if shared:
+            cache_stats.incr("coalesced")
+            return future.result(), True
+        try:
+            future.set_result(func())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._mutex:
+                del self._calls[key]
+        return future.result(), False
+
+
+single_flight = SingleFlight()
+
+
+def get_generations(*names: str) -> dict:
+    """
+    Returns the change generations of the devices, bumped on every change of
+    them. They are kept in the database, so that the changes made by the Celery
+    workers or the scheduler invalidate the responses cached by the web processes.
+
+    A missing generation starts at the current time in nanoseconds, so a
+    generation deleted with the database never goes back to a value of which
+    cached responses may still exist.
+
+    Parameters:
+        names (str): The IP addresses of the devices, ALL_DEVICES or RESET.
+
+    Returns:
+        dict: The generation of each name.
+    """
+    generations = dict(CacheGeneration.objects.filter(name__in=names).values_list("name", "value"))
+    missing = [name for name in names if name not in generations]
+    if missing:
+        _create(missing)
+        generations.update(CacheGeneration.objects.filter(name__in=missing).values_list("name", "value"))
+    return generations
+
+
+def get_generation(name: str) -> int:
+    """
+    Returns the change generation of a device, see get_generations.
+
+    Parameters:
+        name (str): The IP address of the device, ALL_DEVICES or RESET.
+
+    Returns:
+        int: The generation.
+    """
+    return get_generations(name)[name]
+
+
+def invalidate_device(*device_ips: str):
+    """
+    Invalidates the cached responses of the given devices, and the ones not
+    scoped to a device.
+
+    Parameters:
+        device_ips (str): The IP addresses of the devices.
+    """
+    _bump({*device_ips, ALL_DEVICES})
+    cache_stats.incr("invalidations")
+
+
+def invalidate_all():
+    """
+    Invalidates the cached responses of all the devices.
+    """
+    _bump({RESET, ALL_DEVICES})
+    cache_stats.incr("invalidations")
+
+
+def _create(names):
+    CacheGeneration.objects.bulk_create(
+        [CacheGeneration(name=name, value=time.time_ns()) for name in names], ignore_conflicts=True
+    )
+
+
+def _bump(names: set):
+    _create(names)
+    CacheGeneration.objects.filter(name__in=names).update(value=F("value") + 1)
+
+
+def get_cache_key(request) -> tuple:
+    """
+    Returns the cache key and the ETag of a GET request, built from the path, the
+    query parameters and the generations of its device. The ETag also depends on
+    the Accept header, as the same data is rendered differently, and is suffixed
+    with the version of the cached response by cache_get.
+
+    Parameters:
+        request (Request): The request object.
+
+    Returns:
+        tuple: The cache key and the ETag.
+    """
+    device_ip = request.GET.get("mgt_ip", "") or ALL_DEVICES
+    params = "&".join(
+        f"{name}={value}" for name, values in sorted(request.GET.lists()) for value in sorted(values)
+    )
+    digest = hashlib.sha1(f"{request.path}?{params}".encode()).hexdigest()
+    generations = get_generations(device_ip, RESET)
+    generations = f"{generations[device_ip]}:{generations[RESET]}"
+    accept = hashlib.sha1(request.headers.get("Accept", "").encode()).hexdigest()[:8]
+    etag = f'"{generations.replace(":", "-")}-{digest[:16]}-{accept}"'
+    return f"{RESPONSE_KEY_PREFIX}{device_ip}:{generations}:{digest}", etag
+
+
+def _versioned(etag: str, version: int) -> str:
+    return f'{etag[:-1]}-{version:x}"'
+
+
+def _etag_matches(request, etag: str) -> bool:
+    if_none_match = request.headers.get("If-None-Match", "")
+    tags = {i.strip().removeprefix("W/") for i in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def cache_get(function):
+    """
+    Decorator caching the successful GET responses of a view for NETWORK_CACHE_TTL
+    seconds, keyed by path, query parameters and the change generation of the
+    device given by mgt_ip. The devices are invalidated when they are changed
+    through the API, see network.middleware.CacheInvalidationMiddleware.
+
+    Responses carry an ETag built from the change generation and the time the
+    response was cached, a request with a matching If-None-Match header gets a
+    304 without calling the view while the response is cached. So an ETag is
+    not valid longer than NETWORK_CACHE_TTL, like the cached response.
+
+    Concurrent identical requests not found in the cache share one call of the
+    view, the requests joining a call in flight are COALESCED.
+
+    A request with the Cache-Control: no-cache header bypasses the cache and
+    refreshes the cached response, streamed NDJSON responses are not cached. The X-Orca-Cache response header tells
+    whether the response was a HIT, a MISS, COALESCED or a BYPASS.
+    """
+    @wraps(function)
+    def _wrapper(request, *args, **kwargs):
+        if request.method != "GET" or streams(request):
+            return function(request, *args, **kwargs)
+        key, etag = get_cache_key(request)
+        bypass = "no-cache" in request.headers.get("Cache-Control", "")
+        if not bypass and (cached := cache.get(key)) is not None:
+            data, status, version = cached
+            etag = _versioned(etag, version)
+            if _etag_matches(request, etag):
+                cache_stats.incr("not_modified")
+                response = Response(status=304)
+            else:
+                cache_stats.incr("hits")
+                response = Response(data, status=status)
+                response["X-Orca-Cache"] = "HIT"
+            response["ETag"] = etag
+            return response
+
+        def get_response():
+            cache_stats.incr("bypasses" if bypass else "misses")
+            response = function(request, *args, **kwargs)
+            if response.status_code in (200, 204):
+                # the etag of each cached response is distinct, so it is not
+                # valid longer than the response
+                response.cache_version = time.time_ns()
+                try:
+                    cache.set(
+                        key, (response.data, response.status_code, response.cache_version), settings.NETWORK_CACHE_TTL
+                    )
+                except Exception as e:
+                    _logger.warning(f"Failed to cache response of {request.path}, Reason: {e}")
+            return response
+
+        response, shared = single_flight.do(key, get_response)
+        version = getattr(response, "cache_version", None)
+        if shared:
+            response = Response(response.data, status=response.status_code)
+            response["X-Orca-Cache"] = "COALESCED"
+        else:
+            response["X-Orca-Cache"] = "BYPASS" if bypass else "MISS"
+        if version is not None:
+            response["ETag"] = _versioned(etag, version)
+        return response
+    return _wrapper
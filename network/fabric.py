@@ -0,0 +1,132 @@
+""" Fabric wide queries of the features of all the discovered devices. """
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.db import connection
+from orca_nw_lib.bgp import get_bgp_neighbors
+from orca_nw_lib.device import get_device_details
+from orca_nw_lib.interface import get_interface
+from orca_nw_lib.mclag import get_mclags
+from orca_nw_lib.port_chnl import get_port_chnl
+from orca_nw_lib.stp_port import get_stp_port_members
+from orca_nw_lib.vlan import get_vlan
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.query import InvalidQuery, ListQuery
+from orca_backend.renderers import list_response, streams
+
+_logger = get_backend_logger()
+
+
+class FabricFeature:
+    """
+    Describes how to query a feature on every device.
+
+    Parameters:
+        get_items (callable): Returns the items of the feature of a device IP.
+        key (str): The field identifying the items of a device.
+    """
+
+    def __init__(self, get_items, key: str):
+        self.get_items = get_items
+        self.key = key
+
+
+FABRIC_FEATURES = {
+    "interfaces": FabricFeature(lambda device_ip: get_interface(device_ip, ""), "name"),
+    "vlans": FabricFeature(lambda device_ip: get_vlan(device_ip, ""), "name"),
+    "port_chnls": FabricFeature(lambda device_ip: get_port_chnl(device_ip, ""), "lag_name"),
+    "mclags": FabricFeature(lambda device_ip: get_mclags(device_ip, None), "domain_id"),
+    "bgp_neighbors": FabricFeature(
+        lambda device_ip: get_bgp_neighbors(device_ip=device_ip, neighbor_ip=None), "neighbor_ip"
+    ),
+    "stp_ports": FabricFeature(lambda device_ip: get_stp_port_members(device_ip, None), "if_name"),
+}
+
+
+@api_view(["GET"])
+@cache_get
+def fabric_query(request, feature: str):
+    """
+    Returns the items of a feature of all the discovered devices, each with the
+    mgt_ip of its device. The devices are queried concurrently, so the request
+    takes about as long as the query of a single device.
+
+    Parameters:
+    - request: The request object, its query parameters filter the items, e.g.
+      fabric/interfaces?oper_sts=down, see network.query.ListQuery.
+    - feature: The feature, one of FABRIC_FEATURES.
+
+    Returns:
+    - A Response object with the items sorted by device, or streamed as soon as
+      their device answers when the client accepts application/x-ndjson.
+      The devices which could not be queried are listed in the
+      X-Orca-Failed-Devices header of the non streamed responses.
+    - A Response object with status 204 if there are no items.
+    - A Response object with status 400 if a query parameter is invalid.
+    - A Response object with status 404 if the feature is unknown.
+    """
+    fabric_feature = FABRIC_FEATURES.get(feature)
+    if not fabric_feature:
+        return Response(
+            {"status": f"Unknown fabric feature {feature}, valid features: {', '.join(FABRIC_FEATURES)}."},
+            status=status.HTTP_404_NOT_FOUND,
+        )
+    try:
+        query = ListQuery(request.GET, key=fabric_feature.key, other_filters=True)
+        if query.paginated:
+            raise InvalidQuery("Fabric queries can not be paginated.")
+    except InvalidQuery as e:
+        _logger.error(str(e))
+        return Response({"status": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    devices = get_device_details() or []
+    device_ips = [device["mgt_ip"] for device in (devices if isinstance(devices, list) else [devices])]
+    failed_devices = []
+    items = iter_fabric_items(fabric_feature, device_ips, query, failed_devices)
+    if streams(request):
+        return list_response(request, items)
+    order = {device_ip: index for index, device_ip in enumerate(device_ips)}
+    response = list_response(request, sorted(items, key=lambda item: order[item["mgt_ip"]]))
+    if failed_devices:
+        response["X-Orca-Failed-Devices"] = ",".join(failed_devices)
+    return response
+
+
+def iter_fabric_items(fabric_feature: FabricFeature, device_ips: list, query: ListQuery, failed_devices: list):
+    """
+    Queries the feature of the devices concurrently, on a pool of at most
+    FABRIC_MAX_WORKERS threads, and yields the items of each device as soon
+    as it answers.
+
+    Parameters:
+        fabric_feature (FabricFeature): The queried feature.
+        device_ips (list): The IPs of the devices.
+        query (ListQuery): The filters and fields of the items.
+        failed_devices (list): Gets the IPs of the devices which could not be queried.
+
+    Returns:
+        generator: The filtered items, with the mgt_ip of their device.
+    """
+    if not device_ips:
+        return
+
+    def get_device_items(device_ip):
+        try:
+            items, _ = query.select(fabric_feature.get_items(device_ip))
+            items = items if isinstance(items, list) else [items] if items else []
+            return [{**item, "mgt_ip": device_ip} for item in query.project(items)]
+        except Exception as e:
+            _logger.error(f"Failed to query {device_ip}, Reason: {e}")
+            failed_devices.append(device_ip)
+            return []
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=min(len(device_ips), settings.FABRIC_MAX_WORKERS)) as executor:
+        for future in as_completed([executor.submit(get_device_items, i) for i in device_ips]):
+            yield from future.result()
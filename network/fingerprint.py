@@ -0,0 +1,237 @@
+""" Change detection of the features of the devices, to rediscover only the changed ones. """
+import datetime
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from orca_nw_lib.common import DiscoveryFeature
+from orca_nw_lib.device import get_device_details
+from orca_nw_lib.discovery import discover_device, discover_nw_features
+
+from log_manager.logger import get_backend_logger
+from network.bulk import map_concurrent
+from network.models import DiscoveryFingerprint, DiscoveryRun
+
+_logger = get_backend_logger()
+
+
+def get_device_config(device_ip: str, path: str):
+    """
+    Returns the config of a device at a SONiC config DB path, read with a
+    gNMI get.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+        path (str): The path, like sonic-vlan:sonic-vlan.
+
+    Returns:
+        dict: The config.
+    """
+    from orca_nw_lib.gnmi_util import get_gnmi_path, send_gnmi_get
+    return send_gnmi_get(device_ip=device_ip, path=[get_gnmi_path(path)])
+
+
+# Paths of the state of the items, which changes without a change of config.
+INTERFACE_STATE_PATH = "openconfig-interfaces:interfaces/interface[name=*]/state/oper-status"
+BGP_NEIGHBOR_STATE_PATH = (
+    "openconfig-network-instance:network-instances/network-instance[name=*]/protocols/"
+    "protocol[identifier=BGP][name=bgp]/bgp/neighbors/neighbor[neighbor-address=*]/state/session-state"
+)
+
+# Functions reading the config of the features from a device, and the state
+# queried through the API, like the oper status of the interfaces and the
+# session state of the BGP neighbors, by name of the DiscoveryFeature. One
+# gNMI get of a table is much cheaper than the discovery of the feature, which
+# reads the config and state of all its items. The features without a
+# function are discovered every time.
+FEATURE_FINGERPRINTS = {
+    name: lambda device_ip, paths=paths: [get_device_config(device_ip, path) for path in paths]
+    for name, paths in {
+        "interface": ("sonic-port:sonic-port/PORT/PORT_LIST", INTERFACE_STATE_PATH),
+        "port_channel": ("sonic-portchannel:sonic-portchannel",),
+        "vlan": ("sonic-vlan:sonic-vlan",),
+        "mclag": ("sonic-mclag:sonic-mclag",),
+        "bgp": ("sonic-bgp-global:sonic-bgp-global", BGP_NEIGHBOR_STATE_PATH),
+        "bgp_neighbors": ("sonic-bgp-neighbor:sonic-bgp-neighbor", BGP_NEIGHBOR_STATE_PATH),
+        "stp": ("sonic-spanning-tree:sonic-spanning-tree",),
+    }.items()
+}
+
+
+def check_feature_fingerprints():
+    """
+    Removes the functions of FEATURE_FINGERPRINTS not named after a
+    DiscoveryFeature, which would be read but never used, logging an error
+    as the feature they were meant for is discovered every time.
+    """
+    for name in set(FEATURE_FINGERPRINTS) - set(DiscoveryFeature.__members__):
+        _logger.error(f"Feature {name} of the fingerprints is not a DiscoveryFeature, it is discovered every time.")
+        del FEATURE_FINGERPRINTS[name]
+
+
+check_feature_fingerprints()
+
+
+def get_fingerprints(device_ip: str) -> dict:
+    """
+    Returns the fingerprints of the features of a device, hashes of their
+    config read from the device.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        dict: The fingerprint of each feature of FEATURE_FINGERPRINTS, None
+        for the ones which could not be read.
+    """
+    fingerprints = {}
+    for name, read_config in FEATURE_FINGERPRINTS.items():
+        try:
+            config = json.dumps(read_config(device_ip), sort_keys=True, default=str)
+            fingerprints[name] = hashlib.sha1(config.encode()).hexdigest()
+        except Exception as e:
+            _logger.error(f"Failed to fingerprint {name} of device {device_ip}, Reason: {e}")
+            fingerprints[name] = None
+    return fingerprints
+
+
+def get_changed_features(fingerprints: dict, last_fingerprints: dict) -> tuple:
+    """
+    Returns the features to discover again, the ones whose fingerprint changed
+    or is unknown, and the ones to skip.
+
+    Parameters:
+        fingerprints (dict): The current fingerprints, see get_fingerprints.
+        last_fingerprints (dict): The fingerprints at the last discovery.
+
+    Returns:
+        tuple: The lists of the DiscoveryFeatures to discover and to skip.
+    """
+    executed, skipped = [], []
+    for feature in DiscoveryFeature:
+        fingerprint = fingerprints.get(feature.name)
+        if fingerprint is not None and fingerprint == last_fingerprints.get(feature.name):
+            skipped.append(feature)
+        else:
+            executed.append(feature)
+    return executed, skipped
+
+
+def discover_changed(device_ips: list, full: bool = False) -> dict:
+    """
+    Discovers the features of the devices changed since their last discovery,
+    as told by their fingerprints, a feature at a time on all the devices it
+    changed on, concurrently. The devices never discovered, or whose
+    features can not be fingerprinted, are fully discovered together, and
+    one by one if that fails, so that an unreachable device does not fail
+    the others. The statistics of each run are saved as a DiscoveryRun.
+
+    Parameters:
+        device_ips (list): The IP addresses of the devices.
+        full (bool): Whether to fully discover all the devices.
+
+    Returns:
+        dict: The statistics of the run of each device, whether it was full,
+        the names of the executed, skipped and failed features and its duration.
+    """
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    last_fingerprints = {
+        obj.device_ip: obj.fingerprints for obj in DiscoveryFingerprint.objects.filter(device_ip__in=device_ips)
+    }
+    all_features = [feature.name for feature in DiscoveryFeature]
+    runs = {}
+    fingerprints = {}
+    full_device_ips = []
+    # feature -> devices on which it changed
+    changed = {}
+    for device_ip in device_ips:
+        start = time.monotonic()
+        fingerprints[device_ip] = get_fingerprints(device_ip)
+        if full or not last_fingerprints.get(device_ip) or not any(fingerprints[device_ip].values()) \
+                or not get_device_details(device_ip):
+            full_device_ips.append(device_ip)
+            runs[device_ip] = {"full": True, "executed": all_features, "skipped": [], "failed": [], "start": start}
+            continue
+        executed, skipped = get_changed_features(fingerprints[device_ip], last_fingerprints[device_ip])
+        for feature in executed:
+            changed.setdefault(feature, []).append(device_ip)
+        runs[device_ip] = {
+            "full": False,
+            "executed": [feature.name for feature in executed],
+            "skipped": [feature.name for feature in skipped],
+            "failed": [],
+            "duration": time.monotonic() - start,
+        }
+
+    # a feature at a time, in the order of DiscoveryFeature, on all the devices it changed on at once
+    for feature in (feature for feature in DiscoveryFeature if feature in changed):
+        start = time.monotonic()
+
+        def discover_feature(device_ip, feature=feature):
+            try:
+                discover_nw_features(device_ip, feature)
+            except Exception as e:
+                _logger.error(f"Failed to discover {feature.name} of device {device_ip}, Reason: {e}")
+                runs[device_ip]["failed"].append(feature.name)
+
+        map_concurrent(discover_feature, changed[feature])
+        for device_ip in changed[feature]:
+            runs[device_ip]["duration"] += time.monotonic() - start
+
+    if full_device_ips:
+        start = time.monotonic()
+        try:
+            discover_device(device_ips=full_device_ips)
+        except Exception as e:
+            _logger.error(f"Failed to discover devices {full_device_ips}, Reason: {e}")
+            for device_ip in full_device_ips:
+                if len(full_device_ips) > 1:
+                    try:
+                        discover_device(device_ips=[device_ip])
+                        continue
+                    except Exception as e:
+                        _logger.error(f"Failed to discover device {device_ip}, Reason: {e}")
+                runs[device_ip]["failed"] = all_features
+        for device_ip in full_device_ips:
+            runs[device_ip]["duration"] = time.monotonic() - runs[device_ip].pop("start")
+        _logger.debug("Fully discovered %d devices in %.1f s.", len(full_device_ips), time.monotonic() - start)
+
+    save_runs(runs, fingerprints, now)
+    return runs
+
+
+def save_runs(runs: dict, fingerprints: dict, now: datetime.datetime):
+    """
+    Saves the fingerprints of the discovered devices, without the ones of the
+    failed features so that they are discovered again by the next run, and
+    the statistics of the runs, keeping the last DISCOVERY_RUN_HISTORY_SIZE of
+    each device.
+
+    Parameters:
+        runs (dict): The statistics of the run of each device.
+        fingerprints (dict): The fingerprints of each device.
+        now (datetime): The start time of the runs.
+    """
+    for device_ip, run in runs.items():
+        if run["full"] and run["failed"]:
+            continue
+        DiscoveryFingerprint.objects.update_or_create(
+            device_ip=device_ip, defaults={
+                "fingerprints": {
+                    name: fingerprint for name, fingerprint in fingerprints[device_ip].items()
+                    if fingerprint is not None and name not in run["failed"]
+                },
+                "updated_at": now,
+            }
+        )
+    DiscoveryRun.objects.bulk_create([
+        DiscoveryRun(device_ip=device_ip, started_at=now, **run) for device_ip, run in runs.items()
+    ])
+    for device_ip in runs:
+        size = settings.DISCOVERY_RUN_HISTORY_SIZE
+        oldest_kept = list(
+            DiscoveryRun.objects.filter(device_ip=device_ip).order_by("-id").values_list("id", flat=True)[size - 1:size]
+        )
+        if oldest_kept:
+            DiscoveryRun.objects.filter(device_ip=device_ip, id__lt=oldest_kept[0]).delete()
@@ -14,12 +14,17 @@ from orca_nw_lib.common import Speed, PortFec, IFMode
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.bulk import run_per_device
+from network.ipam import check_ip_conflicts
+from network.query import InvalidQuery, ListQuery
 from network.util import add_msg_to_list, get_failure_msg, get_success_msg
 
 _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def device_interfaces_list(request):
     """
@@ -31,8 +36,6 @@ def device_interfaces_list(request):
     Returns:
     - The HTTP response object containing the result of the operation.
     """
-    result = []
-    http_status = True
     if request.method == "GET":
         device_ip = request.GET.get("mgt_ip", "")
         if not device_ip:
@@ -42,32 +45,40 @@ def device_interfaces_list(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         intfc_name = request.GET.get("name", "")
-        data = get_interface(device_ip, intfc_name)
-        return (
-            Response(data, status.HTTP_200_OK)
-            if data
-            else Response({}, status.HTTP_204_NO_CONTENT)
-        )
+        try:
+            query = ListQuery(request.GET, key="name")
+        except InvalidQuery as e:
+            _logger.error(str(e))
+            return Response({"status": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data, next_cursor = query.select(get_interface(device_ip, intfc_name))
+        return query.get_response(data, next_cursor)
 
-    elif request.method == "PUT":
-        req_data_list = (
-            request.data if isinstance(request.data, list) else [request.data]
-        )
-        for req_data in req_data_list:
-            device_ip = req_data.get("mgt_ip", "")
-            if not device_ip:
-                _logger.error("Required field device mgt_ip not found.")
-                return Response(
-                    {"status": "Required field device mgt_ip not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    req_data_list = (
+        request.data if isinstance(request.data, list) else [request.data]
+    )
+    for req_data in req_data_list:
+        device_ip = req_data.get("mgt_ip", "")
+        if not device_ip:
+            _logger.error("Required field device mgt_ip not found.")
+            return Response(
+                {"status": "Required field device mgt_ip not found."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-            if not req_data.get("name"):
-                _logger.error("Required field name not found.")
-                return Response(
-                    {"status": "Required field name not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        if not req_data.get("name"):
+            _logger.error("Required field name not found.")
+            return Response(
+                {"status": "Required field name not found."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    if request.method == "PUT" and (conflict_response := check_ip_conflicts(req_data_list)):
+        return conflict_response
+
+    def config(req_data):
+        result = []
+        http_status = True
+        device_ip = req_data.get("mgt_ip", "")
+        if request.method == "PUT":
             try:
                 config_interface(
                     device_ip=device_ip,
@@ -114,25 +125,7 @@ def device_interfaces_list(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error("Failed to configure interface %s.", req_data.get("name"))
-    elif request.method == "DELETE":
-        req_data_list = (
-            request.data if isinstance(request.data, list) else [request.data]
-        )
-        for req_data in req_data_list:
-            device_ip = req_data.get("mgt_ip", "")
-            if not device_ip:
-                _logger.error("Required field device mgt_ip not found.")
-                return Response(
-                    {"status": "Required field device mgt_ip not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
-            if not req_data.get("name"):
-                _logger.error("Required field name not found.")
-                return Response(
-                    {"status": "Required field name not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        elif request.method == "DELETE":
             try:
                 remove_vlan(
                     device_ip=device_ip,
@@ -146,7 +139,9 @@ def device_interfaces_list(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error("Failed to remove interface %s.", req_data.get("name"))
+        return result, http_status
 
+    result, http_status = run_per_device(req_data_list, config)
     return Response(
         {"result": result},
         status=(
@@ -156,6 +151,7 @@ def device_interfaces_list(request):
 
 
 @api_view(["GET"])
+@cache_get
 def interface_pg(request):
     """
     A view for listing device interfaces. It takes a GET request and retrieves the device IP and interface name from the request parameters. If the required parameters are not found, it returns a 400 Bad Request response. It then fetches the page of the interface from the device and returns a 200 OK response with the data if it exists, otherwise it returns a 204 No Content response.
@@ -217,6 +213,7 @@ def interface_resync(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def interface_subinterface_config(request):
     """
@@ -255,6 +252,8 @@ def interface_subinterface_config(request):
         req_data_list = (
             request.data if isinstance(request.data, list) else [request.data]
         )
+        if conflict_response := check_ip_conflicts(req_data_list):
+            return conflict_response
         for req_data in req_data_list:
             device_ip = req_data.get("mgt_ip", "")
             if not device_ip:
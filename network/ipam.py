@@ -0,0 +1,354 @@
+""" IP address management of the prefixes configured in the fabric. """
+import bisect
+import ipaddress
+import itertools
+import threading
+
+from django.conf import settings
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from log_manager.logger import get_backend_logger
+from network.search import search_index
+
+_logger = get_backend_logger()
+
+# Fields of the search index entries holding configured IP addresses, the
+# anycast addresses are shared by design and not managed. The secondary
+# addresses of the subinterfaces are items of their own, flagged secondary.
+IP_FIELDS = ("ip_address",)
+
+
+class IPRecord:
+    """
+    An IP address configured on an interface of a device, with its prefix
+    unless the API returns it without, like the subinterfaces do.
+    """
+    __slots__ = ("seq", "mgt_ip", "type", "name", "interface", "prefixed")
+
+    def __init__(self, seq: int, mgt_ip: str, type: str, name: str, interface, prefixed: bool = True):
+        self.seq = seq
+        self.mgt_ip = mgt_ip
+        self.type = type
+        self.name = name
+        self.interface = interface
+        self.prefixed = prefixed
+
+    def to_dict(self) -> dict:
+        ip_address = str(self.interface) if self.prefixed else str(self.interface.ip)
+        return {"mgt_ip": self.mgt_ip, "type": self.type, "name": self.name, "ip_address": ip_address}
+
+
+def parse_interface(ip_address):
+    """
+    Returns the IP interface of an address, like 10.0.0.1/31, a host prefix
+    for an address without prefix, None if it is not valid or link local.
+    """
+    try:
+        interface = ipaddress.ip_interface(ip_address)
+    except ValueError:
+        return None
+    return None if interface.ip.is_link_local else interface
+
+
+def has_prefix(ip_address) -> bool:
+    return "/" in str(ip_address)
+
+
+def _key(network) -> tuple:
+    return network.version, int(network.network_address), network.prefixlen
+
+
+def get_conflict(mgt_ip: str, name: str, interface, record: IPRecord, prefixed: bool = True):
+    """
+    Returns why an address can not be configured on an interface because of
+    an address configured on another one, None if it can.
+
+    Two interfaces of different devices in the same subnet, like the ends of
+    a /31 link, do not conflict. The prefix of an address configured without
+    one is unknown, it only conflicts with the same address.
+    """
+    if (record.mgt_ip, record.name) == (mgt_ip, name):
+        return None
+    if record.interface.ip == interface.ip:
+        return "duplicate address"
+    if not (prefixed and record.prefixed):
+        return None
+    if record.interface.network != interface.network:
+        return "overlapping prefix"
+    if record.mgt_ip == mgt_ip:
+        return "subnet already configured on another interface of the device"
+    return None
+
+
+class IPAMIndex:
+    """
+    Index of the IP prefixes configured on the interfaces, VLANs and port
+    channels of the devices, kept up to date from the search index.
+
+    As prefixes are either nested or disjoint, the prefixes overlapping a given
+    one are found in O(log n): the ones containing it by looking up its
+    supernets, at most 32 (128 for IPv6), in a hash map, and the ones it
+    contains by bisecting the prefixes sorted by network address.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._seq = itertools.count()
+        # device ip -> generation of its search index entries
+        self._generations = {}
+        # device ip -> records
+        self._devices = {}
+        # (version, network address, prefix length) -> records
+        self._networks = {}
+        # version -> sorted (network address, prefix length, seq)
+        self._sorted = {4: [], 6: []}
+        # seq -> record
+        self._records = {}
+
+    def refresh(self):
+        """
+        Indexes the prefixes of the devices changed since the last refresh.
+        """
+        search_index.refresh()
+        generations = search_index.get_generations()
+        with self._mutex:
+            for device_ip in set(self._devices) - set(generations):
+                self._remove_device(device_ip)
+                del self._generations[device_ip]
+            for device_ip, generation in generations.items():
+                if self._generations.get(device_ip) != generation:
+                    self._remove_device(device_ip)
+                    self._add_device(device_ip, search_index.get_entries(device_ip))
+                    self._generations[device_ip] = generation
+            # the added prefixes are sorted at once
+            for sorted_networks in self._sorted.values():
+                sorted_networks.sort()
+
+    def _add_device(self, device_ip: str, entries: list):
+        records = self._devices.setdefault(device_ip, [])
+        for entry in entries:
+            if entry["field"] not in IP_FIELDS or not (interface := parse_interface(entry["value"])):
+                continue
+            record = IPRecord(
+                next(self._seq), device_ip, entry["type"], entry["name"], interface, has_prefix(entry["value"])
+            )
+            records.append(record)
+            self._records[record.seq] = record
+            key = _key(interface.network)
+            self._networks.setdefault(key, []).append(record)
+            self._sorted[key[0]].append((key[1], key[2], record.seq))
+
+    def _remove_device(self, device_ip: str):
+        for record in self._devices.pop(device_ip, []):
+            del self._records[record.seq]
+            key = _key(record.interface.network)
+            self._networks[key].remove(record)
+            if not self._networks[key]:
+                del self._networks[key]
+            self._sorted[key[0]].remove((key[1], key[2], record.seq))
+
+    def _get_overlapping(self, network) -> list:
+        version, address, prefixlen = _key(network)
+        bits = network.max_prefixlen
+        records = []
+        # the network and its supernets
+        for length in range(prefixlen + 1):
+            mask = ((1 << length) - 1) << (bits - length)
+            records += self._networks.get((version, address & mask, length), [])
+        # its subnets
+        sorted_networks = self._sorted[version]
+        start = bisect.bisect_left(sorted_networks, (address, prefixlen + 1))
+        end = bisect.bisect_right(sorted_networks, (int(network.broadcast_address), bits + 1))
+        records += [self._records[seq] for _, _, seq in sorted_networks[start:end]]
+        return records
+
+    def find_conflicts(self, candidates: list) -> list:
+        """
+        Returns the conflicts of addresses to configure with the ones of the
+        fabric and with each other.
+
+        Parameters:
+            candidates (list): Tuples of the device IP, the interface name and
+                the address with prefix to configure.
+
+        Returns:
+            list: The conflicts, with the address to configure, the reason and
+            the address it conflicts with.
+        """
+        conflicts = []
+        checked = []
+        with self._mutex:
+            for mgt_ip, name, ip_address in candidates:
+                if not (interface := parse_interface(ip_address)):
+                    continue
+                others = self._get_overlapping(interface.network) + [
+                    i for i in checked if i.interface.network.overlaps(interface.network)
+                ]
+                prefixed = has_prefix(ip_address)
+                for other in others:
+                    if reason := get_conflict(mgt_ip, name, interface, other, prefixed):
+                        conflicts.append({
+                            "mgt_ip": mgt_ip,
+                            "name": name,
+                            "ip_address": ip_address,
+                            "reason": reason,
+                            "conflicts_with": other.to_dict(),
+                        })
+                checked.append(IPRecord(-1, mgt_ip, "request", name, interface, prefixed))
+        return conflicts
+
+    def get_conflicts(self) -> list:
+        """
+        Returns the conflicting addresses configured in the fabric.
+
+        Returns:
+            list: The pairs of conflicting addresses, with the reason.
+        """
+        conflicts = []
+        with self._mutex:
+            for record in self._records.values():
+                for other in self._get_overlapping(record.interface.network):
+                    if other.seq > record.seq and (
+                        reason := get_conflict(record.mgt_ip, record.name, record.interface, other, record.prefixed)
+                    ):
+                        conflicts.append({"reason": reason, "addresses": [record.to_dict(), other.to_dict()]})
+        return conflicts
+
+    def get_free_prefix(self, pool: str, prefixlen: int = 31):
+        """
+        Returns the first prefix of a pool not overlapping any configured prefix.
+        The prefix is not reserved, it is taken once configured.
+
+        Parameters:
+            pool (str): The pool, like 10.0.0.0/24.
+            prefixlen (int): The length of the prefix to allocate.
+
+        Returns:
+            IPv4Network or IPv6Network: The free prefix, None if the pool is full.
+
+        Raises:
+            ValueError: If the pool or the prefix length is invalid.
+        """
+        pool = ipaddress.ip_network(pool)
+        bits = pool.max_prefixlen
+        if not pool.prefixlen <= prefixlen <= bits:
+            raise ValueError(f"Prefix length must be between {pool.prefixlen} and {bits}.")
+        size = 1 << (bits - prefixlen)
+        version, cursor, _ = _key(pool)
+        pool_end = int(pool.broadcast_address)
+        with self._mutex:
+            sorted_networks = self._sorted[version]
+            # the pool itself is configured
+            if any(
+                self._networks.get((version, cursor & (((1 << length) - 1) << (bits - length)), length))
+                for length in range(pool.prefixlen + 1)
+            ):
+                return None
+            index = bisect.bisect_left(sorted_networks, (cursor, pool.prefixlen + 1))
+            for start, length, _ in itertools.islice(sorted_networks, index, None):
+                if start > pool_end:
+                    break
+                candidate = -(-cursor // size) * size
+                if candidate + size <= start:
+                    break
+                cursor = max(cursor, start + (1 << (bits - length)))
+        candidate = -(-cursor // size) * size
+        if candidate + size - 1 > pool_end:
+            return None
+        return ipaddress.ip_network((candidate, prefixlen))
+
+    def clear(self):
+        with self._mutex:
+            self._generations.clear()
+            self._devices.clear()
+            self._networks.clear()
+            self._sorted = {4: [], 6: []}
+            self._records.clear()
+
+
+ipam_index = IPAMIndex()
+
+
+def check_ip_conflicts(req_data_list: list, name_field: str = "name"):
+    """
+    Checks the ip_address of the request items against the addresses
+    configured in the fabric and in the other items.
+
+    Parameters:
+        req_data_list (list): The request items.
+        name_field (str): The field of the items naming the interface.
+
+    Returns:
+        Response: A response with status 409 and the conflicts, None if there are none.
+    """
+    candidates = [
+        (req_data.get("mgt_ip", ""), req_data.get(name_field), req_data.get("ip_address"))
+        for req_data in req_data_list if isinstance(req_data, dict) and req_data.get("ip_address")
+    ]
+    if not settings.IPAM_CONFLICT_CHECK or not candidates:
+        return None
+    try:
+        ipam_index.refresh()
+    except Exception as e:
+        _logger.warning(f"Skipped IP conflict check, Reason: {e}")
+        return None
+    conflicts = ipam_index.find_conflicts(candidates)
+    if not conflicts:
+        return None
+    msg = ", ".join(
+        f"{i['ip_address']} on {i['mgt_ip']} {i['name']}: {i['reason']} with "
+        f"{i['conflicts_with']['ip_address']} on {i['conflicts_with']['mgt_ip']} {i['conflicts_with']['name']}"
+        for i in conflicts
+    )
+    _logger.error(f"IP address conflicts: {msg}")
+    return Response({"status": f"IP address conflicts: {msg}", "conflicts": conflicts}, status=status.HTTP_409_CONFLICT)
+
+
+@api_view(["GET"])
+def ip_conflicts(request):
+    """
+    Returns the conflicting IP addresses configured in the fabric: duplicate
+    addresses, overlapping prefixes and subnets configured on several
+    interfaces of a device.
+
+    Returns:
+    - A Response object with the pairs of conflicting addresses and status 200.
+    - A Response object with status 204 if there are no conflicts.
+    """
+    ipam_index.refresh()
+    data = ipam_index.get_conflicts()
+    return (
+        Response(data, status=status.HTTP_200_OK)
+        if data
+        else Response({}, status=status.HTTP_204_NO_CONTENT)
+    )
+
+
+@api_view(["GET"])
+def free_prefix(request):
+    """
+    Returns the first prefix of a pool not overlapping any prefix configured
+    in the fabric.
+
+    Parameters:
+    - request: The request object, with the query parameters pool, like
+      10.0.0.0/24, and prefix_len, the length of the prefix, 31 by default.
+
+    Returns:
+    - A Response object with the pool and the free prefix and status 200.
+    - A Response object with status 400 if the pool or prefix_len is invalid.
+    - A Response object with status 404 if the pool is full.
+    """
+    pool = request.GET.get("pool", "")
+    try:
+        prefixlen = int(request.GET.get("prefix_len", 31))
+        ipam_index.refresh()
+        prefix = ipam_index.get_free_prefix(pool, prefixlen)
+    except ValueError as e:
+        _logger.error(f"Invalid pool {pool}, Reason: {e}")
+        return Response({"status": f"Invalid pool {pool}, Reason: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+    if prefix is None:
+        return Response({"status": f"No free /{prefixlen} in pool {pool}."}, status=status.HTTP_404_NOT_FOUND)
+    return Response({"pool": pool, "prefix": str(prefix)}, status=status.HTTP_200_OK)
@@ -11,7 +11,6 @@ from orca_nw_lib.mclag import (
     get_mclag_gw_mac,
     del_mclag_gw_mac,
     config_mclag_gw_mac,
-    get_mclag_mem_portchnls,
     config_mclag_mem_portchnl,
     del_mclag_member,
     remove_mclag_domain_fast_convergence,
@@ -20,6 +19,9 @@ from orca_nw_lib.mclag import (
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.bulk import run_per_device
+from network.members import get_device_mclag_members
 from network.util import (
     add_msg_to_list,
     get_failure_msg,
@@ -30,6 +32,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def device_mclag_list(request):
     """
@@ -60,11 +63,10 @@ def device_mclag_list(request):
         mclag_gateway_mac_details = get_mclag_gw_mac(device_ip)
 
         if data:
-            for i in data if isinstance(data, list) else [data]:
-                i["mclag_members"] = [
-                    mem["lag_name"]
-                    for mem in get_mclag_mem_portchnls(device_ip, i["domain_id"])
-                ]
+            mclags = data if isinstance(data, list) else [data]
+            members = get_device_mclag_members(device_ip)
+            for i in mclags:
+                i["mclag_members"] = members.get(i["domain_id"], [])
                 if len(mclag_gateway_mac_details):
                     i["gateway_mac"] = mclag_gateway_mac_details[0].get("gateway_mac")
         return (
@@ -73,20 +75,24 @@ def device_mclag_list(request):
             else Response({}, status=status.HTTP_204_NO_CONTENT)
         )
     if request.method == "DELETE":
-        for req_data in (
+        req_data_list = (
             request.data
             if isinstance(request.data, list)
             else [request.data] if request.data else []
-        ):
+        )
+        for req_data in req_data_list:
             device_ip = req_data.get("mgt_ip", "")
-            mclag_members = req_data.get("mclag_members", None)
-
             if not device_ip:
                 _logger.error("Required field device mgt_ip not found.")
                 return Response(
                     {"status": "Required field device mgt_ip not found."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+
+        def delete(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
             # delete the MCLAG
             try:
                 del_mclag(device_ip)
@@ -96,25 +102,19 @@ def device_mclag_list(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error("Error deleting MCLAG: %s", err)
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, delete)
 
     elif request.method == "PUT":
-        for req_data in (
+        req_data_list = (
             request.data
             if isinstance(request.data, list)
             else [request.data] if request.data else []
-        ):
+        )
+        for req_data in req_data_list:
             device_ip = req_data.get("mgt_ip", "")
             domain_id = req_data.get("domain_id", "")
-            src_addr = req_data.get("source_address", "")
-            peer_addr = req_data.get("peer_addr", "")
-            peer_link = req_data.get("peer_link", "")
-            mclag_sys_mac = req_data.get("mclag_sys_mac", "")
-            mclag_members = req_data.get("mclag_members", [])
-            fast_convergence = req_data.get("fast_convergence", None)
-            session_vrf = req_data.get("session_vrf", None)
-            keepalive_interval = req_data.get("keepalive_interval", 1)
-            session_timeout = req_data.get("session_timeout", 30)
-            delay_restore = req_data.get("delay_restore", 300)
 
             if not device_ip or not domain_id:
                 _logger.error("All of the required fields mgt_ip, domain_id not found.")
@@ -125,6 +125,21 @@ def device_mclag_list(request):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+        def config(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
+            domain_id = req_data.get("domain_id", "")
+            src_addr = req_data.get("source_address", "")
+            peer_addr = req_data.get("peer_addr", "")
+            peer_link = req_data.get("peer_link", "")
+            mclag_sys_mac = req_data.get("mclag_sys_mac", "")
+            mclag_members = req_data.get("mclag_members", [])
+            fast_convergence = req_data.get("fast_convergence", None)
+            session_vrf = req_data.get("session_vrf", None)
+            keepalive_interval = req_data.get("keepalive_interval", 1)
+            session_timeout = req_data.get("session_timeout", 30)
+            delay_restore = req_data.get("delay_restore", 300)
             if domain_id:
                 try:
                     config_mclag(
@@ -168,6 +183,9 @@ def device_mclag_list(request):
                     add_msg_to_list(result, get_failure_msg(err, request))
                     http_status = http_status and False
                     _logger.error("Error configuring MCLAG gateway MAC: %s", err)
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, config)
 
     return Response(
         {"result": result},
@@ -178,6 +196,7 @@ def device_mclag_list(request):
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def mclag_gateway_mac(request):
     """
@@ -0,0 +1,85 @@
+""" Members of the VLANs, port channels and MCLAGs of a device, read with one graph query per device. """
+from orca_nw_lib.common import IFMode
+
+# The members of all the items of a device, instead of a lookup per item.
+# Relationship types of the orca_nw_lib graph models: a device HAS its items
+# and the members of an item are MEMBER_IF, the peer link of an MCLAG domain
+# is a PEER_LINK and not one of its members.
+VLAN_MEMBERS_QUERY = """
+MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(vlan:Vlan)-[mem:MEMBER_IF]->(member)
+WHERE member:Interface OR member:PortChannel
+RETURN vlan.name, coalesce(member.name, member.lag_name), mem.tagging_mode
+"""
+PORT_CHNL_MEMBERS_QUERY = """
+MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(chnl:PortChannel)-[:MEMBER_IF]->(member:Interface)
+RETURN chnl.lag_name, member.name
+"""
+MCLAG_MEMBERS_QUERY = """
+MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(mclag:MCLAG)-[:MEMBER_IF]->(member:PortChannel)
+RETURN mclag.domain_id, member.lag_name
+"""
+
+
+def run_query(query: str, **params) -> list:
+    """
+    Runs a read query on the graph database of the discovered devices.
+
+    Parameters:
+        query (str): The Cypher query.
+        params: The parameters of the query.
+
+    Returns:
+        list: The rows of the result.
+    """
+    from neomodel import db
+    rows, _ = db.cypher_query(query, params)
+    return rows
+
+
+def get_device_vlan_members(device_ip: str) -> dict:
+    """
+    Returns the member interfaces and port channels of all the VLANs of a device.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        dict: The members of each VLAN name, with their tagging mode or None if it is not set.
+    """
+    members = {}
+    for vlan_name, mem_if, if_mode in run_query(VLAN_MEMBERS_QUERY, device_ip=device_ip):
+        if_mode = IFMode.get_enum_from_str(if_mode) if if_mode else None
+        members.setdefault(vlan_name, {})[mem_if] = str(if_mode) if if_mode else None
+    return members
+
+
+def get_device_port_chnl_members(device_ip: str) -> dict:
+    """
+    Returns the member interfaces of all the port channels of a device.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        dict: The member interface names of each port channel name.
+    """
+    members = {}
+    for lag_name, if_name in run_query(PORT_CHNL_MEMBERS_QUERY, device_ip=device_ip):
+        members.setdefault(lag_name, []).append(if_name)
+    return members
+
+
+def get_device_mclag_members(device_ip: str) -> dict:
+    """
+    Returns the member port channels of all the MCLAG domains of a device.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        dict: The member port channel names of each domain id.
+    """
+    members = {}
+    for domain_id, lag_name in run_query(MCLAG_MEMBERS_QUERY, device_ip=device_ip):
+        members.setdefault(domain_id, []).append(lag_name)
+    return members
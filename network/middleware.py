@@ -0,0 +1,68 @@
+from django.urls import Resolver404, resolve
+
+from network.cache import ALL_DEVICES, invalidate_all, invalidate_device
+from orca_backend.parsers import parse_body
+
+# Apps of the views changing the devices.
+DEVICE_APPS = ("network.", "orca_setup.")
+# Url names of the views of DEVICE_APPS reading the devices with other methods than GET.
+READ_ONLY_ROUTES = ("batch",)
+
+
+class CacheInvalidationMiddleware:
+    """
+    Middleware invalidating the cached GET responses of the devices changed by
+    a request, see network.cache.cache_get.
+
+    Only the requests to the views of DEVICE_APPS, but READ_ONLY_ROUTES,
+    invalidate the cache. The
+    devices are read from the mgt_ip, device_ips and address fields of the
+    body, in any format of DEFAULT_PARSER_CLASSES, a request changing no known
+    device invalidates all of them.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in ("GET", "HEAD", "OPTIONS") or not self._changes_devices(request):
+            return self.get_response(request)
+        device_ips = self._get_device_ips(request)
+        response = self.get_response(request)
+        if device_ips and ALL_DEVICES not in device_ips:
+            invalidate_device(*device_ips)
+        else:
+            invalidate_all()
+        return response
+
+    @staticmethod
+    def _changes_devices(request) -> bool:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return False
+        return match.func.__module__.startswith(DEVICE_APPS) and match.url_name not in READ_ONLY_ROUTES
+
+    @staticmethod
+    def _get_device_ips(request) -> set:
+        """
+        Returns the IP addresses of the devices in the body of the request.
+
+        Parameters:
+            request (HttpRequest): The HTTP request object.
+
+        Returns:
+            set: The device IP addresses, empty if the body has none.
+        """
+        body = parse_body(request)
+        device_ips = set()
+        for item in body if isinstance(body, list) else [body]:
+            if not isinstance(item, dict):
+                continue
+            for field in ("mgt_ip", "device_ips", "address"):
+                value = item.get(field)
+                if isinstance(value, str) and value:
+                    device_ips.add(value)
+                elif isinstance(value, list):
+                    device_ips.update(i for i in value if isinstance(i, str) and i)
+        return device_ips
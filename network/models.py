@@ -4,7 +4,72 @@ from django.db import models
 class ReDiscoveryConfig(models.Model):
 
     device_ip = models.CharField(max_length=64, primary_key=True)
+    # interval configured by the user
     interval = models.IntegerField()
     last_discovered = models.DateTimeField(null=True)
+    # adapt the interval to how often the device changes, see network.scheduler
+    adaptive = models.BooleanField(default=False)
+    # interval adapted by the scheduler, used instead of interval while adaptive
+    adapted_interval = models.IntegerField(null=True)
+    state_hash = models.CharField(max_length=64, default="")
+    # last rediscoveries, with their time, whether they found changes and the interval after them
+    history = models.JSONField(default=list)
+
+    objects = models.Manager()
+
+
+class SchedulerLease(models.Model):
+    """
+    Lease of a singleton role among the backend processes, like running the
+    rediscovery scheduler, held by owner until expires_at unless renewed.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    owner = models.CharField(max_length=255)
+    expires_at = models.DateTimeField()
+
+    objects = models.Manager()
+
+
+class DiscoveryFingerprint(models.Model):
+    """
+    Fingerprints of the features of a device at its last discovery, see
+    network.fingerprint.
+    """
+
+    device_ip = models.CharField(max_length=64, primary_key=True)
+    # feature name -> fingerprint
+    fingerprints = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(null=True)
+
+    objects = models.Manager()
+
+
+class DiscoveryRun(models.Model):
+    """
+    Statistics of a discovery of a device, full or of the features changed
+    since the last one.
+    """
+
+    device_ip = models.CharField(max_length=64, db_index=True)
+    started_at = models.DateTimeField()
+    duration = models.FloatField(default=0)
+    full = models.BooleanField(default=False)
+    executed = models.JSONField(default=list)
+    skipped = models.JSONField(default=list)
+    failed = models.JSONField(default=list)
+
+    objects = models.Manager()
+
+
+class CacheGeneration(models.Model):
+    """
+    Change generation of a device, shared by the web, Celery and scheduler
+    processes so that a change made by any of them invalidates the cached
+    responses of all the others, see network.cache.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField()
 
     objects = models.Manager()
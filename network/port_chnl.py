@@ -7,7 +7,6 @@ from orca_nw_lib.port_chnl import (
     get_port_chnl,
     add_port_chnl,
     del_port_chnl,
-    get_port_chnl_members,
     add_port_chnl_mem,
     del_port_chnl_mem,
     remove_port_chnl_ip,
@@ -16,6 +15,11 @@ from orca_nw_lib.port_chnl import (
 )
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.bulk import run_per_device
+from network.members import get_device_port_chnl_members
+from network.ipam import check_ip_conflicts
+from network.query import InvalidQuery, ListQuery
 from network.util import add_msg_to_list, get_failure_msg, get_success_msg
 from orca_nw_lib.port_chnl import add_port_chnl_vlan_members
 
@@ -24,6 +28,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def device_port_chnl_list(request):
     """
@@ -56,18 +61,20 @@ def device_port_chnl_list(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         port_chnl_name = request.GET.get("lag_name", "")
+        try:
+            query = ListQuery(request.GET, key="lag_name")
+        except InvalidQuery as e:
+            _logger.error(str(e))
+            return Response({"status": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         data = get_port_chnl(device_ip, port_chnl_name)
-
-        for chnl in data if isinstance(data, list) else [data] if data else []:
-            chnl["members"] = [
-                intf["name"]
-                for intf in get_port_chnl_members(device_ip, chnl["lag_name"])
-            ]
-        return (
-            Response(data, status=status.HTTP_200_OK)
-            if data
-            else Response({}, status=status.HTTP_204_NO_CONTENT)
-        )
+        # before the selection, the members can be filtered on
+        if query.selects("members"):
+            chnls = data if isinstance(data, list) else [data] if data else []
+            members = get_device_port_chnl_members(device_ip) if chnls else {}
+            for chnl in chnls:
+                chnl["members"] = members.get(chnl["lag_name"], [])
+        data, next_cursor = query.select(data)
+        return query.get_response(data, next_cursor)
 
     if request.method == "PUT":
         req_data_list = (
@@ -87,6 +94,13 @@ def device_port_chnl_list(request):
                     {"status": "Required field device lag_name not found."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
+        if conflict_response := check_ip_conflicts(req_data_list, name_field="lag_name"):
+            return conflict_response
+
+        def config(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
             try:
                 add_port_chnl(
                     device_ip,
@@ -143,6 +157,9 @@ def device_port_chnl_list(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error(f"Failed to add port channel vlan members: {err}",)
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, config)
 
     elif request.method == "DELETE":
         req_data_list = (
@@ -157,6 +174,10 @@ def device_port_chnl_list(request):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
+        def delete(req_data):
+            result = []
+            http_status = True
+            device_ip = req_data.get("mgt_ip", "")
             try:
                 del_port_chnl(device_ip, req_data.get("lag_name"))
                 add_msg_to_list(result, get_success_msg(request))
@@ -165,6 +186,9 @@ def device_port_chnl_list(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error("Failed to delete port channel: %s", req_data.get("lag_name"))
+            return result, http_status
+
+        result, http_status = run_per_device(req_data_list, delete)
 
     return Response(
         {"result": result},
@@ -11,6 +11,7 @@ from orca_nw_lib.portgroup import (
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
 from network.util import (
     add_msg_to_list,
     get_failure_msg,
@@ -21,6 +22,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT"])
+@cache_get
 @log_request
 def port_groups(request):
     """
@@ -98,6 +100,7 @@ def port_groups(request):
         "GET",
     ]
 )
+@cache_get
 def port_group_members(request):
     """
     This function handles the API view for listing port group members.
@@ -133,6 +136,7 @@ def port_group_members(request):
         "GET",
     ]
 )
+@cache_get
 def port_group_from_intfc_name(request):
     """
     This function handles the API view for listing port group members.
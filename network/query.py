@@ -0,0 +1,200 @@
+""" Sparse fieldsets, filtering and pagination of the network list GETs. """
+import base64
+import re
+
+from rest_framework import status
+from rest_framework.response import Response
+
+FILTER_OPERATORS = {
+    "exact": lambda value, arg: value == arg,
+    "ne": lambda value, arg: value != arg,
+    "startswith": lambda value, arg: value.startswith(arg),
+    "endswith": lambda value, arg: value.endswith(arg),
+    "contains": lambda value, arg: arg in value,
+    "in": lambda value, arg: value in arg.split("|"),
+}
+
+
+# Query parameters of ListQuery, and of the content negotiation.
+RESERVED_PARAMS = ("fields", "filter", "limit", "cursor", "format")
+
+
+class InvalidQuery(ValueError):
+    pass
+
+
+def natural_key(value) -> tuple:
+    """
+    Returns the sort key of a name, comparing its numbers by value so that
+    Ethernet2 sorts before Ethernet10.
+    """
+    return tuple(
+        (0, int(part), "") if part.isdigit() else (1, 0, part)
+        for part in re.split(r"(\d+)", str(value)) if part
+    )
+
+
+class ListQuery:
+    """
+    The fields, filter, limit and cursor query parameters of a list GET.
+
+    - fields: comma separated names of the fields to return.
+    - filter: field[__operator]=value, can be repeated, the operators are
+      exact (default), ne, startswith, endswith, contains and in (values
+      separated by |). Values are compared as case-insensitive strings,
+      booleans as true/false. The members of a list, or the keys of a dict,
+      are compared one by one and the item matches if one of them does,
+      contains matching a whole member and ne none of them.
+    - limit: maximum number of items, sorted by key, returned with the cursor
+      of the next page as {"results": [...], "next_cursor": ...}.
+    - cursor: the next_cursor of the previous page.
+
+    Without any of these parameters the data is returned as it is.
+
+    Parameters:
+        params (QueryDict): The query parameters.
+        key (str): The field identifying the items, used to sort and paginate them.
+        other_filters (bool): Whether the other query parameters are filters
+            too, like oper_sts=down, for the views having no other parameters.
+
+    Raises:
+        InvalidQuery: If a parameter is malformed.
+    """
+
+    def __init__(self, params, key: str, other_filters: bool = False):
+        self.key = key
+        self.fields = [i.strip() for i in params.get("fields", "").split(",") if i.strip()]
+        self.filters = [self._parse_filter(i) for i in params.getlist("filter") if i]
+        if other_filters:
+            self.filters += [
+                self._parse_filter(f"{name}={value}")
+                for name, values in params.lists() if name not in RESERVED_PARAMS
+                for value in values
+            ]
+        self.limit = self._parse_limit(params.get("limit"))
+        self.cursor = self._decode_cursor(params["cursor"]) if params.get("cursor") else None
+
+    @property
+    def paginated(self) -> bool:
+        return self.limit is not None or self.cursor is not None
+
+    def selects(self, field: str) -> bool:
+        """
+        Returns whether the field is returned or filtered on, to skip computing
+        unused fields. The fields computed by the view must be set before select.
+        """
+        return not self.fields or field in self.fields or any(f[0] == field for f in self.filters)
+
+    def select(self, data) -> tuple:
+        """
+        Filters and paginates the items.
+
+        Parameters:
+            data (list): The items returned by orca_nw_lib, a single dict or None.
+
+        Returns:
+            tuple: The selected items and the cursor of the next page, None on the last page.
+        """
+        if not (self.filters or self.paginated):
+            return data, None
+        items = data if isinstance(data, list) else [data] if data else []
+        items = [i for i in items if all(self._matches(i, *f) for f in self.filters)]
+        if not self.paginated:
+            return items, None
+        items = sorted(items, key=lambda i: natural_key(i.get(self.key)))
+        if self.cursor is not None:
+            cursor_key = natural_key(self.cursor)
+            items = [i for i in items if natural_key(i.get(self.key)) > cursor_key]
+        if self.limit is not None and len(items) > self.limit:
+            items = items[:self.limit]
+            return items, self._encode_cursor(items[-1].get(self.key))
+        return items, None
+
+    def get_response(self, data, next_cursor: str = None) -> Response:
+        """
+        Returns the response of the items selected by select, with only the requested fields.
+
+        Parameters:
+            data (list): The selected items.
+            next_cursor (str): The cursor of the next page.
+
+        Returns:
+            Response: The HTTP response object.
+        """
+        data = self.project(data)
+        if self.paginated:
+            return Response({"results": data, "next_cursor": next_cursor}, status=status.HTTP_200_OK)
+        return (
+            Response(data, status=status.HTTP_200_OK)
+            if data
+            else Response({}, status=status.HTTP_204_NO_CONTENT)
+        )
+
+    def project(self, data):
+        """
+        Returns the items with only the requested fields.
+
+        Parameters:
+            data (list): The items, a single dict or None.
+
+        Returns:
+            list: The projected items, or dict for a single one.
+        """
+        if not self.fields or not data:
+            return data
+        if isinstance(data, list):
+            return [self._project(i) for i in data]
+        return self._project(data)
+
+    def _project(self, item: dict) -> dict:
+        return {field: item[field] for field in self.fields if field in item}
+
+    @classmethod
+    def _matches(cls, item: dict, field: str, operator: str, arg: str) -> bool:
+        if field not in item:
+            return False
+        value = item[field]
+        arg = arg.lower()
+        if isinstance(value, (dict, list, tuple, set)):
+            members = [cls._normalize(i) for i in value]
+            if operator == "ne":
+                return arg not in members
+            operator = "exact" if operator == "contains" else operator
+            return any(FILTER_OPERATORS[operator](i, arg) for i in members)
+        return FILTER_OPERATORS[operator](cls._normalize(value), arg)
+
+    @staticmethod
+    def _normalize(value) -> str:
+        return str(value).lower()
+
+    @staticmethod
+    def _parse_filter(value: str) -> tuple:
+        lookup, sep, arg = value.partition("=")
+        field, _, operator = lookup.partition("__")
+        operator = operator or "exact"
+        if not sep or not field or operator not in FILTER_OPERATORS:
+            raise InvalidQuery(f"Invalid filter: {value}")
+        return field, operator, arg
+
+    @staticmethod
+    def _parse_limit(value):
+        if value is None:
+            return None
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise InvalidQuery(f"Invalid limit: {value}")
+        return limit
+
+    @staticmethod
+    def _encode_cursor(value) -> str:
+        return base64.urlsafe_b64encode(str(value).encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> str:
+        try:
+            return base64.b64decode(cursor.encode(), altchars=b"-_", validate=True).decode()
+        except ValueError as e:
+            raise InvalidQuery(f"Invalid cursor: {cursor}") from e
@@ -1,35 +1,276 @@
+import atexit
 import datetime
+import hashlib
+import json
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
 from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from log_manager.logger import get_backend_logger
-from orca_nw_lib.discovery import discover_device
-from network.models import ReDiscoveryConfig
-from state_manager.models import ORCABusyState, State
+from network.cache import invalidate_device
+from network.fabric import FABRIC_FEATURES
+from network.fingerprint import discover_changed
+from network.models import ReDiscoveryConfig, SchedulerLease
+from state_manager.locks import device_locks
+from state_manager.models import State
 
 _logger = get_backend_logger()
 scheduler = BackgroundScheduler()
 
+LEASE_NAME = "rediscovery_scheduler"
+LEASE_JOB_ID = "scheduler_lease"
+JOB_PREFIX = "job_"
+BATCH_JOB_ID = "discovery_batch"
+# Owner of the lease, unique to this process.
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
 
-def add_scheduler(device_ip, interval):
-    """ Adds a new scheduler job for the given device.
+_leader = threading.Event()
+_start_mutex = threading.Lock()
+# devices due for discovery, waiting for the next batch
+_pending = set()
+_pending_mutex = threading.Lock()
+
+
+def get_phase_offset(device_ip: str, interval: int) -> int:
+    """
+    Returns the phase of the discoveries of a device in its interval, derived
+    from its IP address, so that the devices with the same interval are spread
+    over it instead of being discovered at the same time, and keep their phase
+    across restarts.
+
+    The offset is a multiple of REDISCOVERY_TICK, the devices due in the same
+    tick are discovered together in a batch, see run_discoveries.
 
     Args:
         device_ip (str): Device IP address.
         interval (int): Interval in minutes.
 
     Returns:
-        None
+        int: The offset in seconds, between 0 and the interval.
+    """
+    period = int(interval) * 60
+    offset = int(hashlib.sha1(device_ip.encode()).hexdigest(), 16) % period
+    return offset - offset % min(settings.REDISCOVERY_TICK, period)
+
+
+def get_trigger(device_ip: str, interval: int) -> IntervalTrigger:
+    """
+    Returns the trigger of the discoveries of a device, firing every interval
+    minutes at its phase offset.
+
+    Args:
+        device_ip (str): Device IP address.
+        interval (int): Interval in minutes.
+
+    Returns:
+        IntervalTrigger: The trigger.
+    """
+    start_date = datetime.datetime.fromtimestamp(get_phase_offset(device_ip, interval), tz=datetime.timezone.utc)
+    return IntervalTrigger(minutes=int(interval), start_date=start_date, timezone=datetime.timezone.utc)
+
+
+def get_next_run_time(device_ip: str, interval: int, last_discovered=None, now=None) -> datetime.datetime:
+    """
+    Returns the time of the next discovery of a device.
+
+    A device not discovered for a whole interval, like after a restart, is
+    caught up once, at its phase offset scaled to REDISCOVERY_CATCHUP_WINDOW,
+    so that the overdue devices are not all discovered at once. Otherwise the
+    device is discovered at the next time of its trigger.
+
+    Args:
+        device_ip (str): Device IP address.
+        interval (int): Interval in minutes.
+        last_discovered (datetime): The time of the last discovery of the device.
+        now (datetime): The current time.
+
+    Returns:
+        datetime: The time of the next discovery.
+    """
+    now = now or datetime.datetime.now(tz=datetime.timezone.utc)
+    period = int(interval) * 60
+    if last_discovered is None or (now - last_discovered).total_seconds() >= period:
+        window = min(settings.REDISCOVERY_CATCHUP_WINDOW, period)
+        offset = get_phase_offset(device_ip, interval) * window // period
+        return now + datetime.timedelta(seconds=offset - offset % min(settings.REDISCOVERY_TICK, window or 1))
+    return get_trigger(device_ip, interval).get_next_fire_time(None, now)
+
+
+def acquire_lease(owner: str = INSTANCE_ID, now=None) -> bool:
+    """
+    Takes or renews the lease of the rediscovery scheduler, shared by all the
+    processes using the same database.
+
+    Args:
+        owner (str): The process taking the lease.
+        now (datetime): The current time.
+
+    Returns:
+        bool: True if the owner holds the lease for REDISCOVERY_LEASE_TTL seconds.
+    """
+    now = now or datetime.datetime.now(tz=datetime.timezone.utc)
+    expires_at = now + datetime.timedelta(seconds=settings.REDISCOVERY_LEASE_TTL)
+    if SchedulerLease.objects.filter(Q(owner=owner) | Q(expires_at__lt=now), name=LEASE_NAME).update(
+        owner=owner, expires_at=expires_at
+    ):
+        return True
+    try:
+        with transaction.atomic():
+            SchedulerLease.objects.create(name=LEASE_NAME, owner=owner, expires_at=expires_at)
+    except IntegrityError:
+        return False
+    return True
+
+
+def release_lease(owner: str = INSTANCE_ID):
+    """
+    Releases the lease of the rediscovery scheduler, if held by the owner.
+
+    Args:
+        owner (str): The process holding the lease.
+    """
+    SchedulerLease.objects.filter(name=LEASE_NAME, owner=owner).delete()
+
+
+def is_leader() -> bool:
+    """
+    Returns whether this process holds the lease and runs the discoveries.
+    """
+    return _leader.is_set()
+
+
+def renew_leadership():
     """
+    Renews the lease of this process, run every third of REDISCOVERY_LEASE_TTL.
+
+    Only the process holding the lease, the leader, has discovery jobs, so that
+    the devices are not discovered by every process. The leader syncs its jobs
+    with ReDiscoveryConfig, picking up the changes made through the other
+    processes, and drops them once it loses the lease.
+    """
+    try:
+        leader = acquire_lease()
+    except Exception as e:
+        _logger.error(f"Failed to renew the rediscovery scheduler lease, Reason: {e}")
+        leader = False
+    if leader:
+        if not _leader.is_set():
+            _logger.info("Process %s is now running the rediscovery scheduler.", INSTANCE_ID)
+            _leader.set()
+        sync_schedulers()
+    elif _leader.is_set():
+        _logger.info("Process %s stopped running the rediscovery scheduler.", INSTANCE_ID)
+        _leader.clear()
+        for job in scheduler.get_jobs():
+            if job.id.startswith(JOB_PREFIX):
+                scheduler.remove_job(job.id)
+
+
+def start_scheduler():
+    """
+    Starts the scheduler of this process, if not running, and competes for the
+    lease, see renew_leadership.
+
+    Raises:
+        ImproperlyConfigured: If the device locks are not shared between the
+            processes, as the leader may not be the process serving the
+            requests, which would not see the devices locked by the
+            scheduled discoveries.
+    """
+    if settings.DEVICE_LOCK_BACKEND == "memory":
+        raise ImproperlyConfigured(
+            "The rediscovery scheduler requires a shared DEVICE_LOCK_BACKEND, \"database\" or \"redis\"."
+        )
+    with _start_mutex:
+        if scheduler.running:
+            return
+        scheduler.start()
+        renew_leadership()
+        scheduler.add_job(
+            func=renew_leadership,
+            trigger="interval",
+            seconds=settings.REDISCOVERY_LEASE_TTL / 3,
+            max_instances=1,
+            coalesce=True,
+            id=LEASE_JOB_ID,
+            replace_existing=True,
+        )
+        atexit.register(stop_scheduler)
+
+
+def stop_scheduler():
+    """
+    Stops the scheduler of this process and releases its lease, so that
+    another process takes over without waiting for it to expire.
+    """
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
+    if _leader.is_set():
+        _leader.clear()
+        try:
+            release_lease()
+        except Exception as e:
+            _logger.error(f"Failed to release the rediscovery scheduler lease, Reason: {e}")
+
+
+def _add_job(device_ip, interval, last_discovered=None):
     scheduler.add_job(
         func=scheduled_discovery,
-        trigger='interval',
-        minutes=interval,
+        trigger=get_trigger(device_ip, interval),
+        next_run_time=get_next_run_time(device_ip, interval, last_discovered),
         max_instances=1,
+        coalesce=True,
         args=[device_ip],
-        id=f"job_{device_ip}",
+        id=f"{JOB_PREFIX}{device_ip}",
         replace_existing=True
     )
-    if not scheduler.running:
-        scheduler.start()
+
+
+def add_scheduler(device_ip, interval, last_discovered=None):
+    """ Adds a new scheduler job for the given device.
+
+    The job is added only by the leader, another process leaves it to the
+    leader, which picks up the ReDiscoveryConfig of the device when renewing
+    its lease.
+
+    Args:
+        device_ip (str): Device IP address.
+        interval (int): Interval in minutes.
+        last_discovered (datetime): The time of the last discovery of the device.
+
+    Returns:
+        None
+    """
+    start_scheduler()
+    if is_leader():
+        _add_job(device_ip, interval, last_discovered)
+
+
+def sync_schedulers():
+    """
+    Adds the scheduler jobs of the devices added to ReDiscoveryConfig or whose
+    interval changed, and removes the ones of the devices removed from it.
+
+    Returns:
+        None
+    """
+    configs = {f"{JOB_PREFIX}{obj.device_ip}": obj for obj in ReDiscoveryConfig.objects.all()}
+    jobs = {job.id: job for job in scheduler.get_jobs() if job.id.startswith(JOB_PREFIX)}
+    for job_id in set(jobs) - set(configs):
+        scheduler.remove_job(job_id)
+    for job_id, obj in configs.items():
+        job = jobs.get(job_id)
+        interval = get_interval(obj)
+        if job is None or job.trigger.interval != datetime.timedelta(minutes=interval):
+            _add_job(obj.device_ip, interval, obj.last_discovered)
 
 
 def remove_scheduler(device_ip):
@@ -42,32 +283,189 @@ def remove_scheduler(device_ip):
     Returns:
         None
     """
-    job_id = f"job_{device_ip}"
+    job_id = f"{JOB_PREFIX}{device_ip}"
     jobs = scheduler.get_jobs()
     if job_id in [job.id for job in jobs]:
-        scheduler.remove_job(f"job_{device_ip}")
+        scheduler.remove_job(job_id)
 
 
 def scheduled_discovery(device_ip: str):
     """
     Schedules discovery for the given device.
 
+    The device is discovered with the other devices due within
+    REDISCOVERY_BATCH_WINDOW seconds, see run_discoveries.
+
     Args:
         device_ip (str): Device IP address.
 
     Returns:
         None
     """
+    if not is_leader():
+        return
+    with _pending_mutex:
+        _pending.add(device_ip)
+        if scheduler.get_job(BATCH_JOB_ID) is None:
+            scheduler.add_job(
+                func=run_discoveries,
+                trigger="date",
+                run_date=datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(
+                    seconds=settings.REDISCOVERY_BATCH_WINDOW
+                ),
+                id=BATCH_JOB_ID,
+            )
+
+
+def run_discoveries():
+    """
+    Discovers the devices due since the last batch.
+
+    Returns:
+        None
+    """
+    with _pending_mutex:
+        device_ips = sorted(_pending)
+        _pending.clear()
+    if is_leader() and device_ips:
+        discover_devices(device_ips)
+
+
+def discover_devices(device_ips: list) -> list:
+    """
+    Discovers the given devices in batches of at most REDISCOVERY_BATCH_SIZE
+    devices, at most REDISCOVERY_MAX_WORKERS batches at a time, so that the
+    devices due together share the setup of one discovery instead of paying
+    it each. Each device is locked while discovered, the busy ones are skipped.
+    Only the features of a device changed since its last discovery are
+    discovered again, see network.fingerprint.discover_changed.
+
+    Args:
+        device_ips (list): The IP addresses of the devices.
+
+    Returns:
+        list: The IP addresses of the discovered devices.
+    """
+    adaptive = set(
+        ReDiscoveryConfig.objects.filter(device_ip__in=device_ips, adaptive=True).values_list("device_ip", flat=True)
+    )
+    locked = []
+    for device_ip in device_ips:
+        if device_locks.acquire({device_ip: State.SCHEDULED_DISCOVERY_IN_PROGRESS}) is None:
+            locked.append(device_ip)
+        else:
+            _logger.info("Skipped scheduled discovery of busy device %s.", device_ip)
+    size = settings.REDISCOVERY_BATCH_SIZE
+    batches = [locked[i:i + size] for i in range(0, len(locked), size)]
+    concurrent = len(batches) > 1 and settings.REDISCOVERY_MAX_WORKERS > 1
+
+    def discover_batch(batch: list) -> list:
+        try:
+            try:
+                runs = discover_changed(batch)
+            except Exception as e:
+                _logger.error(f"Failed to schedule discovery on devices {batch}, Reason: {e}")
+                runs = {}
+            discovered = [device_ip for device_ip, run in runs.items() if not (run["full"] and run["failed"])]
+            for device_ip in discovered:
+                if runs[device_ip]["executed"]:
+                    invalidate_device(device_ip)
+            return {
+                device_ip: get_state_hash(device_ip) if device_ip in adaptive else ""
+                for device_ip in discovered
+            }
+        finally:
+            device_locks.release(batch)
+            if concurrent:
+                connection.close()
+
+    if concurrent:
+        with ThreadPoolExecutor(max_workers=min(len(batches), settings.REDISCOVERY_MAX_WORKERS)) as executor:
+            results = list(executor.map(discover_batch, batches))
+    else:
+        results = [discover_batch(batch) for batch in batches]
+    state_hashes = {device_ip: state_hash for result in results for device_ip, state_hash in result.items()}
+    _logger.info(
+        "Scheduled discovery of %d of %d devices in %d batches.", len(state_hashes), len(device_ips), len(batches)
+    )
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    # the busy and failed devices keep their last discovery, they are still due
+    configs = list(ReDiscoveryConfig.objects.filter(device_ip__in=state_hashes))
+    for config in configs:
+        config.last_discovered = now
+        if config.adaptive and state_hashes.get(config.device_ip) and adapt_interval(
+            config, state_hashes[config.device_ip], now
+        ) and is_leader():
+            _add_job(config.device_ip, get_interval(config), now)
+    ReDiscoveryConfig.objects.bulk_update(configs, ["last_discovered", "adapted_interval", "state_hash", "history"])
+    return list(state_hashes)
+
+
+def get_state_hash(device_ip: str) -> str:
+    """
+    Returns a hash of the discovered state of a device, the items of all its
+    FABRIC_FEATURES, empty if it can not be read.
+
+    Args:
+        device_ip (str): Device IP address.
+
+    Returns:
+        str: The SHA-1 hex digest of the state.
+    """
+    digest = hashlib.sha1()
     try:
-        state_obj = ORCABusyState.objects.filter(device_ip=device_ip).first()
-        if state_obj is None:
-            ORCABusyState.update_state(device_ip, State.SCHEDULED_DISCOVERY_IN_PROGRESS)
-            discover_device(device_ips=[device_ip])
+        for name, feature in FABRIC_FEATURES.items():
+            digest.update(json.dumps([name, feature.get_items(device_ip)], sort_keys=True, default=str).encode())
     except Exception as e:
-        _logger.error(f"Failed to schedule discovery on device {device_ip}, Reason: {e}")
-    finally:
-        ORCABusyState.objects.filter(device_ip=device_ip).delete()
-        rediscovery_obj = ReDiscoveryConfig.objects.filter(device_ip=device_ip).first()
-        if rediscovery_obj:
-            rediscovery_obj.last_discovered = datetime.datetime.now(tz=datetime.timezone.utc)
-            rediscovery_obj.save()
+        _logger.error(f"Failed to read the state of device {device_ip}, Reason: {e}")
+        return ""
+    return digest.hexdigest()
+
+
+def get_interval(config: ReDiscoveryConfig) -> int:
+    """
+    Returns the interval of the rediscoveries of a device, the adapted one
+    while adaptive, else the one configured by the user.
+
+    Args:
+        config (ReDiscoveryConfig): The config of the device.
+
+    Returns:
+        int: Interval in minutes.
+    """
+    if config.adaptive and config.adapted_interval:
+        return config.adapted_interval
+    return int(config.interval)
+
+
+def adapt_interval(config: ReDiscoveryConfig, state_hash: str, now: datetime.datetime) -> bool:
+    """
+    Adapts the interval of an adaptive device to the outcome of its last
+    rediscovery: halved if it found changes and increased by half if not,
+    between REDISCOVERY_MIN_INTERVAL and REDISCOVERY_MAX_INTERVAL, so that
+    quiet devices are rediscovered less often and busy ones more often. The
+    adapted interval is kept apart from the one configured by the user, which
+    applies again when the device is not adaptive anymore. The outcome is
+    added to the history of the device.
+
+    Args:
+        config (ReDiscoveryConfig): The config of the device, updated but not saved.
+        state_hash (str): The hash of the discovered state, see get_state_hash.
+        now (datetime): The time of the rediscovery.
+
+    Returns:
+        bool: True if the interval changed.
+    """
+    previous = get_interval(config)
+    # nothing to compare the first state with
+    changed = state_hash != config.state_hash if config.state_hash else None
+    if changed is not None:
+        interval = max(previous // 2, 1) if changed else previous + max(previous // 2, 1)
+        config.adapted_interval = min(
+            max(interval, settings.REDISCOVERY_MIN_INTERVAL), settings.REDISCOVERY_MAX_INTERVAL
+        )
+    config.state_hash = state_hash
+    interval = get_interval(config)
+    history = (config.history or []) + [{"time": now.isoformat(), "changed": changed, "interval": interval}]
+    config.history = history[-settings.REDISCOVERY_HISTORY_SIZE:]
+    return interval != previous
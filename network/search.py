@@ -0,0 +1,266 @@
+""" Index of the IPs, MACs and descriptions of all the discovered devices. """
+import bisect
+import itertools
+import re
+import threading
+
+from orca_nw_lib.device import get_device_details
+from orca_nw_lib.interface import get_interface, get_subinterfaces
+from orca_nw_lib.port_chnl import get_port_chnl
+from orca_nw_lib.vlan import get_vlan
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from log_manager.logger import get_backend_logger
+from network.bulk import map_concurrent
+from network.cache import ALL_DEVICES, RESET, get_generations
+
+_logger = get_backend_logger()
+
+
+class SearchSource:
+    """
+    Describes the searchable items of a device.
+
+    Parameters:
+        get_items (callable): Returns the items of a device IP.
+        key (str): The field naming the items.
+        fields (tuple): The indexed fields.
+    """
+
+    def __init__(self, get_items, key: str, fields: tuple):
+        self.get_items = get_items
+        self.key = key
+        self.fields = fields
+
+
+SEARCH_SOURCES = {
+    "device": SearchSource(get_device_details, "mgt_ip", ("mgt_ip", "mac", "hostname")),
+    "interface": SearchSource(
+        lambda device_ip: get_interface(device_ip, ""), "name", ("name", "alias", "description", "mac_addr")
+    ),
+    "subinterface": SearchSource(
+        lambda device_ip: get_subinterfaces(device_ip, ""), "name", ("ip_address",)
+    ),
+    "vlan": SearchSource(
+        lambda device_ip: get_vlan(device_ip, ""), "name", ("name", "description", "ip_address", "sag_ip_address")
+    ),
+    "port_chnl": SearchSource(
+        lambda device_ip: get_port_chnl(device_ip, ""), "lag_name", ("lag_name", "description", "ip_address")
+    ),
+}
+
+_separators = re.compile(r"[^0-9a-z.:_\-]+")
+
+
+def tokenize(value) -> list:
+    """
+    Returns the search tokens of a value, its lower cased words, IPs and MACs,
+    e.g. 10.20.3.4 and 24 for the prefix 10.20.3.4/24.
+    """
+    return [token for token in _separators.split(str(value).lower()) if token]
+
+
+class SearchIndex:
+    """
+    Inverted index from the tokens of the IPs, MACs and descriptions of the
+    devices to the items carrying them.
+
+    The index is refreshed before each search, only the devices changed since
+    the last refresh are indexed again, as told by their change generation,
+    see network.cache.invalidate_device. A search without changes since the
+    last one does not query the devices.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._refresh_mutex = threading.Lock()
+        self._entry_ids = itertools.count()
+        # token -> set of entry ids
+        self._tokens = {}
+        self._sorted_tokens = []
+        # entry id -> entry
+        self._entries = {}
+        # device ip -> (entry ids, generation)
+        self._devices = {}
+        self._generation = None
+
+    def refresh(self):
+        """
+        Indexes the devices discovered or changed since the last refresh, and
+        removes the ones not discovered anymore.
+        """
+        with self._refresh_mutex:
+            generations = get_generations(ALL_DEVICES, RESET)
+            reset = generations[RESET]
+            generation = (generations[ALL_DEVICES], reset)
+            if generation == self._generation:
+                return
+            devices = get_device_details() or []
+            device_ips = [d["mgt_ip"] for d in (devices if isinstance(devices, list) else [devices])]
+            with self._mutex:
+                for device_ip in set(self._devices) - set(device_ips):
+                    self._remove_device(device_ip)
+            # read before the items, so that a change made meanwhile is indexed by the next refresh
+            generations = get_generations(*device_ips)
+            stale = [
+                device_ip for device_ip in device_ips
+                if self._devices.get(device_ip, (None, None))[1] != (generations[device_ip], reset)
+            ]
+            map_concurrent(lambda device_ip: self.index_device(device_ip, (generations[device_ip], reset)), stale)
+            self._generation = generation
+
+    def index_device(self, device_ip: str, generation: tuple):
+        """
+        Indexes the items of a device again.
+
+        Parameters:
+            device_ip (str): The IP address of the device.
+            generation (tuple): The generation of the device and the RESET
+                generation, read before its items.
+        """
+        entries = []
+        for source_type, source in SEARCH_SOURCES.items():
+            try:
+                items = source.get_items(device_ip)
+            except Exception as e:
+                _logger.error(f"Failed to index {source_type} of {device_ip}, Reason: {e}")
+                continue
+            for item in items if isinstance(items, list) else [items] if items else []:
+                for field in source.fields:
+                    values = item.get(field)
+                    for value in values if isinstance(values, list) else [values]:
+                        if value not in (None, ""):
+                            entries.append({
+                                "mgt_ip": device_ip,
+                                "type": source_type,
+                                "name": item.get(source.key),
+                                "field": field,
+                                "value": value,
+                            })
+        with self._mutex:
+            self._remove_device(device_ip)
+            entry_ids = []
+            for entry in entries:
+                entry_id = next(self._entry_ids)
+                self._entries[entry_id] = entry
+                entry_ids.append(entry_id)
+                for token in tokenize(entry["value"]):
+                    self._tokens.setdefault(token, set()).add(entry_id)
+            self._devices[device_ip] = (entry_ids, generation)
+            self._sorted_tokens = None
+
+    def _remove_device(self, device_ip: str):
+        entry_ids, _ = self._devices.pop(device_ip, ([], None))
+        for entry_id in entry_ids:
+            entry = self._entries.pop(entry_id)
+            for token in tokenize(entry["value"]):
+                ids = self._tokens.get(token)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._tokens[token]
+        if entry_ids:
+            self._sorted_tokens = None
+
+    def get_generations(self) -> dict:
+        """
+        Returns the change generation of each indexed device.
+        """
+        with self._mutex:
+            return {device_ip: generation for device_ip, (_, generation) in self._devices.items()}
+
+    def get_entries(self, device_ip: str) -> list:
+        """
+        Returns the indexed entries of a device.
+        """
+        with self._mutex:
+            entry_ids, _ = self._devices.get(device_ip, ([], None))
+            return [self._entries[i] for i in entry_ids]
+
+    def search(self, query: str, limit: int = 100, source_type: str = None) -> list:
+        """
+        Returns the items matching all the terms of the query, a term matches
+        the tokens starting with it, e.g. 10.20.3. matches all the IPs of the
+        10.20.3.0/24 network.
+
+        Parameters:
+            query (str): The search terms.
+            limit (int): The maximum number of results.
+            source_type (str): The type of the items searched, all types if None.
+
+        Returns:
+            list: The matching entries, with the mgt_ip, type and name of the item
+            and the field and value matched.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._mutex:
+            if self._sorted_tokens is None:
+                self._sorted_tokens = sorted(self._tokens)
+            matches = None
+            for term in terms:
+                ids = set()
+                index = bisect.bisect_left(self._sorted_tokens, term)
+                while index < len(self._sorted_tokens) and self._sorted_tokens[index].startswith(term):
+                    ids |= self._tokens[self._sorted_tokens[index]]
+                    index += 1
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    return []
+            entries = [
+                self._entries[i] for i in matches
+                if source_type is None or self._entries[i]["type"] == source_type
+            ]
+        entries.sort(key=lambda i: (i["mgt_ip"], i["type"], str(i["name"]), i["field"]))
+        return entries[:limit]
+
+    def clear(self):
+        with self._mutex:
+            self._tokens.clear()
+            self._sorted_tokens = []
+            self._entries.clear()
+            self._devices.clear()
+            self._generation = None
+
+
+search_index = SearchIndex()
+
+
+@api_view(["GET"])
+def search(request):
+    """
+    Searches the IPs, MACs, names and descriptions of the items of all the
+    discovered devices.
+
+    Parameters:
+    - request: The request object, with the query parameters q, the search
+      terms, limit, the maximum number of results (100 by default), and type,
+      to search only one type of item, one of SEARCH_SOURCES.
+
+    Returns:
+    - A Response object with the matching items and status 200.
+    - A Response object with status 204 if nothing matches.
+    - A Response object with status 400 if a query parameter is invalid.
+    """
+    query = request.GET.get("q", "").strip()
+    source_type = request.GET.get("type")
+    try:
+        limit = int(request.GET.get("limit", 100))
+    except ValueError:
+        limit = 0
+    if not query or limit < 1 or (source_type and source_type not in SEARCH_SOURCES):
+        _logger.error("Required valid q, limit and type parameters.")
+        return Response(
+            {"status": "Required valid q, limit and type parameters."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    search_index.refresh()
+    data = search_index.search(query, limit=limit, source_type=source_type)
+    return (
+        Response(data, status=status.HTTP_200_OK)
+        if data
+        else Response({}, status=status.HTTP_204_NO_CONTENT)
+    )
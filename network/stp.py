@@ -13,12 +13,14 @@ from rest_framework.response import Response
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
 from network.util import add_msg_to_list, get_failure_msg, get_success_msg
 
 _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def stp_global_config(request):
     """
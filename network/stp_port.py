@@ -4,6 +4,8 @@ from rest_framework.response import Response
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.query import InvalidQuery, ListQuery
 from network.util import add_msg_to_list, get_success_msg, get_failure_msg
 from orca_nw_lib.common import STPPortEdgePort, STPPortLinkType, STPPortGuard
 from orca_nw_lib.stp import discover_stp
@@ -14,6 +16,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["PUT", "GET", "DELETE"])
+@cache_get
 @log_request
 def stp_port_config(request):
     """
@@ -51,12 +54,13 @@ def stp_port_config(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         if_name = request.GET.get("if_name", None)
-        data = get_stp_port_members(device_ip, if_name)
-        return (
-            Response(data, status=status.HTTP_200_OK)
-            if data
-            else Response({}, status=status.HTTP_204_NO_CONTENT)
-        )
+        try:
+            query = ListQuery(request.GET, key="if_name")
+        except InvalidQuery as e:
+            _logger.error(str(e))
+            return Response({"status": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        data, next_cursor = query.select(get_stp_port_members(device_ip, if_name))
+        return query.get_response(data, next_cursor)
     for req_data in (request.data if isinstance(request.data, list) else [request.data] if request.data else []):
         if request.method == "PUT":
             device_ip = req_data.get("mgt_ip", "")
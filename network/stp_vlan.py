@@ -4,6 +4,7 @@ from rest_framework.response import Response
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
 from network.util import add_msg_to_list, get_success_msg, get_failure_msg
 from orca_nw_lib.stp_vlan import config_stp_vlan, get_stp_vlan
 
@@ -12,6 +13,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT"])
+@cache_get
 @log_request
 def stp_vlan_config(request):
     """
@@ -0,0 +1,104 @@
+import time
+from types import SimpleNamespace
+
+from django.test import override_settings
+from django.urls import path
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APISimpleTestCase
+
+from network.batch import batch_get
+from network.cache import cache_stats
+
+
+@api_view(["GET"])
+def device_stub(request):
+    return Response(
+        {"mgt_ip": request.GET.get("mgt_ip"), "names": request.GET.getlist("name"), "user": request.user.username},
+        status=status.HTTP_200_OK,
+    )
+
+
+@api_view(["GET"])
+def slow_stub(request):
+    time.sleep(0.2)
+    return Response({}, status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(["GET"])
+def failing_stub(request):
+    raise RuntimeError("Device not reachable")
+
+
+@api_view(["PUT"])
+def put_stub(request):
+    return Response({}, status=status.HTTP_200_OK)
+
+
+urlpatterns = [
+    path("devices", device_stub, name="device"),
+    path("slow", slow_stub, name="slow"),
+    path("failing", failing_stub, name="failing"),
+    path("put", put_stub, name="put"),
+    path("batch", batch_get, name="batch"),
+]
+
+
+@override_settings(ROOT_URLCONF="network.test.test_batch")
+class TestBatch(APISimpleTestCase):
+
+    def setUp(self):
+        self.client.force_authenticate(user=SimpleNamespace(username="admin", is_authenticated=True))
+
+    def batch(self, queries):
+        return self.client.post("/batch", queries, format="json")
+
+    def test_keyed_results(self):
+        response = self.batch({
+            "device": {"route": "devices", "params": {"mgt_ip": "10.10.1.1", "name": ["Ethernet0", "Ethernet4"]}},
+            "slow": {"route": "/slow"},
+        })
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "device": {
+                "status": 200,
+                "data": {"mgt_ip": "10.10.1.1", "names": ["Ethernet0", "Ethernet4"], "user": "admin"},
+            },
+            "slow": {"status": 204, "data": {}},
+        }
+
+    def test_partial_success(self):
+        response = self.batch({
+            "device": {"route": "devices", "params": {"mgt_ip": "10.10.1.1"}},
+            "unknown": {"route": "unknown"},
+            "failing": {"route": "failing"},
+            "put": {"route": "put"},
+            "nested": {"route": "batch"},
+        })
+        assert response.status_code == status.HTTP_200_OK
+        statuses = {key: result["status"] for key, result in response.json().items()}
+        assert statuses == {"device": 200, "unknown": 404, "failing": 500, "put": 405, "nested": 400}
+        assert response.json()["failing"]["data"] == {"status": "Device not reachable"}
+
+    def test_sub_queries_run_concurrently(self):
+        start = time.time()
+        response = self.batch({f"slow{i}": {"route": "slow"} for i in range(4)})
+        assert time.time() - start < 0.6
+        assert all(result["status"] == 204 for result in response.json().values())
+
+    def test_invalid_batch(self):
+        assert self.batch([{"route": "devices"}]).status_code == status.HTTP_400_BAD_REQUEST
+        assert self.batch({"device": {"params": {}}}).status_code == status.HTTP_400_BAD_REQUEST
+        with self.settings(NETWORK_BATCH_MAX_QUERIES=2):
+            response = self.batch({f"device{i}": {"route": "devices"} for i in range(3)})
+            assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated(self):
+        response = APIClient().post("/batch", {"device": {"route": "devices"}}, format="json")
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_batch_does_not_invalidate_cache(self):
+        cache_stats.clear()
+        self.batch({"device": {"route": "devices", "params": {"mgt_ip": "10.10.1.1"}}})
+        assert cache_stats.get()["invalidations"] == 0
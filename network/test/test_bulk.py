@@ -0,0 +1,68 @@
+import threading
+import time
+
+from django.test import SimpleTestCase, override_settings
+
+from network.bulk import map_concurrent, run_per_device
+
+
+class TestBulk(SimpleTestCase):
+
+    def test_results_in_request_order(self):
+        req_data_list = [{"mgt_ip": f"10.10.1.{i % 3}", "index": i} for i in range(9)]
+
+        def config(req_data):
+            # later devices finish first
+            time.sleep(0.01 * (3 - int(req_data["mgt_ip"][-1])))
+            return [{"status": "success", "message": req_data["index"]}], True
+
+        result, http_status = run_per_device(req_data_list, config)
+        assert http_status
+        assert [i["message"] for i in result if i != "\n"] == list(range(9))
+        assert result[1::2] == ["\n"] * 8
+
+    def test_device_items_run_in_order(self):
+        running = {}
+        order = {}
+        mutex = threading.Lock()
+
+        def config(req_data):
+            device_ip = req_data["mgt_ip"]
+            with mutex:
+                assert not running.get(device_ip)
+                running[device_ip] = True
+            time.sleep(0.01)
+            with mutex:
+                running[device_ip] = False
+                order.setdefault(device_ip, []).append(req_data["index"])
+            return [], True
+
+        run_per_device([{"mgt_ip": f"10.10.1.{i % 4}", "index": i} for i in range(20)], config)
+        assert order == {f"10.10.1.{d}": list(range(d, 20, 4)) for d in range(4)}
+
+    def test_failure_status(self):
+        def config(req_data):
+            return [{"status": "failed" if req_data["fail"] else "success"}], not req_data["fail"]
+
+        result, http_status = run_per_device(
+            [{"mgt_ip": "10.10.1.1", "fail": False}, {"mgt_ip": "10.10.1.2", "fail": True}], config
+        )
+        assert not http_status
+        assert [i["status"] for i in result if i != "\n"] == ["success", "failed"]
+
+    @override_settings(BULK_MAX_WORKERS=40)
+    def test_devices_run_concurrently(self):
+        def config(req_data):
+            time.sleep(0.2)
+            return [], True
+
+        start = time.perf_counter()
+        run_per_device([{"mgt_ip": f"10.10.1.{i}"} for i in range(40)], config)
+        elapsed = time.perf_counter() - start
+        print(f"40 devices, 0.2s per device: {elapsed:.2f}s")
+        # time of the slowest device, not of 40 sequential round trips
+        assert elapsed < 2
+
+    def test_map_concurrent_order(self):
+        assert map_concurrent(lambda i: i * 2, list(range(50))) == [i * 2 for i in range(50)]
+        assert map_concurrent(lambda i: i, []) == []
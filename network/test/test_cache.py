@@ -0,0 +1,180 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import override_settings
+from django.urls import path
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from network import cache as network_cache
+from network.cache import cache_get, cache_stats, get_generation, invalidate_device, single_flight
+
+calls = []
+
+
+@api_view(["GET", "PUT"])
+@permission_classes([permissions.AllowAny])
+@cache_get
+def config_stub(request):
+    if request.method == "GET":
+        calls.append(request.GET.get("mgt_ip"))
+        data = {"mgt_ip": request.GET.get("mgt_ip"), "calls": len(calls)}
+        return Response(data, status=status.HTTP_200_OK)
+    return Response({"result": []}, status=status.HTTP_200_OK)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+@cache_get
+def slow_stub(request):
+    calls.append(request.GET.get("mgt_ip"))
+    time.sleep(0.2)
+    return Response({"calls": len(calls)}, status=status.HTTP_200_OK)
+
+
+urlpatterns = [
+    path("config_stub", config_stub, name="config_stub"),
+]
+
+
+@override_settings(ROOT_URLCONF="network.test.test_cache")
+class TestCache(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        cache_stats.clear()
+        calls.clear()
+
+    def get(self, mgt_ip, **headers):
+        return self.client.get("/config_stub", {"mgt_ip": mgt_ip}, **headers)
+
+    def test_hit_and_miss(self):
+        assert self.get("10.10.1.1")["X-Orca-Cache"] == "MISS"
+        response = self.get("10.10.1.1")
+        assert response["X-Orca-Cache"] == "HIT"
+        assert response.json() == {"mgt_ip": "10.10.1.1", "calls": 1}
+        assert self.get("10.10.1.2")["X-Orca-Cache"] == "MISS"
+        assert calls == ["10.10.1.1", "10.10.1.2"]
+        stats = cache_stats.get()
+        assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    def test_bypass_header(self):
+        self.get("10.10.1.1")
+        response = self.get("10.10.1.1", HTTP_CACHE_CONTROL="no-cache")
+        assert response["X-Orca-Cache"] == "BYPASS"
+        assert response.json()["calls"] == 2
+        # the bypass refreshed the cached response
+        assert self.get("10.10.1.1").json()["calls"] == 2
+
+    def test_put_invalidates_device(self):
+        self.get("10.10.1.1")
+        self.get("10.10.1.2")
+        generation = get_generation("10.10.1.1")
+        response = self.client.put("/config_stub", {"mgt_ip": "10.10.1.1"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert get_generation("10.10.1.1") > generation
+        assert self.get("10.10.1.1")["X-Orca-Cache"] == "MISS"
+        assert self.get("10.10.1.2")["X-Orca-Cache"] == "HIT"
+
+    def test_invalidation_by_other_process(self):
+        self.get("10.10.1.1")
+        # like the Celery worker at the end of a discovery, with its own cache
+        with mock.patch.object(network_cache, "cache", LocMemCache("worker", {})):
+            invalidate_device("10.10.1.1")
+        assert self.get("10.10.1.1")["X-Orca-Cache"] == "MISS"
+
+    def test_put_without_device_invalidates_all(self):
+        self.get("10.10.1.1")
+        self.client.put("/config_stub", {"discover_from_config": True}, format="json")
+        assert self.get("10.10.1.1")["X-Orca-Cache"] == "MISS"
+
+    @override_settings(NETWORK_CACHE_TTL=0.2)
+    def test_ttl(self):
+        self.get("10.10.1.1")
+        time.sleep(0.3)
+        assert self.get("10.10.1.1")["X-Orca-Cache"] == "MISS"
+
+    def test_concurrent_requests_coalesced(self):
+        # the threads would not see the generations created in the transaction of the test
+        generations = network_cache.get_generations("10.10.1.1", network_cache.RESET)
+        patch = mock.patch.object(network_cache, "get_generations", lambda *names: generations)
+        patch.start()
+        self.addCleanup(patch.stop)
+        factory = APIRequestFactory()
+        responses = []
+
+        def get():
+            response = slow_stub(factory.get("/slow_stub", {"mgt_ip": "10.10.1.1", "name": "Ethernet0"}))
+            responses.append(response)
+
+        threads = [threading.Thread(target=get) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert sorted(i["X-Orca-Cache"] for i in responses) == ["COALESCED"] * 9 + ["MISS"]
+        assert all(i.data == {"calls": 1} for i in responses)
+        assert cache_stats.get()["coalesced"] == 9
+
+    def test_coalesced_error(self):
+        started = threading.Event()
+        release = threading.Event()
+        errors = []
+
+        def fail():
+            started.set()
+            release.wait()
+            raise ValueError("failed")
+
+        def call():
+            try:
+                single_flight.do("key", fail)
+            except ValueError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait()
+        follower = threading.Thread(target=call)
+        follower.start()
+        while cache_stats.get()["coalesced"] < 1:
+            time.sleep(0.01)
+        release.set()
+        leader.join()
+        follower.join()
+        assert len(errors) == 2
+
+    def test_etag(self):
+        response = self.get("10.10.1.1")
+        etag = response["ETag"]
+        assert self.get("10.10.1.2")["ETag"] != etag
+        response = self.get("10.10.1.1", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response["ETag"] == etag
+        assert calls == ["10.10.1.1", "10.10.1.2"]
+        assert cache_stats.get()["not_modified"] == 1
+
+        # a change of the device changes the etag
+        self.client.put("/config_stub", {"mgt_ip": "10.10.1.1"}, format="json")
+        response = self.get("10.10.1.1", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert calls == ["10.10.1.1", "10.10.1.2", "10.10.1.1"]
+
+    @override_settings(NETWORK_CACHE_TTL=0.1)
+    def test_etag_expires_with_cache(self):
+        etag = self.get("10.10.1.1")["ETag"]
+        response = self.get("10.10.1.1", HTTP_IF_NONE_MATCH=f'W/{etag}, "other"')
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        # a change missed by the invalidation is seen once the response expired
+        time.sleep(0.2)
+        response = self.get("10.10.1.1", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == status.HTTP_200_OK
+        assert response["ETag"] != etag
+        assert calls == ["10.10.1.1", "10.10.1.1"]
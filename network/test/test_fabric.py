@@ -0,0 +1,80 @@
+import json
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import path
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from network import fabric
+from network.fabric import FabricFeature
+
+DEVICE_COUNT = 200
+QUERY_TIME = 0.05
+
+urlpatterns = [
+    path("fabric/<str:feature>", fabric.fabric_query, name="fabric"),
+]
+
+
+def get_interfaces(device_ip):
+    time.sleep(QUERY_TIME)
+    if device_ip == "10.10.0.13":
+        raise ConnectionError("Device not reachable")
+    return [
+        {"name": f"Ethernet{i}", "oper_sts": "down" if i == 2 else "up", "mtu": 9100}
+        for i in range(4)
+    ]
+
+
+@override_settings(ROOT_URLCONF="network.test.test_fabric")
+class TestFabric(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.device_ips = [f"10.10.{i // 100}.{i % 100}" for i in range(DEVICE_COUNT)]
+        patches = [
+            mock.patch.object(fabric, "get_device_details", return_value=[{"mgt_ip": i} for i in self.device_ips]),
+            mock.patch.dict(fabric.FABRIC_FEATURES, {"interfaces": FabricFeature(get_interfaces, "name")}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client.force_authenticate(user=mock.Mock(is_authenticated=True))
+
+    def test_fan_out(self):
+        start = time.time()
+        response = self.client.get("/fabric/interfaces")
+        elapsed = time.time() - start
+        # sequential queries would take DEVICE_COUNT * QUERY_TIME
+        assert elapsed < DEVICE_COUNT * QUERY_TIME / 10
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == (DEVICE_COUNT - 1) * 4
+        # sorted by device
+        assert [i["mgt_ip"] for i in data[::4]] == [i for i in self.device_ips if i != "10.10.0.13"]
+        assert response["X-Orca-Failed-Devices"] == "10.10.0.13"
+
+    def test_filter_and_fields(self):
+        response = self.client.get("/fabric/interfaces", {"oper_sts": "down", "fields": "name"})
+        data = response.json()
+        assert len(data) == DEVICE_COUNT - 1
+        assert data[0] == {"name": "Ethernet2", "mgt_ip": self.device_ips[0]}
+
+        response = self.client.get("/fabric/interfaces", {"filter": "name__in=Ethernet0|Ethernet1"})
+        assert len(response.json()) == (DEVICE_COUNT - 1) * 2
+
+        response = self.client.get("/fabric/interfaces", {"oper_sts": "testing"})
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    def test_stream(self):
+        response = self.client.get("/fabric/interfaces", {"oper_sts": "down"}, HTTP_ACCEPT="application/x-ndjson")
+        lines = b"".join(response.streaming_content).splitlines()
+        assert sorted(json.loads(i)["mgt_ip"] for i in lines) == sorted(i for i in self.device_ips if i != "10.10.0.13")
+
+    def test_invalid_query(self):
+        assert self.client.get("/fabric/unknown").status_code == status.HTTP_404_NOT_FOUND
+        assert self.client.get("/fabric/interfaces", {"limit": 10}).status_code == status.HTTP_400_BAD_REQUEST
+        assert self.client.get("/fabric/interfaces", {"name__regex": "."}).status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,138 @@
+import enum
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from network import fingerprint
+from network.fingerprint import discover_changed
+from network.models import DiscoveryFingerprint, DiscoveryRun
+
+
+class Feature(enum.Enum):
+    interface = "interface"
+    vlan = "vlan"
+    bgp = "bgp"
+    port_group = "port_group"
+
+
+FEATURE_FINGERPRINTS = dict(fingerprint.FEATURE_FINGERPRINTS)
+
+
+@override_settings(DISCOVERY_RUN_HISTORY_SIZE=3)
+class TestFingerprint(TestCase):
+
+    def setUp(self):
+        self.configs = {"interface": {"Ethernet0": {"mtu": 9100}}, "vlan": {"Vlan10": {}}, "bgp": {"asn": 65000}}
+        self.calls = []
+        patches = [
+            mock.patch.object(fingerprint, "DiscoveryFeature", Feature),
+            # port_group is not fingerprinted
+            mock.patch.dict(fingerprint.FEATURE_FINGERPRINTS, {
+                name: lambda device_ip, name=name: self.read_config(name) for name in self.configs
+            }, clear=True),
+            mock.patch.object(fingerprint, "discover_device", lambda device_ips: self.calls.append(sorted(device_ips))),
+            mock.patch.object(fingerprint, "discover_nw_features", self.discover_nw_features),
+            mock.patch.object(fingerprint, "get_device_details", lambda device_ip: {"mgt_ip": device_ip}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def read_config(self, name):
+        if isinstance(self.configs[name], Exception):
+            raise self.configs[name]
+        return self.configs[name]
+
+    def discover_nw_features(self, device_ip, feature):
+        self.calls.append((device_ip, feature.name))
+        if feature.name == "bgp" and self.configs["bgp"].get("asn") == 0:
+            raise ConnectionError("Device not reachable")
+
+    def test_incremental(self):
+        # never discovered
+        runs = discover_changed(["10.10.0.1", "10.10.0.2"])
+        assert self.calls == [["10.10.0.1", "10.10.0.2"]]
+        assert runs["10.10.0.1"]["full"]
+        assert set(DiscoveryFingerprint.objects.get(device_ip="10.10.0.1").fingerprints) == set(self.configs)
+
+        # nothing changed, only the feature without fingerprint is discovered
+        self.calls.clear()
+        runs = discover_changed(["10.10.0.1"])
+        assert self.calls == [("10.10.0.1", "port_group")]
+        assert runs["10.10.0.1"] == {
+            "full": False, "executed": ["port_group"], "skipped": ["interface", "vlan", "bgp"], "failed": [],
+            "duration": runs["10.10.0.1"]["duration"],
+        }
+
+        # a changed and an unreadable feature
+        self.calls.clear()
+        self.configs["interface"]["Ethernet0"]["mtu"] = 1500
+        self.configs["vlan"] = TimeoutError()
+        runs = discover_changed(["10.10.0.1"])
+        assert self.calls == [("10.10.0.1", "interface"), ("10.10.0.1", "vlan"), ("10.10.0.1", "port_group")]
+        assert runs["10.10.0.1"]["skipped"] == ["bgp"]
+
+        # forced
+        self.calls.clear()
+        discover_changed(["10.10.0.1"], full=True)
+        assert self.calls == [["10.10.0.1"]]
+
+    def test_failed_feature(self):
+        discover_changed(["10.10.0.1"])
+        self.configs["bgp"]["asn"] = 0
+        runs = discover_changed(["10.10.0.1"])
+        assert runs["10.10.0.1"]["failed"] == ["bgp"]
+        # discovered again until it succeeds
+        assert "bgp" not in DiscoveryFingerprint.objects.get(device_ip="10.10.0.1").fingerprints
+        self.configs["bgp"]["asn"] = 65001
+        self.calls.clear()
+        discover_changed(["10.10.0.1"])
+        assert self.calls == [("10.10.0.1", "bgp"), ("10.10.0.1", "port_group")]
+
+    def test_failed_full_discovery(self):
+        def discover_device(device_ips):
+            self.calls.append(sorted(device_ips))
+            if "10.10.0.2" in device_ips:
+                raise ConnectionError("Device not reachable")
+
+        with mock.patch.object(fingerprint, "discover_device", discover_device):
+            runs = discover_changed(["10.10.0.1", "10.10.0.2"])
+        assert self.calls == [["10.10.0.1", "10.10.0.2"], ["10.10.0.1"], ["10.10.0.2"]]
+        assert runs["10.10.0.1"]["failed"] == []
+        assert runs["10.10.0.2"]["failed"] == ["interface", "vlan", "bgp", "port_group"]
+        assert list(DiscoveryFingerprint.objects.values_list("device_ip", flat=True)) == ["10.10.0.1"]
+
+    def test_run_history(self):
+        for _ in range(5):
+            discover_changed(["10.10.0.1", "10.10.0.2"])
+        assert DiscoveryRun.objects.filter(device_ip="10.10.0.1").count() == 3
+        runs = DiscoveryRun.objects.filter(device_ip="10.10.0.2").order_by("id")
+        assert [run.full for run in runs] == [False, False, False]
+        assert runs[0].skipped == ["interface", "vlan", "bgp"]
+
+    def test_features_grouped(self):
+        discover_changed(["10.10.0.1", "10.10.0.2"])
+        self.calls.clear()
+        self.configs["vlan"]["Vlan20"] = {}
+        self.configs["interface"]["Ethernet0"]["mtu"] = 1500
+        discover_changed(["10.10.0.1", "10.10.0.2"])
+        # a feature at a time on all the devices it changed on
+        assert [name for _, name in self.calls] == ["interface"] * 2 + ["vlan"] * 2 + ["port_group"] * 2
+        assert sorted(self.calls) == sorted(
+            (device_ip, name)
+            for device_ip in ("10.10.0.1", "10.10.0.2") for name in ("interface", "vlan", "port_group")
+        )
+
+    def test_state_fingerprinted(self):
+        states = {fingerprint.INTERFACE_STATE_PATH: {"Ethernet0": "UP"}}
+        with mock.patch.dict(fingerprint.FEATURE_FINGERPRINTS, {"interface": FEATURE_FINGERPRINTS["interface"]}), \
+                mock.patch.object(fingerprint, "get_device_config", lambda device_ip, path: states.get(path, {})):
+            before = fingerprint.get_fingerprints("10.10.0.1")["interface"]
+            # the oper status changes without a change of config
+            states[fingerprint.INTERFACE_STATE_PATH]["Ethernet0"] = "DOWN"
+            assert fingerprint.get_fingerprints("10.10.0.1")["interface"] != before
+
+    def test_unknown_features_removed(self):
+        fingerprint.FEATURE_FINGERPRINTS["vlans"] = fingerprint.FEATURE_FINGERPRINTS["vlan"]
+        fingerprint.check_feature_fingerprints()
+        assert set(fingerprint.FEATURE_FINGERPRINTS) == set(self.configs)
@@ -0,0 +1,219 @@
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import path
+from rest_framework import status
+from rest_framework.test import APISimpleTestCase
+
+from network import ipam
+from network.ipam import IPAMIndex, check_ip_conflicts
+from network.search import SEARCH_SOURCES
+
+urlpatterns = [
+    path("fabric/ip_conflicts", ipam.ip_conflicts, name="ip_conflicts"),
+    path("ipam/free_prefix", ipam.free_prefix, name="free_prefix"),
+]
+
+
+class FakeSearchIndex:
+    """
+    Search index of the given device entries, as {device_ip: [(name, ip_address)]}.
+    """
+
+    def __init__(self, devices: dict):
+        self.devices = devices
+        self.generations = {device_ip: 0 for device_ip in devices}
+
+    def update(self, device_ip: str, addresses: list):
+        self.devices[device_ip] = addresses
+        self.generations[device_ip] = self.generations.get(device_ip, 0) + 1
+
+    def refresh(self):
+        pass
+
+    def get_generations(self):
+        return dict(self.generations)
+
+    def get_entries(self, device_ip):
+        return [
+            {"mgt_ip": device_ip, "type": "subinterface", "name": name, "field": "ip_address", "value": ip_address}
+            for name, ip_address in self.devices[device_ip]
+        ] + [{"mgt_ip": device_ip, "type": "device", "name": device_ip, "field": "mgt_ip", "value": device_ip}]
+
+
+def get_fabric() -> dict:
+    return {
+        "10.10.1.1": [("Ethernet0", "10.0.0.0/31"), ("Ethernet4", "10.0.0.2/31"), ("Vlan10", "192.168.10.1/24"),
+                      ("Loopback0", "10.1.0.1/32"), ("Ethernet8", "fe80::1/64")],
+        "10.10.1.2": [("Ethernet0", "10.0.0.1/31"), ("Vlan10", "192.168.10.2/24"), ("Ethernet8", "fe80::1/64")],
+        "10.10.1.3": [("Ethernet0", "10.0.0.3/31")],
+    }
+
+
+class TestIPAMIndex(SimpleTestCase):
+
+    def setUp(self):
+        self.search_index = FakeSearchIndex(get_fabric())
+        patch = mock.patch.object(ipam, "search_index", self.search_index)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.index = IPAMIndex()
+        self.index.refresh()
+
+    def get_reasons(self, *candidates) -> list:
+        return [
+            (i["ip_address"], i["reason"], i["conflicts_with"]["ip_address"])
+            for i in self.index.find_conflicts(list(candidates))
+        ]
+
+    def test_no_conflicts(self):
+        # the fabric is valid, link local addresses are not managed
+        assert self.index.get_conflicts() == []
+        # reconfiguring an interface, a new link and the peer end of a /31
+        assert self.get_reasons(
+            ("10.10.1.1", "Ethernet0", "10.0.0.0/31"),
+            ("10.10.1.3", "Ethernet4", "10.0.0.4/31"),
+            ("10.10.1.4", "Ethernet4", "10.0.0.5/31"),
+            ("10.10.1.3", "Vlan10", "192.168.10.3/24"),
+        ) == []
+
+    def test_conflicts(self):
+        assert self.get_reasons(("10.10.1.3", "Ethernet4", "10.0.0.1/31")) == [
+            ("10.0.0.1/31", "duplicate address", "10.0.0.1/31"),
+        ]
+        assert sorted(self.get_reasons(("10.10.1.3", "Ethernet4", "10.0.0.0/30"))) == [
+            ("10.0.0.0/30", "duplicate address", "10.0.0.0/31"),
+            ("10.0.0.0/30", "overlapping prefix", "10.0.0.1/31"),
+            ("10.0.0.0/30", "overlapping prefix", "10.0.0.2/31"),
+            ("10.0.0.0/30", "overlapping prefix", "10.0.0.3/31"),
+        ]
+        assert self.get_reasons(("10.10.1.3", "Ethernet4", "10.1.0.0/24")) == [
+            ("10.1.0.0/24", "overlapping prefix", "10.1.0.1/32"),
+        ]
+        assert self.get_reasons(("10.10.1.1", "Vlan20", "192.168.10.5/24")) == [
+            ("192.168.10.5/24", "subnet already configured on another interface of the device", "192.168.10.1/24"),
+        ]
+
+    def test_addresses_without_prefix(self):
+        # the subinterfaces are returned without the prefix of their addresses
+        source = SEARCH_SOURCES["subinterface"]
+        items = [
+            {"name": "Ethernet12", "ip_address": "10.0.5.0", "secondary": False},
+            {"name": "Ethernet12", "ip_address": "10.0.6.1", "secondary": True},
+        ]
+        self.search_index.update("10.10.1.4", [(i[source.key], i[field]) for i in items for field in source.fields])
+        self.index.refresh()
+        assert self.index.get_conflicts() == []
+        # the peer end of a /31 link and a prefix containing an address
+        assert self.get_reasons(
+            ("10.10.1.5", "Ethernet0", "10.0.5.1/31"),
+            ("10.10.1.5", "Ethernet4", "10.0.6.2/24"),
+        ) == []
+        # only the same address conflicts
+        assert self.get_reasons(("10.10.1.5", "Ethernet0", "10.0.5.0/31")) == [
+            ("10.0.5.0/31", "duplicate address", "10.0.5.0"),
+        ]
+        assert str(self.index.get_free_prefix("10.0.5.0/30")) == "10.0.5.2/31"
+
+    def test_conflicts_within_request(self):
+        assert self.get_reasons(
+            ("10.10.1.3", "Ethernet4", "10.0.0.4/31"),
+            ("10.10.1.4", "Ethernet4", "10.0.0.4/31"),
+        ) == [("10.0.0.4/31", "duplicate address", "10.0.0.4/31")]
+
+    def test_report(self):
+        self.search_index.update("10.10.1.3", [("Ethernet0", "10.0.0.3/31"), ("Ethernet4", "10.0.0.1/31")])
+        self.index.refresh()
+        conflicts = self.index.get_conflicts()
+        assert len(conflicts) == 1
+        assert conflicts[0]["reason"] == "duplicate address"
+        assert {i["mgt_ip"] for i in conflicts[0]["addresses"]} == {"10.10.1.2", "10.10.1.3"}
+
+        # fixed and device removed
+        self.search_index.update("10.10.1.3", [("Ethernet0", "10.0.0.3/31")])
+        del self.search_index.devices["10.10.1.2"]
+        del self.search_index.generations["10.10.1.2"]
+        self.index.refresh()
+        assert self.index.get_conflicts() == []
+        assert self.get_reasons(("10.10.1.3", "Ethernet4", "10.0.0.1/31")) == []
+
+    def test_free_prefix(self):
+        assert str(self.index.get_free_prefix("10.0.0.0/24")) == "10.0.0.4/31"
+        assert str(self.index.get_free_prefix("10.0.0.0/24", 30)) == "10.0.0.4/30"
+        assert str(self.index.get_free_prefix("10.0.0.0/24", 29)) == "10.0.0.8/29"
+        assert str(self.index.get_free_prefix("10.2.0.0/31")) == "10.2.0.0/31"
+        # 10.1.0.1/32 is configured
+        assert self.index.get_free_prefix("10.1.0.0/31") is None
+        assert str(self.index.get_free_prefix("10.1.0.0/31", 32)) == "10.1.0.0/32"
+        assert self.index.get_free_prefix("10.0.0.0/30") is None
+        # the pool is a configured subnet
+        assert self.index.get_free_prefix("192.168.10.0/28") is None
+        with self.assertRaises(ValueError):
+            self.index.get_free_prefix("10.0.0.1/24")
+        with self.assertRaises(ValueError):
+            self.index.get_free_prefix("10.0.0.0/24", 16)
+
+    def test_benchmark(self):
+        """
+        Indexes 50000 /31 links of 500 devices, checks 1000 new links and
+        allocates a free /31 from the full pool.
+        """
+        devices = {}
+        for i in range(50000):
+            devices.setdefault(f"10.10.{i // 100 // 256}.{i // 100 % 256}", []).append(
+                (f"Ethernet{i % 100}", f"{ipam.ipaddress.ip_address(int(ipam.ipaddress.ip_address('10.0.0.0')) + i * 2)}/31")
+            )
+        self.search_index.devices = devices
+        self.search_index.generations = {i: 1 for i in devices}
+        start = time.perf_counter()
+        self.index.refresh()
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(1000):
+            self.index.find_conflicts([("10.10.9.9", "Ethernet0", f"10.0.{i // 128}.{i % 128 * 2}/31")])
+        check = (time.perf_counter() - start) / 1000
+
+        start = time.perf_counter()
+        prefix = self.index.get_free_prefix("10.0.0.0/8")
+        allocate = time.perf_counter() - start
+        assert str(prefix) == "10.1.134.160/31"
+        assert build < 5
+        assert check < 0.005
+        assert allocate < 0.5
+
+
+@override_settings(ROOT_URLCONF="network.test.test_ipam", IPAM_CONFLICT_CHECK=True)
+class TestIPAMViews(APISimpleTestCase):
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(ipam, "search_index", FakeSearchIndex(get_fabric())),
+            mock.patch.object(ipam, "ipam_index", IPAMIndex()),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client.force_authenticate(user=mock.Mock(is_authenticated=True))
+
+    def test_check_ip_conflicts(self):
+        assert check_ip_conflicts([{"mgt_ip": "10.10.1.3", "name": "Ethernet4", "ip_address": "10.0.0.4/31"}]) is None
+        assert check_ip_conflicts([{"mgt_ip": "10.10.1.3", "name": "Ethernet4"}]) is None
+        response = check_ip_conflicts([{"mgt_ip": "10.10.1.3", "lag_name": "PortChannel1", "ip_address": "10.0.0.1/31"}],
+                                      name_field="lag_name")
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data["conflicts"][0]["conflicts_with"]["mgt_ip"] == "10.10.1.2"
+        with self.settings(IPAM_CONFLICT_CHECK=False):
+            assert check_ip_conflicts([{"mgt_ip": "10.10.1.3", "name": "Ethernet4", "ip_address": "10.0.0.1/31"}]) is None
+
+    def test_ip_conflicts(self):
+        assert self.client.get("/fabric/ip_conflicts").status_code == status.HTTP_204_NO_CONTENT
+
+    def test_free_prefix(self):
+        response = self.client.get("/ipam/free_prefix", {"pool": "10.0.0.0/24"})
+        assert response.json() == {"pool": "10.0.0.0/24", "prefix": "10.0.0.4/31"}
+        assert self.client.get("/ipam/free_prefix", {"pool": "10.0.0.0/30"}).status_code == status.HTTP_404_NOT_FOUND
+        assert self.client.get("/ipam/free_prefix", {"pool": "x"}).status_code == status.HTTP_400_BAD_REQUEST
+        response = self.client.get("/ipam/free_prefix", {"pool": "10.0.0.0/24", "prefix_len": "x"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.urls import path
+from django.test import override_settings
+from orca_nw_lib.common import IFMode
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from network import members, mclag, port_chnl, vlan
+
+VLAN_COUNT = 500
+
+urlpatterns = [
+    path("vlan", vlan.vlan_config, name="vlan_config"),
+    path("port_chnl", port_chnl.device_port_chnl_list, name="device_port_chnl"),
+    path("mclag", mclag.device_mclag_list, name="device_mclag_list"),
+]
+
+
+@override_settings(ROOT_URLCONF="network.test.test_members")
+class TestMembers(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.queries = []
+        self.rows = {
+            members.VLAN_MEMBERS_QUERY: [
+                (f"Vlan{i}", name, "TRUNK") for i in range(0, VLAN_COUNT, 2) for name in ("Ethernet0", "PortChannel1")
+            ] + [("Vlan1", "Ethernet4", None)],
+            members.PORT_CHNL_MEMBERS_QUERY: [("PortChannel1", "Ethernet4"), ("PortChannel1", "Ethernet8")],
+            members.MCLAG_MEMBERS_QUERY: [(1, "PortChannel1")],
+        }
+        patches = [
+            mock.patch.object(members, "run_query", self.run_query),
+            mock.patch.object(vlan, "get_vlan", lambda device_ip, name: [
+                {"name": f"Vlan{i}", "vlanid": i} for i in range(VLAN_COUNT)
+            ]),
+            mock.patch.object(port_chnl, "get_port_chnl", lambda device_ip, name: [
+                {"lag_name": "PortChannel1"}, {"lag_name": "PortChannel2"}
+            ]),
+            mock.patch.object(mclag, "get_mclags", lambda device_ip, domain_id: {"domain_id": 1}),
+            mock.patch.object(mclag, "get_mclag_gw_mac", lambda device_ip: []),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client.force_authenticate(user=mock.Mock(is_authenticated=True))
+
+    def run_query(self, query, **params):
+        self.queries.append((query, params))
+        return self.rows[query]
+
+    def test_vlan_members(self):
+        response = self.client.get("/vlan", {"mgt_ip": "10.10.1.1"})
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert len(data) == VLAN_COUNT
+        # one query for the members of all the VLANs
+        assert self.queries == [(members.VLAN_MEMBERS_QUERY, {"device_ip": "10.10.1.1"})]
+        mode = str(IFMode.get_enum_from_str("TRUNK"))
+        assert data[0]["mem_ifs"] == {"Ethernet0": mode, "PortChannel1": mode}
+        # a member without tagging mode
+        assert data[1]["mem_ifs"] == {"Ethernet4": None}
+        assert data[3]["mem_ifs"] == {}
+
+    def test_members_not_selected(self):
+        response = self.client.get("/vlan", {"mgt_ip": "10.10.1.1", "fields": "name"})
+        assert response.status_code == status.HTTP_200_OK
+        assert self.queries == []
+
+    def test_filter_on_members(self):
+        response = self.client.get(
+            "/vlan", {"mgt_ip": "10.10.1.1", "fields": "name", "filter": "mem_ifs__contains=Ethernet0", "limit": 2}
+        )
+        assert response.json()["results"] == [{"name": "Vlan0"}, {"name": "Vlan2"}]
+        data = self.client.get("/port_chnl", {"mgt_ip": "10.10.1.1", "filter": "members__contains=Ethernet8"}).json()
+        assert [i["lag_name"] for i in data] == ["PortChannel1"]
+        assert len(self.queries) == 2
+
+    def test_port_chnl_members(self):
+        data = self.client.get("/port_chnl", {"mgt_ip": "10.10.1.1"}).json()
+        assert len(self.queries) == 1
+        assert [i["members"] for i in data] == [["Ethernet4", "Ethernet8"], []]
+
+    def test_mclag_members(self):
+        data = self.client.get("/mclag", {"mgt_ip": "10.10.1.1"}).json()
+        assert len(self.queries) == 1
+        assert data["mclag_members"] == ["PortChannel1"]
+
+    def test_relationship_types(self):
+        for query in self.rows:
+            # untyped relationships also match the other relations of the nodes
+            assert "-->" not in query
+            assert "-[:HAS]->" in query
+        # the peer link of the MCLAG domain is not a member
+        assert "PEER_LINK" not in members.MCLAG_MEMBERS_QUERY
+        assert "-[:MEMBER_IF]->(member:PortChannel)" in members.MCLAG_MEMBERS_QUERY
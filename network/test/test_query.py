@@ -0,0 +1,139 @@
+import time
+
+from django.http import QueryDict
+from django.test import SimpleTestCase
+
+from network.query import InvalidQuery, ListQuery
+
+
+def get_interfaces(count: int) -> list:
+    return [
+        {
+            "name": f"Ethernet{i}",
+            "oper_sts": "up" if i % 4 else "down",
+            "enabled": bool(i % 2),
+            "mtu": 9100,
+            "speed": "SPEED_25GB",
+            "description": f"port {i}",
+        }
+        for i in range(count)
+    ]
+
+
+def get_query(params: str, key="name") -> ListQuery:
+    return ListQuery(QueryDict(params), key=key)
+
+
+class TestListQuery(SimpleTestCase):
+
+    def test_no_params(self):
+        data = get_interfaces(4)
+        query = get_query("")
+        assert query.select(data) == (data, None)
+        response = query.get_response(data)
+        assert response.status_code == 200
+        assert response.data == data
+        assert get_query("").get_response(None).status_code == 204
+
+    def test_fields(self):
+        query = get_query("fields=name,oper_sts")
+        data, _ = query.select(get_interfaces(2))
+        assert query.get_response(data).data == [
+            {"name": "Ethernet0", "oper_sts": "down"},
+            {"name": "Ethernet1", "oper_sts": "up"},
+        ]
+        assert query.selects("name")
+        assert not query.selects("mtu")
+        assert get_query("").selects("mtu")
+        # a field filtered on is computed, even if not returned
+        assert get_query("fields=name&filter=mtu=9100").selects("mtu")
+
+    def test_fields_of_single_item(self):
+        query = get_query("fields=name")
+        assert query.get_response(get_interfaces(1)[0]).data == {"name": "Ethernet0"}
+
+    def test_filter(self):
+        data, next_cursor = get_query("filter=oper_sts=down").select(get_interfaces(12))
+        assert [i["name"] for i in data] == ["Ethernet0", "Ethernet4", "Ethernet8"]
+        assert next_cursor is None
+
+        data, _ = get_query("filter=name__startswith=Ethernet1&filter=enabled=true").select(get_interfaces(12))
+        assert [i["name"] for i in data] == ["Ethernet1", "Ethernet11"]
+
+        data, _ = get_query("filter=name__in=Ethernet2|Ethernet3").select(get_interfaces(12))
+        assert [i["name"] for i in data] == ["Ethernet2", "Ethernet3"]
+
+        # case-insensitive
+        data, _ = get_query("filter=oper_sts=DOWN&filter=speed__endswith=25gb").select(get_interfaces(6))
+        assert [i["name"] for i in data] == ["Ethernet0", "Ethernet4"]
+
+        data, _ = get_query("filter=unknown=1").select(get_interfaces(12))
+        assert data == []
+        assert get_query("filter=oper_sts=testing").get_response([]).status_code == 204
+
+    def test_filter_members(self):
+        data = [
+            {"name": "Vlan1", "mem_ifs": {"Ethernet12": "TRUNK"}, "ports": ["Ethernet12", "PortChannel1"]},
+            {"name": "Vlan2", "mem_ifs": {"Ethernet1": "ACCESS"}, "ports": ["Ethernet1"]},
+            {"name": "Vlan3", "mem_ifs": {}, "ports": []},
+        ]
+        for params, names in (
+            # a whole member, not a substring of the list or of a member
+            ("filter=ports__contains=Ethernet1", ["Vlan2"]),
+            ("filter=ports__contains=ethernet", []),
+            ("filter=ports__contains='Ethernet12'", []),
+            ("filter=ports__startswith=Port", ["Vlan1"]),
+            ("filter=ports__ne=Ethernet1", ["Vlan1", "Vlan3"]),
+            ("filter=ports__in=PortChannel1|Ethernet1", ["Vlan1", "Vlan2"]),
+            # the keys of a dict
+            ("filter=mem_ifs__contains=ethernet1", ["Vlan2"]),
+            ("filter=mem_ifs__contains=TRUNK", []),
+        ):
+            selected, _ = get_query(params).select(data)
+            assert [i["name"] for i in selected] == names, params
+
+    def test_pagination(self):
+        interfaces = get_interfaces(25)
+        names = []
+        cursor = ""
+        while True:
+            query = get_query(f"limit=10&cursor={cursor}&fields=name")
+            response = query.get_response(*query.select(interfaces))
+            assert response.status_code == 200
+            assert len(response.data["results"]) <= 10
+            names += [i["name"] for i in response.data["results"]]
+            cursor = response.data["next_cursor"]
+            if not cursor:
+                break
+        # numbers in names are sorted by value
+        assert names == [f"Ethernet{i}" for i in range(25)]
+
+    def test_pagination_with_filter(self):
+        query = get_query("filter=oper_sts=up&limit=5", key="name")
+        data, next_cursor = query.select(get_interfaces(25))
+        assert [i["name"] for i in data] == ["Ethernet1", "Ethernet2", "Ethernet3", "Ethernet5", "Ethernet6"]
+        query = get_query(f"filter=oper_sts=up&limit=5&cursor={next_cursor}", key="name")
+        data, _ = query.select(get_interfaces(25))
+        assert data[0]["name"] == "Ethernet7"
+
+    def test_invalid_params(self):
+        for params in ("limit=0", "limit=abc", "filter=name", "filter=name__regex=.*", "cursor=%25"):
+            with self.assertRaises(InvalidQuery, msg=params):
+                get_query(params)
+
+    def test_payload_size(self):
+        """
+        Compares the payload size and the time taken to select a page of
+        oper_sts of the down interfaces of a device with 512 interfaces.
+        """
+        import json
+
+        interfaces = get_interfaces(512)
+        full = json.dumps(interfaces)
+        query = get_query("fields=name,oper_sts&filter=oper_sts=down&limit=50")
+        start = time.perf_counter()
+        response = query.get_response(*query.select(interfaces))
+        elapsed = time.perf_counter() - start
+        sparse = json.dumps(response.data)
+        assert len(sparse) * 10 < len(full)
+        assert elapsed < 0.05
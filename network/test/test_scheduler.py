@@ -0,0 +1,270 @@
+import collections
+import datetime
+from unittest import mock
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from network import fingerprint, scheduler
+from network.models import ReDiscoveryConfig, SchedulerLease
+from network.scheduler import (
+    acquire_lease, adapt_interval, discover_devices, get_interval, get_next_run_time, get_phase_offset, get_trigger,
+    release_lease,
+)
+from state_manager.locks import device_locks
+from state_manager.models import State
+
+DEVICE_COUNT = 100
+INTERVAL = 10
+NOW = datetime.datetime(2024, 5, 1, 12, 0, 7, tzinfo=datetime.timezone.utc)
+
+
+def get_batch_sizes(start_times: list) -> list:
+    """
+    Returns the number of devices discovered together at each start time.
+    """
+    return sorted(collections.Counter(start_times).values())
+
+
+def patch_scheduler(test_case):
+    """
+    Replaces the scheduler by a paused one, so that the jobs are added but not run.
+    """
+    background_scheduler = BackgroundScheduler()
+    background_scheduler.start(paused=True)
+    patch = mock.patch.object(scheduler, "scheduler", background_scheduler)
+    patch.start()
+    test_case.addCleanup(patch.stop)
+    test_case.addCleanup(lambda: background_scheduler.running and background_scheduler.shutdown(wait=False))
+    test_case.addCleanup(scheduler._leader.clear)
+
+
+@override_settings(REDISCOVERY_CATCHUP_WINDOW=300, REDISCOVERY_TICK=60)
+class TestScheduler(SimpleTestCase):
+
+    def setUp(self):
+        self.device_ips = [f"10.10.{i // 100}.{i % 100}" for i in range(DEVICE_COUNT)]
+
+    def test_phase_offset(self):
+        for device_ip in self.device_ips:
+            offset = get_phase_offset(device_ip, INTERVAL)
+            assert 0 <= offset < INTERVAL * 60
+            assert offset % 60 == 0
+            assert offset == get_phase_offset(device_ip, INTERVAL)
+            # the runs keep their phase across restarts
+            run = get_trigger(device_ip, INTERVAL).get_next_fire_time(None, NOW)
+            assert run.timestamp() % (INTERVAL * 60) == offset
+            assert NOW <= run < NOW + datetime.timedelta(minutes=INTERVAL)
+
+    def test_staggered_start(self):
+        """
+        Simulates an interval of discoveries of the devices, all added at the
+        same time, started at once and staggered.
+        """
+        lockstep = get_batch_sizes([NOW] * DEVICE_COUNT)
+        staggered = get_batch_sizes([
+            get_next_run_time(device_ip, INTERVAL, NOW, NOW) for device_ip in self.device_ips
+        ])
+        print(f"\nDiscovery batches of {DEVICE_COUNT} devices: lockstep {lockstep}, staggered {staggered}")
+        assert lockstep == [DEVICE_COUNT]
+        # one batch per tick, 10 devices on average
+        assert len(staggered) == INTERVAL
+        assert max(staggered) <= 20
+
+    def test_catch_up(self):
+        """
+        Simulates a restart after an hour down, the overdue devices are
+        discovered once over REDISCOVERY_CATCHUP_WINDOW.
+        """
+        last_discovered = NOW - datetime.timedelta(hours=1)
+        runs = [get_next_run_time(device_ip, INTERVAL, last_discovered, NOW) for device_ip in self.device_ips]
+        assert all(NOW <= i < NOW + datetime.timedelta(seconds=300) for i in runs)
+        # one batch per tick of the window, 20 devices on average
+        batches = get_batch_sizes(runs)
+        assert len(batches) == 5
+        assert max(batches) <= 35
+        # never discovered
+        assert get_next_run_time(self.device_ips[0], INTERVAL, None, NOW) == runs[0]
+
+        # a device discovered recently is not caught up
+        last_discovered = NOW - datetime.timedelta(minutes=2)
+        run = get_next_run_time(self.device_ips[0], INTERVAL, last_discovered, NOW)
+        assert run == get_trigger(self.device_ips[0], INTERVAL).get_next_fire_time(None, NOW)
+
+
+
+@override_settings(REDISCOVERY_LEASE_TTL=30)
+class TestSchedulerLeader(TestCase):
+
+    def setUp(self):
+        patch_scheduler(self)
+
+    def get_job_ids(self) -> list:
+        return sorted(job.id for job in scheduler.scheduler.get_jobs())
+
+    def test_lease(self):
+        assert acquire_lease("a", NOW)
+        assert not acquire_lease("b", NOW)
+        assert acquire_lease("a", NOW + datetime.timedelta(seconds=20))
+        # not renewed
+        assert acquire_lease("b", NOW + datetime.timedelta(seconds=51))
+        assert not acquire_lease("a", NOW + datetime.timedelta(seconds=52))
+        release_lease("a")
+        assert SchedulerLease.objects.get().owner == "b"
+        release_lease("b")
+        assert acquire_lease("a", NOW + datetime.timedelta(seconds=52))
+
+    def test_requires_shared_locks(self):
+        scheduler.scheduler.shutdown(wait=False)
+        with self.settings(DEVICE_LOCK_BACKEND="memory"), self.assertRaises(ImproperlyConfigured):
+            scheduler.start_scheduler()
+        assert not scheduler.scheduler.running
+
+    def test_single_leader(self):
+        for device_ip in ("10.10.0.1", "10.10.0.2"):
+            ReDiscoveryConfig.objects.create(device_ip=device_ip, interval=INTERVAL)
+        future = datetime.datetime.now(tz=datetime.timezone.utc) + datetime.timedelta(minutes=1)
+        SchedulerLease.objects.create(name=scheduler.LEASE_NAME, owner="other", expires_at=future)
+
+        # another process leads, no discoveries here
+        scheduler.renew_leadership()
+        assert not scheduler.is_leader()
+        scheduler.add_scheduler("10.10.0.3", INTERVAL)
+        assert self.get_job_ids() == []
+
+        # its lease expired
+        SchedulerLease.objects.update(expires_at=future - datetime.timedelta(minutes=2))
+        ReDiscoveryConfig.objects.create(device_ip="10.10.0.3", interval=INTERVAL)
+        scheduler.renew_leadership()
+        assert scheduler.is_leader()
+        assert self.get_job_ids() == ["job_10.10.0.1", "job_10.10.0.2", "job_10.10.0.3"]
+
+        # changes made through other processes
+        ReDiscoveryConfig.objects.filter(device_ip="10.10.0.1").delete()
+        ReDiscoveryConfig.objects.filter(device_ip="10.10.0.2").update(interval=INTERVAL * 2)
+        scheduler.renew_leadership()
+        assert self.get_job_ids() == ["job_10.10.0.2", "job_10.10.0.3"]
+        assert scheduler.scheduler.get_job("job_10.10.0.2").trigger.interval == datetime.timedelta(minutes=INTERVAL * 2)
+
+        # lease taken over, e.g. after this process stalled
+        SchedulerLease.objects.update(owner="other", expires_at=future)
+        scheduler.renew_leadership()
+        assert not scheduler.is_leader()
+        assert self.get_job_ids() == []
+
+
+# the batches run one after another, in the thread of the test and its transaction
+@override_settings(REDISCOVERY_BATCH_SIZE=4, REDISCOVERY_MAX_WORKERS=1, REDISCOVERY_BATCH_WINDOW=0)
+class TestBatchedDiscovery(TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.device_ips = [f"10.10.0.{i}" for i in range(10)]
+        for device_ip in self.device_ips:
+            ReDiscoveryConfig.objects.create(device_ip=device_ip, interval=INTERVAL)
+        # no fingerprints, the devices are fully discovered
+        patches = [
+            mock.patch.object(fingerprint, "discover_device", self.discover_device),
+            mock.patch.dict(fingerprint.FEATURE_FINGERPRINTS, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        patch_scheduler(self)
+        scheduler._leader.set()
+        self.addCleanup(device_locks.clear)
+
+    def discover_device(self, device_ips):
+        self.calls.append(sorted(device_ips))
+        assert all(device_locks.get(i)["state"] == str(State.SCHEDULED_DISCOVERY_IN_PROGRESS) for i in device_ips)
+        if "10.10.0.3" in device_ips:
+            raise ConnectionError("Device not reachable")
+
+    def test_batches(self):
+        device_locks.acquire({"10.10.0.9": State.CONFIG_IN_PROGRESS})
+        with mock.patch.object(scheduler, "invalidate_device") as invalidate_device:
+            discovered = discover_devices(self.device_ips)
+        # the busy device is skipped, the failed batch is discovered device by device
+        assert sorted(discovered) == [i for i in self.device_ips if i not in ("10.10.0.3", "10.10.0.9")]
+        assert sorted(self.calls) == [
+            ["10.10.0.0"], ["10.10.0.0", "10.10.0.1", "10.10.0.2", "10.10.0.3"], ["10.10.0.1"], ["10.10.0.2"],
+            ["10.10.0.3"], ["10.10.0.4", "10.10.0.5", "10.10.0.6", "10.10.0.7"], ["10.10.0.8"],
+        ]
+        assert sorted(i.args[0] for i in invalidate_device.call_args_list) == sorted(discovered)
+        assert device_locks.get("10.10.0.9")["state"] == str(State.CONFIG_IN_PROGRESS)
+        assert device_locks.get("10.10.0.0") is None
+        assert sorted(
+            ReDiscoveryConfig.objects.filter(last_discovered=None).values_list("device_ip", flat=True)
+        ) == ["10.10.0.3", "10.10.0.9"]
+
+    def test_due_devices_merged(self):
+        for device_ip in self.device_ips[4:8]:
+            scheduler.scheduled_discovery(device_ip)
+        # one batch job for all the due devices
+        assert [job.id for job in scheduler.scheduler.get_jobs()] == [scheduler.BATCH_JOB_ID]
+        scheduler.run_discoveries()
+        assert self.calls == [self.device_ips[4:8]]
+
+
+@override_settings(REDISCOVERY_MIN_INTERVAL=5, REDISCOVERY_MAX_INTERVAL=60, REDISCOVERY_HISTORY_SIZE=3)
+class TestAdaptiveInterval(TestCase):
+
+    def setUp(self):
+        self.state_hashes = {}
+        patches = [
+            mock.patch.object(fingerprint, "discover_device"),
+            mock.patch.dict(fingerprint.FEATURE_FINGERPRINTS, clear=True),
+            mock.patch.object(scheduler, "invalidate_device"),
+            mock.patch.object(scheduler, "get_state_hash", lambda device_ip: self.state_hashes[device_ip]),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        patch_scheduler(self)
+        scheduler._leader.set()
+
+    def get_intervals(self, config: ReDiscoveryConfig, state_hashes: str) -> list:
+        intervals = []
+        for state_hash in state_hashes:
+            adapt_interval(config, state_hash, NOW)
+            intervals.append(get_interval(config))
+        return intervals
+
+    def test_adapt_interval(self):
+        config = ReDiscoveryConfig(device_ip="10.10.0.1", interval=20, adaptive=True)
+        # backs off while quiet, up to the maximum
+        assert self.get_intervals(config, "aaaaa") == [20, 30, 45, 60, 60]
+        # tightens while busy, down to the minimum
+        assert self.get_intervals(config, "bcdef") == [30, 15, 7, 5, 5]
+        assert config.history == [
+            {"time": NOW.isoformat(), "changed": True, "interval": 7},
+            {"time": NOW.isoformat(), "changed": True, "interval": 5},
+            {"time": NOW.isoformat(), "changed": True, "interval": 5},
+        ]
+        # the interval of the user is kept
+        assert config.interval == 20
+
+    def test_base_interval_restored(self):
+        config = ReDiscoveryConfig(device_ip="10.10.0.1", interval=2, adaptive=True)
+        # only the adapted interval is clamped
+        assert self.get_intervals(config, "aa") == [2, 5]
+        config.adaptive = False
+        assert (get_interval(config), config.interval) == (2, 2)
+
+    def test_rediscovery(self):
+        ReDiscoveryConfig.objects.create(device_ip="10.10.0.1", interval=INTERVAL, adaptive=True)
+        ReDiscoveryConfig.objects.create(device_ip="10.10.0.2", interval=INTERVAL)
+        scheduler.sync_schedulers()
+        for state_hash in ("a", "a", "b"):
+            self.state_hashes["10.10.0.1"] = state_hash
+            discover_devices(["10.10.0.1", "10.10.0.2"])
+            job = scheduler.scheduler.get_job("job_10.10.0.1")
+            config = ReDiscoveryConfig.objects.get(device_ip="10.10.0.1")
+            assert job.trigger.interval == datetime.timedelta(minutes=get_interval(config))
+        assert [i["changed"] for i in config.history] == [None, False, True]
+        assert (config.interval, config.adapted_interval) == (INTERVAL, 7)
+        # the interval of a device not adaptive is fixed
+        config = ReDiscoveryConfig.objects.get(device_ip="10.10.0.2")
+        assert (config.interval, config.history) == (INTERVAL, [])
+        assert config.last_discovered is not None
@@ -0,0 +1,116 @@
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import path
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from network import search
+from network.cache import invalidate_all, invalidate_device
+from network.search import SearchSource, search_index
+
+urlpatterns = [
+    path("search", search.search, name="search"),
+]
+
+devices = []
+calls = []
+
+
+def get_device_details(device_ip=None):
+    if device_ip:
+        return {"mgt_ip": device_ip, "mac": f"0c:c1:5a:d4:00:{devices.index(device_ip):02x}", "hostname": device_ip}
+    return [{"mgt_ip": i} for i in devices]
+
+
+def get_interfaces(device_ip):
+    calls.append(device_ip)
+    device_index = devices.index(device_ip)
+    return [
+        {"name": f"Ethernet{i}", "description": f"Uplink to spine-{i}" if i < 2 else "", "mac_addr": None}
+        for i in range(128)
+    ] + [{"name": "Vlan10", "ip_address": [f"10.20.{device_index}.1/24"]}]
+
+
+@override_settings(ROOT_URLCONF="network.test.test_search")
+class TestSearch(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        search_index.clear()
+        calls.clear()
+        devices[:] = [f"10.10.{i // 100}.{i % 100}" for i in range(4)]
+        patches = [
+            mock.patch.object(search, "get_device_details", get_device_details),
+            mock.patch.dict(search.SEARCH_SOURCES, {
+                "device": SearchSource(get_device_details, "mgt_ip", ("mgt_ip", "mac", "hostname")),
+                "interface": SearchSource(get_interfaces, "name", ("name", "description", "ip_address")),
+            }, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client.force_authenticate(user=mock.Mock(is_authenticated=True))
+
+    def search(self, **params):
+        return self.client.get("/search", params)
+
+    def test_search_ip(self):
+        response = self.search(q="10.20.2.1")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == [{
+            "mgt_ip": "10.10.0.2", "type": "interface", "name": "Vlan10",
+            "field": "ip_address", "value": "10.20.2.1/24",
+        }]
+        # prefix
+        assert len(self.search(q="10.20.").json()) == 4
+        assert self.search(q="10.30.").status_code == status.HTTP_204_NO_CONTENT
+
+    def test_search_mac_and_description(self):
+        response = self.search(q="0C:C1:5A:D4:00:03")
+        assert [(i["mgt_ip"], i["type"]) for i in response.json()] == [("10.10.0.3", "device")]
+
+        response = self.search(q="uplink spine-1", type="interface")
+        assert [(i["mgt_ip"], i["name"]) for i in response.json()] == [(i, "Ethernet1") for i in devices]
+        assert len(self.search(q="uplink", limit=3).json()) == 3
+
+    def test_invalid_params(self):
+        assert self.search().status_code == status.HTTP_400_BAD_REQUEST
+        assert self.search(q="x", limit=0).status_code == status.HTTP_400_BAD_REQUEST
+        assert self.search(q="x", type="unknown").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_incremental_refresh(self):
+        self.search(q="uplink")
+        assert sorted(calls) == devices
+        calls.clear()
+
+        self.search(q="uplink")
+        assert calls == []
+
+        invalidate_device("10.10.0.1")
+        self.search(q="uplink")
+        assert calls == ["10.10.0.1"]
+        calls.clear()
+
+        devices.remove("10.10.0.3")
+        devices.append("10.10.0.4")
+        invalidate_device("10.10.0.4")
+        assert {i["mgt_ip"] for i in self.search(q="10.10.").json()} == set(devices)
+        assert calls == ["10.10.0.4"]
+
+        invalidate_all()
+        calls.clear()
+        self.search(q="uplink")
+        assert sorted(calls) == devices
+
+    def test_benchmark(self):
+        devices[:] = [f"10.10.{i // 100}.{i % 100}" for i in range(200)]
+        search_index.refresh()
+        start = time.perf_counter()
+        for _ in range(100):
+            results = search_index.search("10.20.150.1")
+        elapsed = (time.perf_counter() - start) / 100
+        assert len(results) == 1
+        assert elapsed < 0.01
@@ -2,7 +2,7 @@
 
 from django.urls import re_path, path
 
-from . import views, stp_vlan, stp_port, vlan, interface, port_chnl, mclag, bgp, port_group, stp
+from . import batch, fabric, ipam, search, views, stp_vlan, stp_port, vlan, interface, port_chnl, mclag, bgp, port_group, stp
 
 urlpatterns = [
     path("stp", stp.stp_global_config, name="stp_config"),
@@ -12,6 +12,12 @@ urlpatterns = [
     path("stp_vlan", stp_vlan.stp_vlan_config, name="stp_vlan_config"),
     path("breakout", interface.interface_breakout, name="breakout"),
     re_path("del_db", views.delete_db, name="del_db"),
+    path("cache/stats", views.get_cache_stats, name="cache_stats"),
+    path("batch", batch.batch_get, name="batch"),
+    path("fabric/ip_conflicts", ipam.ip_conflicts, name="ip_conflicts"),
+    path("ipam/free_prefix", ipam.free_prefix, name="free_prefix"),
+    path("fabric/<str:feature>", fabric.fabric_query, name="fabric"),
+    path("search", search.search, name="search"),
     # path("discover", views.discover, name="discover"),
     path("discover/feature", views.discover_by_feature, name="discover_by_feature"),
     path("discover/schedule", views.discover_scheduler, name="discover_scheduler"),
@@ -5,7 +5,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
 
-from network.models import ReDiscoveryConfig
+from network.cache import cache_get, cache_stats
+from network.models import DiscoveryFingerprint, DiscoveryRun, ReDiscoveryConfig
 from network.scheduler import add_scheduler, remove_scheduler
 from orca_nw_lib.common import DiscoveryFeature
 from orca_nw_lib.device import get_device_details
@@ -13,7 +14,8 @@ from orca_nw_lib.discovery import discover_device, discover_nw_features
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
 from network.util import add_msg_to_list, get_failure_msg, get_success_msg
-from state_manager.models import ORCABusyState
+from orca_backend.renderers import list_response
+from state_manager.locks import device_locks
 
 _logger = get_backend_logger()
 
@@ -108,6 +110,7 @@ def discover(request):
         "GET",
     ]
 )
+@cache_get
 def device_list(request):
     """
     A view function that handles the GET request for the device_list endpoint.
@@ -122,6 +125,8 @@ def device_list(request):
     if request.method == "GET":
         data = get_device_details(request.GET.get("mgt_ip", None))
         _logger.debug(data)
+        if isinstance(data, list):
+            return list_response(request, data)
         return (
             Response(data, status=status.HTTP_200_OK)
             if data
@@ -170,6 +175,12 @@ def discover_by_feature(request):
 def discover_scheduler(request):
     """
     This function is an API view that handles the HTTP GET, PUT, and DELETE requests for the 'discover_scheduler' endpoint.
+
+    A PUT with adaptive true lets the scheduler adapt the interval of the device
+    to how often its rediscoveries find changes, starting from the interval of
+    the PUT, which applies again once adaptive is false. The GET returns the
+    interval, the adapted one, the history of the rediscoveries and the
+    statistics of the last discovery runs, with the features executed and skipped.
     """
     if request.method == "GET":
         device_ip = request.GET.get("mgt_ip", None)
@@ -182,10 +193,12 @@ def discover_scheduler(request):
         data = ReDiscoveryConfig.objects.filter(
             device_ip=device_ip
         ).first()
-        return (
-            Response(model_to_dict(data), status=status.HTTP_200_OK)
-            if data
-            else Response({}, status=status.HTTP_204_NO_CONTENT)
+        if not data:
+            return Response({}, status=status.HTTP_204_NO_CONTENT)
+        runs = DiscoveryRun.objects.filter(device_ip=device_ip).order_by("-id")[:10]
+        return Response(
+            {**model_to_dict(data), "runs": [model_to_dict(run, exclude=["id", "device_ip"]) for run in runs]},
+            status=status.HTTP_200_OK,
         )
 
     if request.method == "PUT":
@@ -211,6 +224,8 @@ def discover_scheduler(request):
             ReDiscoveryConfig.objects.update_or_create(
                 device_ip=device_ip, defaults={
                     "interval": interval,
+                    "adaptive": bool(req_data.get("adaptive", False)),
+                    "adapted_interval": None,
                     "last_discovered": datetime.datetime.now(tz=datetime.timezone.utc)
                 }
             )
@@ -253,12 +268,23 @@ def remove_schedular_and_state(device_ip: str):
         # Removing scheduler
         ReDiscoveryConfig.objects.filter(device_ip=device_ip).delete()
         remove_scheduler(device_ip)
+        DiscoveryFingerprint.objects.filter(device_ip=device_ip).delete()
 
         # Removing state
-        ORCABusyState.objects.filter(device_ip=device_ip).delete()
+        device_locks.release([device_ip])
     else:
         # Removing all schedular of all devices
         schedule_objs = ReDiscoveryConfig.objects.all().delete()
+        DiscoveryFingerprint.objects.all().delete()
 
         # Removing all state of all devices
-        state_objs = ORCABusyState.objects.all().delete()
+        device_locks.clear()
+
+
+@api_view(["GET"])
+def get_cache_stats(request):
+    """
+    Returns the hit, miss, bypass and invalidation counters of the network GET
+    response cache of this process.
+    """
+    return Response(cache_stats.get(), status=status.HTTP_200_OK)
@@ -6,7 +6,6 @@ from orca_nw_lib.vlan import (
     get_vlan,
     del_vlan,
     config_vlan,
-    get_vlan_members,
     del_vlan_mem,
     remove_ip_from_vlan,
     remove_anycast_ip_from_vlan,
@@ -15,6 +14,11 @@ from orca_nw_lib.common import IFMode, VlanAutoState
 
 from log_manager.decorators import log_request
 from log_manager.logger import get_backend_logger
+from network.cache import cache_get
+from network.bulk import run_per_device
+from network.ipam import check_ip_conflicts
+from network.members import get_device_vlan_members
+from network.query import InvalidQuery, ListQuery
 from network.util import (
     add_msg_to_list,
     get_failure_msg,
@@ -26,6 +30,7 @@ _logger = get_backend_logger()
 
 
 @api_view(["GET", "PUT", "DELETE"])
+@cache_get
 @log_request
 def vlan_config(request):
     """
@@ -37,8 +42,6 @@ def vlan_config(request):
     Returns:
         Response: The response object containing the result of the function.
     """
-    result = []
-    http_status = True
     if request.method == "GET":
         device_ip = request.GET.get("mgt_ip", "")
         if not device_ip:
@@ -48,39 +51,49 @@ def vlan_config(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
         vlan_name = request.GET.get("name", "")
+        try:
+            query = ListQuery(request.GET, key="name")
+        except InvalidQuery as e:
+            _logger.error(str(e))
+            return Response({"status": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         data = get_vlan(device_ip, vlan_name)
-        for vlan_data in data if isinstance(data, list) else [data] if data else []:
-            vlan_data["mem_ifs"] = get_vlan_members(device_ip, vlan_data["name"])
-            for mem_if in vlan_data["mem_ifs"]:
-                vlan_data["mem_ifs"][mem_if] = str(vlan_data["mem_ifs"][mem_if])
+        # before the selection, the members can be filtered on
+        if query.selects("mem_ifs"):
+            vlans = data if isinstance(data, list) else [data] if data else []
+            members = get_device_vlan_members(device_ip) if vlans else {}
+            for vlan_data in vlans:
+                vlan_data["mem_ifs"] = members.get(vlan_data["name"], {})
+        data, next_cursor = query.select(data)
+        return query.get_response(data, next_cursor)
 
-        return (
-            Response(data, status=status.HTTP_200_OK)
-            if data
-            else Response({}, status=status.HTTP_204_NO_CONTENT)
-        )
-
-    for req_data in (
+    req_data_list = (
         request.data
         if isinstance(request.data, list)
         else [request.data] if request.data else []
-    ):
-        if request.method == "PUT":
-            device_ip = req_data.get("mgt_ip", "")
-            if not device_ip:
-                _logger.error("Required field device mgt_ip not found.")
-                return Response(
-                    {"status": "Required field device mgt_ip not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            vlan_name = req_data.get("name", "")
-            if not vlan_name:
-                _logger.error("Required field device vlan_name not found.")
-                return Response(
-                    {"status": "Required field device vlan_name not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+    )
+    for req_data in req_data_list:
+        device_ip = req_data.get("mgt_ip", "")
+        if not device_ip:
+            _logger.error("Required field device mgt_ip not found.")
+            return Response(
+                {"status": "Required field device mgt_ip not found."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == "PUT" and not req_data.get("name", ""):
+            _logger.error("Required field device vlan_name not found.")
+            return Response(
+                {"status": "Required field device vlan_name not found."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    if request.method == "PUT" and (conflict_response := check_ip_conflicts(req_data_list)):
+        return conflict_response
 
+    def config(req_data):
+        result = []
+        http_status = True
+        device_ip = req_data.get("mgt_ip", "")
+        vlan_name = req_data.get("name", "")
+        if request.method == "PUT":
             members = {}
             if mem := req_data.get("mem_ifs"):
                 ## Update members dictionary with tagging mode Enum
@@ -115,14 +128,6 @@ def vlan_config(request):
                 _logger.error("Failed to configure VLAN: %s", vlan_name)
 
         elif request.method == "DELETE":
-            device_ip = req_data.get("mgt_ip", "")
-            if not device_ip:
-                _logger.error("Required field device mgt_ip not found.")
-                return Response(
-                    {"status": "Required field device mgt_ip not found."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            vlan_name = req_data.get("name", "")
             if vlan_name:
                 if members := req_data.get("mem_ifs"):
                     ## Update members dictionary with tagging mode Enum
@@ -147,7 +152,9 @@ def vlan_config(request):
                 add_msg_to_list(result, get_failure_msg(err, request))
                 http_status = http_status and False
                 _logger.error("Failed to delete VLAN: %s", vlan_name)
+        return result, http_status
 
+    result, http_status = run_per_device(req_data_list, config)
     return Response(
         {"result": result},
         status=(
@@ -0,0 +1,37 @@
+import re
+
+import brotli
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+re_accepts_br = re.compile(r"\bbr\b")
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Middleware compressing the responses with brotli for the clients accepting
+    it, else with gzip, see django.middleware.gzip.GZipMiddleware. Streamed
+    responses are always compressed with gzip.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < 200
+            or not re_accepts_br.search(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(response.content))
+        # the compressed body differs from the one of a strong ETag
+        if response.has_header("ETag"):
+            response.headers["ETag"] = re.sub(r"^W/|^", "W/", response.headers["ETag"])
+        response.headers["Content-Encoding"] = "br"
+        return response
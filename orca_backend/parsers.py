@@ -0,0 +1,62 @@
+""" Parsers of the API request bodies. """
+import io
+
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.parsers import BaseParser
+from rest_framework.settings import api_settings
+
+
+class ORJSONParser(BaseParser):
+    """
+    JSON parser decoding with orjson.
+    """
+    media_type = "application/json"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read() if stream else b"")
+        except orjson.JSONDecodeError as e:
+            raise ParseError(f"JSON parse error - {e}")
+
+
+class MessagePackParser(BaseParser):
+    """
+    MessagePack parser, so that large bulk requests can be sent compactly.
+    """
+    media_type = "application/msgpack"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read() if stream else b"")
+        except (ValueError, msgpack.UnpackException) as e:
+            raise ParseError(f"MessagePack parse error - {e}")
+
+
+def parse_body(request):
+    """
+    Returns the body of a request decoded by the parser of its content type
+    among DEFAULT_PARSER_CLASSES, as the views see it, for the middlewares
+    reading the body before the view.
+
+    Parameters:
+        request (HttpRequest): The HTTP request object.
+
+    Returns:
+        The decoded body, None if it is empty, of an unsupported content type
+        or malformed, the view then rejecting it.
+    """
+    if not request.body:
+        return None
+    parsers = [parser_class() for parser_class in api_settings.DEFAULT_PARSER_CLASSES]
+    parser = DefaultContentNegotiation().select_parser(request, parsers)
+    if parser is None:
+        return None
+    try:
+        data = parser.parse(io.BytesIO(request.body), request.content_type, {"request": request})
+    except ParseError:
+        return None
+    # the multipart parser returns the data with the files
+    return getattr(data, "data", data)
@@ -0,0 +1,132 @@
+""" Renderers of the API responses. """
+import itertools
+
+import msgpack
+import orjson
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+# Encodes the types orjson does not support natively (Decimal, lazy strings,
+# querysets...) the same way as the default DRF renderer.
+_encoder = JSONEncoder()
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def dumps(data, indent: bool = False) -> bytes:
+    """
+    Encodes data to JSON with orjson.
+
+    Parameters:
+        data: The data to encode.
+        indent (bool): Whether to indent the JSON with 2 spaces.
+
+    Returns:
+        bytes: The JSON.
+    """
+    return orjson.dumps(data, default=_encoder.default, option=_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0))
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer encoding with orjson, several times faster than the DRF
+    renderer and without building intermediate strings.
+    """
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        params = self.get_params(accepted_media_type)
+        return dumps(data, indent=bool(params.get("indent")))
+
+    @staticmethod
+    def get_params(accepted_media_type) -> dict:
+        params = {}
+        for param in (accepted_media_type or "").split(";")[1:]:
+            name, _, value = param.partition("=")
+            params[name.strip()] = value.strip()
+        return params
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline delimited JSON renderer, one item of a list per line. Views can
+    stream their lists in this format with list_response.
+    """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return b"".join(iter_ndjson(data if isinstance(data, list) else [data]))
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    MessagePack renderer, a binary encoding smaller and faster to parse than
+    JSON. Values are converted as by the JSON renderer, e.g. dates to strings.
+    """
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=_encoder.default)
+
+
+def iter_ndjson(items):
+    """
+    Encodes the items one by one as lines of NDJSON.
+
+    Parameters:
+        items (iterable): The items.
+
+    Returns:
+        generator: The encoded lines.
+    """
+    for item in items:
+        yield dumps(item) + b"\n"
+
+
+def streams(request) -> bool:
+    """
+    Returns whether the client accepted NDJSON, the responses of which are streamed.
+    """
+    renderer = getattr(request, "accepted_renderer", None)
+    return renderer is not None and renderer.format == NDJSONRenderer.format
+
+
+def list_response(request, items):
+    """
+    Returns the response of a list GET. When the client accepts NDJSON the items
+    are encoded and sent while iterated, so a large list is never held encoded
+    in memory, and never held at all when items is a generator.
+
+    Parameters:
+        request (Request): The request object.
+        items (iterable): The items.
+
+    Returns:
+        HttpResponse: 200 with the items, 204 when there are none.
+    """
+    items = iter(items)
+    first = next(items, None)
+    if first is None:
+        return Response({}, status=status.HTTP_204_NO_CONTENT)
+    if streams(request):
+        return StreamingHttpResponse(
+            iter_ndjson(itertools.chain([first], items)),
+            content_type=NDJSONRenderer.media_type,
+        )
+    return Response([first, *items], status=status.HTTP_200_OK)
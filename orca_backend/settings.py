@@ -58,6 +58,9 @@ if os.path.isdir(os.path.join(BASE_DIR, 'orcask')):
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # compresses the responses with brotli or gzip, must stay above the
+    # middlewares reading the response body
+    "orca_backend.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -67,7 +70,8 @@ MIDDLEWARE = [
     ##Added
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
-    'state_manager.middleware.BlockPutMiddleware'
+    'state_manager.middleware.BlockPutMiddleware',
+    'network.middleware.CacheInvalidationMiddleware',
 ]
 
 #Added
@@ -154,8 +158,32 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'orca_backend.renderers.ORJSONRenderer',
+        'orca_backend.renderers.NDJSONRenderer',
+        'orca_backend.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'orca_backend.parsers.ORJSONParser',
+        'orca_backend.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Brotli quality of the compressed responses, 0-11, higher is smaller and slower.
+BROTLI_QUALITY = 5
+
+# Number of rows kept in the logs table, older rows are pruned in batches
+# of LOG_PRUNE_BATCH_SIZE writes.
+LOG_MAX_ROWS = 1000
+LOG_PRUNE_BATCH_SIZE = 100
+# Request logs are saved by a background writer in batches of
+# LOG_WRITER_BATCH_SIZE, buffering at most LOG_WRITER_BUFFER_SIZE logs.
+LOG_WRITER_BATCH_SIZE = 100
+LOG_WRITER_BUFFER_SIZE = 10000
+
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'django-db'
 CELERY_ACCEPT_CONTENT = ['json']
@@ -168,3 +196,71 @@ CELERY_TASK_STORE_EAGER_RESULT = False
 CELERY_TASK_EAGER_PROPAGATES_EXCEPTIONS = False
 CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_BROKER_CONNECTION_RETRY = True
+
+# Backend keeping the busy state of the devices, "database" or "redis" to share
+# it between the web, Celery and scheduler processes, "memory" only when all of
+# them run in a single process, the rediscovery scheduler refuses it.
+DEVICE_LOCK_BACKEND = "database"
+DEVICE_LOCK_REDIS_URL = CELERY_BROKER_URL
+# Seconds after which a device lock expires, with the memory and redis backends.
+DEVICE_LOCK_TTL = 3600
+# Maximum seconds a PUT can wait for a busy device, see X-Orca-Wait.
+DEVICE_LOCK_MAX_WAIT = 300
+# Seconds between the checks of a waiting request for devices released by other processes.
+DEVICE_LOCK_POLL_INTERVAL = 0.5
+
+# Maximum number of devices configured concurrently by a bulk request.
+BULK_MAX_WORKERS = 16
+
+# The cached network GET responses are shared by the processes using the same
+# cache. The local memory cache below keeps them per process, which is safe as
+# the change generations invalidating them are kept in the database, see
+# network.cache, but use Redis to share them between several web processes, e.g.
+# {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CELERY_BROKER_URL}
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "orca_backend",
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+# Seconds a network GET response and its ETag stay valid, in case a change of
+# a device is missed, like an update received by a gNMI subscription.
+NETWORK_CACHE_TTL = 30
+
+# Maximum number of sub-queries of a batch GET request.
+NETWORK_BATCH_MAX_QUERIES = 50
+
+# Maximum number of devices queried concurrently by a fabric wide GET.
+FABRIC_MAX_WORKERS = 64
+
+# Whether the IP addresses of the config PUTs are checked for conflicts with
+# the ones configured in the fabric, see network.ipam.
+IPAM_CONFLICT_CHECK = True
+
+# Seconds over which the devices overdue for rediscovery, like after a restart,
+# are caught up, see network.scheduler.
+REDISCOVERY_CATCHUP_WINDOW = 300
+
+# Seconds the lease of the process running the rediscovery scheduler lasts, it
+# is renewed every third of it and taken over by another process once expired.
+REDISCOVERY_LEASE_TTL = 30
+
+# Seconds of the rediscovery ticks, the devices due in the same tick are
+# discovered together, in batches of at most REDISCOVERY_BATCH_SIZE devices
+# and at most REDISCOVERY_MAX_WORKERS batches at a time. The due devices are
+# collected for REDISCOVERY_BATCH_WINDOW seconds before a batch starts.
+REDISCOVERY_TICK = 60
+REDISCOVERY_BATCH_SIZE = 50
+REDISCOVERY_MAX_WORKERS = 4
+REDISCOVERY_BATCH_WINDOW = 1
+
+# Bounds in minutes of the adaptive rediscovery intervals, halved when a
+# rediscovery finds changes and increased by half when it does not, and the
+# number of rediscoveries kept in the history of a device.
+REDISCOVERY_MIN_INTERVAL = 5
+REDISCOVERY_MAX_INTERVAL = 240
+REDISCOVERY_HISTORY_SIZE = 20
+
+# Number of discovery runs kept per device, see network.fingerprint.
+DISCOVERY_RUN_HISTORY_SIZE = 50
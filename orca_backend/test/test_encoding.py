@@ -0,0 +1,146 @@
+import gzip
+import json
+import time
+from unittest import mock
+
+import brotli
+import msgpack
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import path
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from django.urls import reverse
+from rest_framework.test import APISimpleTestCase, APITestCase
+
+from network import vlan
+from network.cache import get_generation
+from orca_backend.renderers import MessagePackRenderer, ORJSONRenderer
+from state_manager.locks import device_locks
+from state_manager.models import State
+
+
+def get_interfaces(count: int) -> list:
+    return [
+        {
+            "name": f"Ethernet{i}",
+            "enabled": True,
+            "mtu": 9100,
+            "fec": "FEC_DISABLED",
+            "speed": "SPEED_25GB",
+            "oper_sts": "UP",
+            "admin_sts": "UP",
+            "description": "",
+            "last_chng": 1718011234000000000,
+            "mac_addr": "0c:c1:5a:d4:00:00",
+            "autoneg": "off",
+            "valid_speeds": "25000,10000,1000",
+            "ip_address": None,
+        }
+        for i in range(count)
+    ]
+
+
+@api_view(["GET", "PUT"])
+@permission_classes([permissions.AllowAny])
+def interfaces_stub(request):
+    if request.method == "GET":
+        return Response(get_interfaces(int(request.GET.get("count", 128))), status=status.HTTP_200_OK)
+    return Response({"result": request.data}, status=status.HTTP_200_OK)
+
+
+urlpatterns = [
+    path("interfaces_stub", interfaces_stub, name="interfaces_stub"),
+]
+
+
+@override_settings(
+    ROOT_URLCONF="orca_backend.test.test_encoding",
+    MIDDLEWARE=["orca_backend.middleware.CompressionMiddleware"],
+)
+class TestEncoding(APISimpleTestCase):
+
+    def test_msgpack_response(self):
+        response = self.client.get("/interfaces_stub", HTTP_ACCEPT="application/msgpack")
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content) == get_interfaces(128)
+
+    def test_msgpack_request(self):
+        body = [{"mgt_ip": "10.10.1.1", "name": f"Ethernet{i}", "mtu": 9100} for i in range(4)]
+        response = self.client.put(
+            "/interfaces_stub", msgpack.packb(body), content_type="application/msgpack"
+        )
+        assert response.json() == {"result": body}
+        response = self.client.put("/interfaces_stub", b"\xc1", content_type="application/msgpack")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_json_request(self):
+        response = self.client.put("/interfaces_stub", [{"mgt_ip": "10.10.1.1"}], format="json")
+        assert response.json() == {"result": [{"mgt_ip": "10.10.1.1"}]}
+        response = self.client.put("/interfaces_stub", b"{", content_type="application/json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_compression(self):
+        response = self.client.get("/interfaces_stub", HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        assert response["Content-Encoding"] == "br"
+        assert json.loads(brotli.decompress(response.content)) == get_interfaces(128)
+
+        response = self.client.get("/interfaces_stub", HTTP_ACCEPT_ENCODING="gzip")
+        assert response["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.content)) == get_interfaces(128)
+
+        response = self.client.get("/interfaces_stub", {"count": 0}, HTTP_ACCEPT_ENCODING="br")
+        assert not response.has_header("Content-Encoding")
+
+    def test_payload_size(self):
+        """
+        Compares the size and the encode time of the interfaces of 100 switches
+        with 128 interfaces each in the available encodings.
+        """
+        data = get_interfaces(128 * 100)
+
+        def measure(encode):
+            start = time.perf_counter()
+            payload = encode(data)
+            return len(payload), time.perf_counter() - start
+
+        sizes = {
+            "json": measure(ORJSONRenderer().render),
+            "json+gzip": measure(lambda i: gzip.compress(ORJSONRenderer().render(i), compresslevel=6)),
+            "json+br": measure(lambda i: brotli.compress(ORJSONRenderer().render(i), quality=5)),
+            "msgpack": measure(MessagePackRenderer().render),
+            "msgpack+br": measure(lambda i: brotli.compress(MessagePackRenderer().render(i), quality=5)),
+        }
+        print()
+        for name, (size, elapsed) in sizes.items():
+            print(f"{name}: {size // 1024} KiB, {elapsed * 1000:.1f} ms")
+        assert sizes["msgpack"][0] < sizes["json"][0]
+        assert sizes["json+br"][0] < sizes["json+gzip"][0] < sizes["json"][0]
+
+
+@override_settings(DEVICE_LOCK_BACKEND="database")
+class TestEncodingMiddlewares(APITestCase):
+    """
+    Requests through the default MIDDLEWARE and URLconf, whose middlewares read the body.
+    """
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username="testuser", password="testpassword"))
+        self.addCleanup(device_locks.clear)
+
+    def test_msgpack_put(self):
+        states = []
+
+        def config_vlan(device_ip, vlan_name, **kwargs):
+            states.append(device_locks.get(device_ip)["state"])
+
+        generations = {i: get_generation(i) for i in ("10.10.1.1", "10.10.1.2")}
+        body = [{"mgt_ip": "10.10.1.1", "name": "Vlan10"}]
+        with mock.patch.object(vlan, "config_vlan", config_vlan):
+            response = self.client.put(reverse("vlan_config"), msgpack.packb(body), content_type="application/msgpack")
+        assert response.status_code == status.HTTP_200_OK
+        # the device was locked and only its cached responses invalidated
+        assert states == [str(State.CONFIG_IN_PROGRESS)]
+        assert get_generation("10.10.1.1") > generations["10.10.1.1"]
+        assert get_generation("10.10.1.2") == generations["10.10.1.2"]
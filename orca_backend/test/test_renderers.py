@@ -0,0 +1,130 @@
+import datetime
+import decimal
+import json
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from django.http import StreamingHttpResponse
+from django.test import override_settings
+from django.urls import path
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APISimpleTestCase
+
+from orca_backend.renderers import NDJSONRenderer, ORJSONRenderer, list_response
+
+consumed = []
+
+
+def get_devices(count: int):
+    for i in range(count):
+        consumed.append(i)
+        yield {
+            "mgt_ip": f"10.10.{i // 256}.{i % 256}",
+            "hostname": f"switch-{i}",
+            "system_status": "System is ready",
+            "img_name": "SONiC-OS-4.1.0-Enterprise_Base",
+            "mac": "0c:c1:5a:d4:00:00",
+            "platform": "x86_64-kvm_x86_64-r0",
+            "type": "LEAF",
+            "uptime": 123456.78,
+        }
+
+
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def devices_stub(request):
+    return list_response(request, get_devices(int(request.GET.get("count", 3))))
+
+
+urlpatterns = [
+    path("devices_stub", devices_stub, name="devices_stub"),
+]
+
+
+def measure(func) -> tuple:
+    """
+    Returns the result of func, the CPU time it took and the peak of the memory it allocated.
+    """
+    tracemalloc.start()
+    start = time.process_time()
+    result = func()
+    elapsed = time.process_time() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+@override_settings(ROOT_URLCONF="orca_backend.test.test_renderers")
+class TestRenderers(APISimpleTestCase):
+
+    def setUp(self):
+        consumed.clear()
+
+    def test_orjson_renders_as_drf(self):
+        data = {
+            "name": "Ethernet0",
+            "speed": decimal.Decimal("25.5"),
+            "enabled": True,
+            "members": ("Ethernet1", "Ethernet2"),
+            "counters": {1: 2},
+            "date_done": datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc),
+        }
+        rendered = json.loads(ORJSONRenderer().render(data))
+        expected = json.loads(JSONRenderer().render(data))
+        assert rendered == expected
+        assert ORJSONRenderer().render(None) == b""
+        assert ORJSONRenderer().render([1], "application/json; indent=2") == b"[\n  1\n]"
+
+    def test_json_response(self):
+        response = self.client.get("/devices_stub")
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert [i["hostname"] for i in response.json()] == ["switch-0", "switch-1", "switch-2"]
+
+    def test_ndjson_response_is_streamed(self):
+        response = self.client.get("/devices_stub", HTTP_ACCEPT=NDJSONRenderer.media_type)
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Type"] == NDJSONRenderer.media_type
+        # only the first item is read to tell an empty list
+        assert consumed == [0]
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(i)["hostname"] for i in lines] == ["switch-0", "switch-1", "switch-2"]
+
+        response = self.client.get("/devices_stub", {"format": "ndjson", "count": 1})
+        assert len(b"".join(response.streaming_content).splitlines()) == 1
+
+    def test_empty_list(self):
+        assert self.client.get("/devices_stub", {"count": 0}).status_code == 204
+        assert self.client.get("/devices_stub", {"count": 0, "format": "ndjson"}).status_code == 204
+
+    def test_benchmark(self):
+        """
+        Compares the CPU time and the memory peak of rendering a fabric wide
+        device list with the DRF renderer, the orjson renderer and the NDJSON stream.
+        """
+        count = 20000
+        devices = list(get_devices(count))
+
+        drf, drf_time, drf_peak = measure(lambda: JSONRenderer().render(devices))
+        fast, fast_time, fast_peak = measure(lambda: ORJSONRenderer().render(devices))
+
+        def stream():
+            request = SimpleNamespace(accepted_renderer=NDJSONRenderer())
+            response = list_response(request, get_devices(count))
+            return sum(len(i) for i in response.streaming_content)
+
+        streamed, stream_time, stream_peak = measure(stream)
+
+        print(
+            f"\nDRF JSON: {drf_time * 1000:.0f} ms, {drf_peak // 1024} KiB peak"
+            f"\norjson: {fast_time * 1000:.0f} ms, {fast_peak // 1024} KiB peak"
+            f"\nNDJSON stream: {stream_time * 1000:.0f} ms, {stream_peak // 1024} KiB peak"
+        )
+        assert json.loads(drf) == json.loads(fast)
+        # newlines instead of the brackets and commas
+        assert streamed == len(fast) - 1
+        assert fast_time < drf_time
+        assert stream_peak < fast_peak
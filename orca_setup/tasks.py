@@ -5,6 +5,8 @@ from django_celery_results.models import TaskResult
 from orca_nw_lib.discovery import discover_device
 
 from log_manager.logger import get_backend_logger
+from network.cache import invalidate_all, invalidate_device
+from network.fingerprint import discover_changed
 from orca_nw_lib.setup import switch_image_on_device, install_image_on_device, scan_networks
 import multiprocessing
 
@@ -66,6 +68,9 @@ def switch_image_task(device_ip, image_name, **kwargs):
 def discovery_task(device_ips, **kwargs):
     """
     Performs discovery on a device.
+
+    The devices already discovered are discovered again only for the features
+    changed since, unless full_discovery is passed.
     Args:
         device_ips (list): A list of device IPs.
     """
@@ -80,11 +85,27 @@ def discovery_task(device_ips, **kwargs):
             result.append({"message": "failed", "details": f"Failed to discover devices from config. Error: {err}"})
             _logger.error("Failed to discover devices from config. Error: %s", err)
     try:
-        discover_device(device_ips=device_ips)
-        result.append({"message": "success", "details": "Discovery successful."})
+        if device_ips and not kwargs.get("discover_from_config", False):
+            runs = discover_changed(device_ips, full=kwargs.get("full_discovery", False))
+            failed = {device_ip: run["failed"] for device_ip, run in runs.items() if run["failed"]}
+            if failed:
+                raise Exception(f"Failed to discover features {failed}.")
+            result.append({
+                "message": "success",
+                "details": "Discovery successful.",
+                "executed": sum(len(run["executed"]) for run in runs.values()),
+                "skipped": sum(len(run["skipped"]) for run in runs.values()),
+            })
+        else:
+            discover_device(device_ips=device_ips)
+            result.append({"message": "success", "details": "Discovery successful."})
     except Exception as err:
         result.append({"message": "failed", "details": str(err)})
         _logger.error("Failed to discover devices. Error: %s", err)
+    if device_ips and not kwargs.get("discover_from_config", False):
+        invalidate_device(*device_ips)
+    else:
+        invalidate_all()
     return result
 
 
@@ -8,6 +8,7 @@ from rest_framework.response import Response
 
 from log_manager.logger import get_backend_logger
 from orca_backend.celery import cancel_task
+from orca_backend.renderers import list_response
 from orca_setup.tasks import discovery_task, create_tasks
 
 _logger = get_backend_logger()
@@ -21,10 +22,9 @@ def celery_task(request):
     result = []
     if request.method == "GET":
         task_id = request.GET.get("task_id", None)
-        if task_id:
-            data = _modify_celery_results(TaskResult.objects.get_task(task_id=task_id))
-        else:
-            data = [_modify_celery_results(i) for i in TaskResult.objects.all()]
+        if not task_id:
+            return list_response(request, (_modify_celery_results(i) for i in TaskResult.objects.all().iterator()))
+        data = _modify_celery_results(TaskResult.objects.get_task(task_id=task_id))
         return (
             Response(data, status=status.HTTP_200_OK)
             if data
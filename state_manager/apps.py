@@ -8,5 +8,5 @@ class StateManagerConfig(AppConfig):
 
     def ready(self):
         if 'runserver' in sys.argv:
-            from state_manager.models import ORCABusyState
-            ORCABusyState.objects.all().delete()
+            from state_manager.locks import device_locks
+            device_locks.clear()
@@ -0,0 +1,451 @@
+import abc
+import collections
+import datetime
+import functools
+import json
+import operator
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import Q
+
+from state_manager.models import ORCABusyState
+
+
+# Config domains of a device which can be locked separately, locking all of
+# them locks the whole device.
+FEATURES = ("interface", "port_chnl", "mclag", "vlan", "bgp", "stp", "port_group")
+
+
+def get_lock_keys(device_ips, features=None) -> list:
+    """
+    Returns the lock keys of the given devices.
+
+    Parameters:
+        device_ips (iterable): The IP addresses of the devices.
+        features (iterable): The features to lock, None locks the whole device.
+
+    Returns:
+        list: List of (device_ip, feature) tuples.
+    """
+    return [(device_ip, feature) for device_ip in device_ips for feature in features or FEATURES]
+
+
+class LockBackend(abc.ABC):
+    """
+    Keeps the busy state of the devices.
+
+    A lock is keyed by a (device_ip, feature) tuple and holds the state of the
+    operation running on it, all the keys of a request are locked atomically,
+    either all of them or none.
+    """
+
+    @abc.abstractmethod
+    def acquire(self, key_states: dict):
+        """
+        Locks all the given keys, if none of them is locked.
+
+        Parameters:
+            key_states (dict): Dictionary with (device_ip, feature) as key and State as value.
+
+        Returns:
+            dict: None if the keys were locked, otherwise the lock of a busy key.
+        """
+
+    @abc.abstractmethod
+    def release(self, keys):
+        """
+        Unlocks the given keys.
+
+        Parameters:
+            keys (iterable): The (device_ip, feature) tuples.
+        """
+
+    @abc.abstractmethod
+    def get(self, device_ip: str) -> list:
+        """
+        Returns the locks of the device.
+
+        Parameters:
+            device_ip (str): The IP address of the device.
+
+        Returns:
+            list: List of dictionaries with device_ip, feature, state and last_updated_time.
+        """
+
+    @abc.abstractmethod
+    def clear(self):
+        """
+        Unlocks all the devices.
+        """
+
+    @staticmethod
+    def _lock(key, state, last_updated_time=None) -> dict:
+        return {
+            "device_ip": key[0],
+            "feature": key[1],
+            "state": str(state),
+            "last_updated_time": last_updated_time or datetime.datetime.now(datetime.timezone.utc),
+        }
+
+
+class InMemoryLockBackend(LockBackend):
+    """
+    Lock backend for a single process, locks live in a dict guarded by a mutex.
+    Locks expire after DEVICE_LOCK_TTL seconds.
+    """
+
+    def __init__(self):
+        self._mutex = threading.Lock()
+        self._locks = {}
+
+    def acquire(self, key_states: dict):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._mutex:
+            for key in key_states:
+                if lock := self._get(key, now):
+                    return lock
+            for key, state in key_states.items():
+                self._locks[key] = self._lock(key, state, now)
+        return None
+
+    def release(self, keys):
+        with self._mutex:
+            for key in keys:
+                self._locks.pop(key, None)
+
+    def get(self, device_ip: str) -> list:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._mutex:
+            return [
+                lock for key in list(self._locks) if key[0] == device_ip
+                if (lock := self._get(key, now))
+            ]
+
+    def clear(self):
+        with self._mutex:
+            self._locks.clear()
+
+    def _get(self, key, now):
+        lock = self._locks.get(key)
+        if lock and (now - lock["last_updated_time"]).total_seconds() > settings.DEVICE_LOCK_TTL:
+            del self._locks[key]
+            return None
+        return dict(lock) if lock else None
+
+
+class DatabaseLockBackend(LockBackend):
+    """
+    Lock backend keeping the locks in the ORCABusyState table, shared by all
+    the processes using the same database.
+
+    A conflicting lock released before it is read back, or a table locked by a
+    concurrent write (SQLite), is retried up to ATTEMPTS times.
+    """
+
+    ATTEMPTS = 10
+    RETRY_DELAY = 0.01
+
+    def acquire(self, key_states: dict):
+        return self._retry(functools.partial(self._acquire, key_states))
+
+    def release(self, keys):
+        keys = list(keys)
+        if keys:
+            self._retry(ORCABusyState.objects.filter(self._filter(keys)).delete)
+
+    def get(self, device_ip: str) -> list:
+        return self._retry(lambda: [
+            self._lock((obj.device_ip, obj.feature), obj.state, obj.last_updated_time)
+            for obj in ORCABusyState.objects.filter(device_ip=device_ip)
+        ])
+
+    def clear(self):
+        self._retry(ORCABusyState.objects.all().delete)
+
+    def _acquire(self, key_states: dict):
+        now = datetime.datetime.now(datetime.timezone.utc)
+        try:
+            with transaction.atomic():
+                ORCABusyState.objects.bulk_create(
+                    [
+                        ORCABusyState(device_ip=device_ip, feature=feature, state=str(state), last_updated_time=now)
+                        for (device_ip, feature), state in key_states.items()
+                    ]
+                )
+        except IntegrityError:
+            obj = ORCABusyState.objects.filter(self._filter(key_states)).first()
+            if obj is None:
+                raise
+            return self._lock((obj.device_ip, obj.feature), obj.state, obj.last_updated_time)
+        return None
+
+    def _retry(self, operation):
+        for attempt in range(1, self.ATTEMPTS + 1):
+            try:
+                return operation()
+            except (IntegrityError, OperationalError) as e:
+                retryable = isinstance(e, IntegrityError) or "locked" in str(e)
+                if not retryable or attempt == self.ATTEMPTS:
+                    raise
+            time.sleep(self.RETRY_DELAY * attempt)
+
+    @staticmethod
+    def _filter(keys):
+        return functools.reduce(
+            operator.or_, (Q(device_ip=device_ip, feature=feature) for device_ip, feature in keys)
+        )
+
+
+class RedisLockBackend(LockBackend):
+    """
+    Lock backend keeping the locks in Redis, shared by all the processes using
+    the same Redis server. All the keys are locked by one Lua script, and the
+    locks expire after DEVICE_LOCK_TTL seconds.
+    """
+
+    KEY_PREFIX = "orca:device_lock:"
+
+    # Returns the index and value of the first locked key, otherwise sets all the keys.
+    _ACQUIRE_SCRIPT = """
+    for i, key in ipairs(KEYS) do
+        local value = redis.call('GET', key)
+        if value then
+            return {i, value}
+        end
+    end
+    for i, key in ipairs(KEYS) do
+        redis.call('SET', key, ARGV[i], 'PX', ARGV[#KEYS + 1])
+    end
+    return nil
+    """
+
+    def __init__(self):
+        import redis
+        self._redis = redis.Redis.from_url(settings.DEVICE_LOCK_REDIS_URL)
+        self._acquire = self._redis.register_script(self._ACQUIRE_SCRIPT)
+
+    def acquire(self, key_states: dict):
+        if not key_states:
+            return None
+        now = datetime.datetime.now(datetime.timezone.utc)
+        keys = list(key_states)
+        conflict = self._acquire(
+            keys=[self._key(key) for key in keys],
+            args=[
+                *(self._dumps(self._lock(key, key_states[key], now)) for key in keys),
+                int(settings.DEVICE_LOCK_TTL * 1000),
+            ],
+        )
+        return self._loads(conflict[1]) if conflict else None
+
+    def release(self, keys):
+        keys = [self._key(key) for key in keys]
+        if keys:
+            self._redis.delete(*keys)
+
+    def get(self, device_ip: str) -> list:
+        values = self._redis.mget([self._key(key) for key in get_lock_keys([device_ip])])
+        return [self._loads(value) for value in values if value]
+
+    def clear(self):
+        keys = list(self._redis.scan_iter(match=self.KEY_PREFIX + "*"))
+        if keys:
+            self._redis.delete(*keys)
+
+    def _key(self, key) -> str:
+        return f"{self.KEY_PREFIX}{key[0]}|{key[1]}"
+
+    @staticmethod
+    def _dumps(lock: dict) -> str:
+        return json.dumps({**lock, "last_updated_time": lock["last_updated_time"].isoformat()})
+
+    @staticmethod
+    def _loads(value) -> dict:
+        lock = json.loads(value)
+        lock["last_updated_time"] = datetime.datetime.fromisoformat(lock["last_updated_time"])
+        return lock
+
+
+LOCK_BACKENDS = {
+    "memory": InMemoryLockBackend,
+    "database": DatabaseLockBackend,
+    "redis": RedisLockBackend,
+}
+
+_backends = {}
+_backends_mutex = threading.Lock()
+
+
+def get_lock_backend() -> LockBackend:
+    """
+    Returns the lock backend configured by DEVICE_LOCK_BACKEND.
+    """
+    name = settings.DEVICE_LOCK_BACKEND
+    with _backends_mutex:
+        if name not in _backends:
+            _backends[name] = LOCK_BACKENDS[name]()
+        return _backends[name]
+
+
+class DeviceLocks:
+    """
+    Locks devices with the configured lock backend.
+
+    A request locks either some features of its devices, or the whole devices.
+    Requests can wait for busy devices, waiting requests are kept in a FIFO
+    queue per lock key and acquire their keys only when they are first in the
+    queue of all of them, so the requests on a device feature run in arrival
+    order. A new request does not take the keys of queued requests, even when
+    they are released. Waiters are woken up when a device is released by this
+    process, and poll the backend every DEVICE_LOCK_POLL_INTERVAL seconds for
+    devices released by other processes.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._queues = {}
+        self._wait_times = {}
+
+    def acquire(self, device_states: dict, timeout: float = 0, features=None):
+        """
+        Locks all the given devices, waiting up to timeout seconds for the busy ones.
+
+        Parameters:
+            device_states (dict): Dictionary with device_ip as key and State as value.
+            timeout (float): Seconds to wait in the queue of the busy devices.
+            features (iterable): The features to lock, None locks the whole devices.
+
+        Returns:
+            dict: None if the devices were locked, otherwise the lock of a busy device.
+        """
+        key_states = {
+            key: device_states[key[0]] for key in get_lock_keys(device_states, features)
+        }
+        backend = get_lock_backend()
+        with self._condition:
+            busy_lock = self._get_queued_lock(key_states)
+            if busy_lock is None:
+                busy_lock = backend.acquire(key_states)
+        if busy_lock is None or timeout <= 0:
+            return busy_lock
+
+        waiter = object()
+        start = time.monotonic()
+        deadline = start + timeout
+        with self._condition:
+            for key in key_states:
+                self._queues.setdefault(key, collections.deque()).append((waiter, start, str(key_states[key])))
+        try:
+            while True:
+                with self._condition:
+                    busy_lock = self._get_queued_lock(key_states, waiter)
+                if busy_lock is None:
+                    busy_lock = backend.acquire(key_states)
+                    if busy_lock is None:
+                        with self._condition:
+                            for device_ip in device_states:
+                                self._wait_times.setdefault(
+                                    device_ip, collections.deque(maxlen=100)
+                                ).append(time.monotonic() - start)
+                        return None
+                if time.monotonic() >= deadline:
+                    return busy_lock
+                with self._condition:
+                    self._condition.wait(
+                        min(deadline - time.monotonic(), settings.DEVICE_LOCK_POLL_INTERVAL)
+                    )
+        finally:
+            with self._condition:
+                for key in key_states:
+                    queue = self._queues[key]
+                    queue.remove(next(i for i in queue if i[0] is waiter))
+                    if not queue:
+                        del self._queues[key]
+                self._condition.notify_all()
+
+    def _get_queued_lock(self, key_states: dict, waiter=None):
+        """
+        Returns the lock of a key with requests queued before the waiter, the
+        lock in the backend or else the lock of the first queued request.
+        Called with the condition held.
+
+        Parameters:
+            key_states (dict): Dictionary with (device_ip, feature) as key and State as value.
+            waiter (object): The waiting request, None for a new request.
+
+        Returns:
+            dict: None if no request is queued before the waiter.
+        """
+        keys = [key for key in key_states if key in self._queues and self._queues[key][0][0] is not waiter]
+        if not keys:
+            return None
+        locks = {
+            (lock["device_ip"], lock["feature"]): lock
+            for device_ip in dict.fromkeys(key[0] for key in keys)
+            for lock in get_lock_backend().get(device_ip)
+        }
+        for key in keys:
+            if key in locks:
+                return locks[key]
+        _, _, state = self._queues[keys[0]][0]
+        return LockBackend._lock(keys[0], state)
+
+    def release(self, device_ips, features=None):
+        """
+        Unlocks the given devices and wakes up the requests waiting for them.
+
+        Parameters:
+            device_ips (iterable): The IP addresses of the devices.
+            features (iterable): The features to unlock, None unlocks the whole devices.
+        """
+        get_lock_backend().release(get_lock_keys(device_ips, features))
+        with self._condition:
+            self._condition.notify_all()
+
+    def get(self, device_ip: str):
+        """
+        Returns the lock of the device with the statistics of its queue.
+
+        Parameters:
+            device_ip (str): The IP address of the device.
+
+        Returns:
+            dict: Dictionary with device_ip, state, last_updated_time, features
+            (state of each locked feature), queue_depth, wait_time (seconds the
+            oldest request waits) and avg_wait_time (seconds the last requests
+            waited), None if the device is available.
+        """
+        locks = get_lock_backend().get(device_ip)
+        if not locks:
+            return None
+        oldest = min(locks, key=lambda i: i["last_updated_time"])
+        with self._condition:
+            waiters = {}
+            for key, queue in self._queues.items():
+                if key[0] == device_ip:
+                    waiters.update((id(waiter), start) for waiter, start, _ in queue)
+            wait_times = self._wait_times.get(device_ip, ())
+            return {
+                "device_ip": device_ip,
+                "state": oldest["state"],
+                "last_updated_time": oldest["last_updated_time"],
+                "features": {i["feature"]: i["state"] for i in locks},
+                "queue_depth": len(waiters),
+                "wait_time": time.monotonic() - min(waiters.values()) if waiters else 0,
+                "avg_wait_time": sum(wait_times) / len(wait_times) if wait_times else 0,
+            }
+
+    def clear(self):
+        """
+        Unlocks all the devices.
+        """
+        get_lock_backend().clear()
+        with self._condition:
+            self._wait_times.clear()
+            self._condition.notify_all()
+
+
+device_locks = DeviceLocks()
@@ -1,14 +1,28 @@
-import json
-
+from django.conf import settings
 from django.http import JsonResponse
 from django.urls import resolve
 from rest_framework import status
-from state_manager.models import ORCABusyState, State
+
+from orca_backend.parsers import parse_body
+from state_manager.locks import device_locks
+from state_manager.models import State
+from state_manager.route_locks import get_route_lock
 
 
 class BlockPutMiddleware:
     """
     Middleware to block PUT operations when device discovery or feature discovery is in progress.
+
+    By default a PUT on a busy device is rejected with 409. A request can instead
+    wait for the device in its FIFO queue, up to the number of seconds given by
+    the X-Orca-Wait header or the wait query parameter, capped at DEVICE_LOCK_MAX_WAIT.
+
+    The devices and features locked by a PUT are described by the RouteLock of
+    its url name in ROUTE_LOCKS. Config PUTs lock only the features of the
+    device they change, so PUTs on disjoint features of a device run
+    concurrently, while discovery, install and the unlisted routes lock the
+    whole device. The PUTs of the routes mapped to None, like the file server
+    ones, do not lock anything.
     """
 
     def __init__(self, get_response):
@@ -16,17 +30,16 @@ class BlockPutMiddleware:
 
     def __call__(self, request):
         # Check if it's a PUT request and if discovery is in progress
-        if request.method == 'PUT':
-            ip_next_state = self._get_device_state(request)
-            for ip, next_state in ip_next_state.items():
-                state_obj = ORCABusyState.objects.filter(device_ip=ip).first()
-                if state_obj:
-                    return JsonResponse(
-                        {"result": State.get_enum_from_str(state_obj.state).value},
-                        status=status.HTTP_409_CONFLICT,
-                    )
-
-                self._update_state(device_ip=ip, state=next_state)
+        route_lock = get_route_lock(resolve(request.path_info).url_name) if request.method == 'PUT' else None
+        if route_lock:
+            ip_next_state = self._get_device_state(request, route_lock)
+            features = route_lock.features
+            busy_lock = device_locks.acquire(ip_next_state, self._get_wait_time(request), features)
+            if busy_lock:
+                return JsonResponse(
+                    {"result": State.get_enum_from_str(busy_lock["state"]).value},
+                    status=status.HTTP_409_CONFLICT,
+                )
             try:
                 response = self.get_response(request)
             except Exception as e:
@@ -35,61 +48,42 @@ class BlockPutMiddleware:
                 )
 
             # Reset state to AVAILABLE after processing
-            for ip in ip_next_state.keys():
-                ORCABusyState.objects.filter(device_ip=ip).delete()
+            device_locks.release(ip_next_state.keys(), features)
         else:
-            # Continue processing the request if not PUT
+            # Continue processing the request if it does not lock any device
             response = self.get_response(request)
 
         return response
 
     @staticmethod
-    def _update_state(device_ip, state):
+    def _get_wait_time(request):
         """
-        Updates the OrcaState object with the given device_ip and state.
+        Returns the seconds the request may wait for busy devices.
 
         Parameters:
-            device_ip (str): The IP address of the device.
-            state (str): The next state of the device.
+            request (HttpRequest): The HTTP request object.
 
         Returns:
-            None
+            float: The wait time, 0 if the request does not wait.
         """
-        ORCABusyState.update_state(
-            device_ip=device_ip,
-            state=str(state),
-        )
+        wait = request.headers.get("X-Orca-Wait", request.GET.get("wait", 0))
+        try:
+            return max(0.0, min(float(wait), settings.DEVICE_LOCK_MAX_WAIT))
+        except ValueError:
+            return 0.0
 
     @staticmethod
-    def _get_device_state(request):
+    def _get_device_state(request, route_lock):
         """
         Returns a dictionary with device_ip as key and next state as value
 
         Parameters:
             request (HttpRequest): The HTTP request object.
+            route_lock (RouteLock): The lock of the route of the request.
 
         Returns:
             dict: A dictionary with device_ip as key and next state as value
         """
-        url_name = resolve(request.path_info).url_name
-        body = json.loads(request.body)
+        body = parse_body(request)
         data = body if isinstance(body, list) else [body]
-        result = {}
-        if url_name == "discover":
-            for i in data:
-                address = i.get("address", "all")  # when address is not provided, discover from configured devices
-                address_list = address if isinstance(address, list) else [address]
-                result.update({i: State.DISCOVERY_IN_PROGRESS for i in address_list})
-        elif url_name == "discover_by_feature":
-            for i in data:
-                device_ip = i.get("mgt_ip", "")
-                result.update({device_ip: State.FEATURE_DISCOVERY_IN_PROGRESS})
-        elif url_name == "install_image":
-            for i in data:
-                device_ips = i.get("device_ips", "")
-                result.update({i: State.INSTALL_IN_PROGRESS for i in device_ips})
-        else:
-            for i in data:
-                device_ip = i.get("mgt_ip", "")
-                result.update({device_ip: State.CONFIG_IN_PROGRESS})
-        return result
+        return route_lock.get_device_state(data)
@@ -5,16 +5,23 @@ from django.db import models
 
 
 class ORCABusyState(models.Model):
-    device_ip = models.CharField(max_length=64, primary_key=True)
+    device_ip = models.CharField(max_length=64)
+    feature = models.CharField(max_length=64, default="")
     state = models.CharField(max_length=64)
     last_updated_time = models.DateTimeField(null=True)
 
     objects = models.Manager()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["device_ip", "feature"], name="unique_device_feature_lock")
+        ]
+
     @staticmethod
-    def update_state(device_ip, state):
+    def update_state(device_ip, state, feature=""):
         _, created = ORCABusyState.objects.update_or_create(
             device_ip=device_ip,
+            feature=feature,
             defaults={
                 "state": str(state),
                 "last_updated_time": datetime.datetime.now(datetime.timezone.utc)
@@ -0,0 +1,120 @@
+from state_manager.models import State
+
+
+def mgt_ip(item: dict) -> list:
+    """
+    Returns the device of a request item with the mgt_ip field.
+    """
+    return [item.get("mgt_ip", "")]
+
+
+def discovery_addresses(item: dict) -> list:
+    """
+    Returns the devices of a discovery request item, "all" when address is not
+    provided, as the devices are discovered from the configured ones.
+    """
+    address = item.get("address", "all")
+    return address if isinstance(address, list) else [address]
+
+
+def device_ips(item: dict) -> list:
+    """
+    Returns the devices of a request item with the device_ips field.
+    """
+    return item.get("device_ips", "") or []
+
+
+class RouteLock:
+    """
+    Describes how the PUTs of a route lock devices.
+
+    Parameters:
+        state (State): The state of the locked devices.
+        get_device_ips (callable): Returns the device IPs of a request item.
+        features (tuple): The features to lock, None locks the whole devices.
+    """
+
+    def __init__(self, state=State.CONFIG_IN_PROGRESS, get_device_ips=mgt_ip, features=None):
+        self.state = state
+        self.get_device_ips = get_device_ips
+        self.features = features
+
+    def get_device_state(self, data: list) -> dict:
+        """
+        Returns a dictionary with device_ip as key and next state as value.
+
+        Parameters:
+            data (list): The request items.
+
+        Returns:
+            dict: A dictionary with device_ip as key and next state as value.
+        """
+        return {
+            device_ip: self.state
+            for item in data if isinstance(item, dict)
+            for device_ip in self.get_device_ips(item) if device_ip
+        }
+
+
+# Lock of the routes not listed in ROUTE_LOCKS.
+DEFAULT_ROUTE_LOCK = RouteLock()
+
+# Lock of the PUTs of each url name, None when the PUTs do not lock any device.
+ROUTE_LOCKS = {
+    "discover": RouteLock(State.DISCOVERY_IN_PROGRESS, discovery_addresses),
+    "discover_by_feature": RouteLock(State.FEATURE_DISCOVERY_IN_PROGRESS),
+    "install_image": RouteLock(State.INSTALL_IN_PROGRESS, device_ips),
+    "switch_image": RouteLock(),
+    "stp_config": RouteLock(features=("stp",)),
+    "stp_delete_disabled_vlans": RouteLock(features=("stp",)),
+    "stp_port": RouteLock(features=("stp",)),
+    "stp_vlan_config": RouteLock(features=("stp",)),
+    "subinterface": RouteLock(features=("interface",)),
+    "interface_pg": RouteLock(features=("interface", "port_group")),
+    "interface_resync": RouteLock(features=("interface",)),
+    "device_interface_list": RouteLock(features=("interface",)),
+    "device_port_chnl": RouteLock(features=("port_chnl",)),
+    "port_channel_ip_remove": RouteLock(features=("port_chnl",)),
+    "port_channel_member_vlan": RouteLock(features=("port_chnl", "vlan")),
+    "port_chnl_vlan_member_remove_all": RouteLock(features=("port_chnl", "vlan")),
+    "port_chnl_mem_ethernet": RouteLock(features=("port_chnl", "interface")),
+    "device_mclag_list": RouteLock(features=("mclag", "port_chnl")),
+    "delete_mclag_members": RouteLock(features=("mclag", "port_chnl")),
+    "config_mclag_fast_convergence": RouteLock(features=("mclag",)),
+    "mclag_gateway_mac": RouteLock(features=("mclag",)),
+    "bgp_af": RouteLock(features=("bgp",)),
+    "bgp_af_network": RouteLock(features=("bgp",)),
+    "bgp_af_aggregate_addr": RouteLock(features=("bgp",)),
+    "bgp_nbr_af": RouteLock(features=("bgp",)),
+    "bgp_nbr": RouteLock(features=("bgp",)),
+    "bgp_nbr_remote_bgp": RouteLock(features=("bgp",)),
+    "bgp_nbr_local_bgp": RouteLock(features=("bgp",)),
+    "bgp_nbr_subinterface": RouteLock(features=("bgp", "interface")),
+    "bgp_global": RouteLock(features=("bgp",)),
+    "group_from_intfc": RouteLock(features=("port_group", "interface")),
+    "port_group_members": RouteLock(features=("port_group", "interface")),
+    "port_groups": RouteLock(features=("port_group", "interface")),
+    "vlan_ip_remove": RouteLock(features=("vlan",)),
+    "vlan_mem_delete": RouteLock(features=("vlan",)),
+    "vlan_config": RouteLock(features=("vlan",)),
+    # file server and authentication do not configure the devices
+    "host_ztp_files": None,
+    "rename_ztp_file": None,
+    "dhcp_credentials": None,
+    "dhcp_config": None,
+    "dhcp_scan": None,
+    "login": None,
+}
+
+
+def get_route_lock(url_name: str):
+    """
+    Returns the lock of the PUTs of the given url name.
+
+    Parameters:
+        url_name (str): The name of the resolved url.
+
+    Returns:
+        RouteLock: The route lock, None if the PUTs do not lock any device.
+    """
+    return ROUTE_LOCKS.get(url_name, DEFAULT_ROUTE_LOCK)
@@ -11,6 +11,7 @@ class TestCommon(APITransactionTestCase):
 
     @classmethod
     def setUpClass(cls):
+        super().setUpClass()
         # creating admin user for testing
         cls.user = User.objects.create(
             **{
@@ -33,4 +34,5 @@ class TestCommon(APITransactionTestCase):
     def tearDownClass(cls):
         cls.user.delete()
         Logs.objects.all().delete()
+        super().tearDownClass()
         return cls
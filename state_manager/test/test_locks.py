@@ -0,0 +1,210 @@
+import threading
+import time
+
+from django.test import override_settings
+
+from state_manager.locks import (
+    InMemoryLockBackend,
+    DatabaseLockBackend,
+    RedisLockBackend,
+    DeviceLocks,
+    get_lock_backend,
+    get_lock_keys,
+)
+from state_manager.models import State
+from state_manager.test.test_common import TestCommon
+
+
+class LockBackendTests:
+    """
+    Tests shared by all the lock backends.
+    """
+
+    def get_backend(self):
+        raise NotImplementedError
+
+    def setUp(self):
+        super().setUp()
+        self.backend = self.get_backend()
+        self.backend.clear()
+        return self
+
+    def tearDown(self):
+        self.backend.clear()
+
+    def test_acquire_and_release(self):
+        assert self.backend.acquire(
+            {("127.0.0.1", "vlan"): State.CONFIG_IN_PROGRESS, ("127.0.0.2", "vlan"): State.CONFIG_IN_PROGRESS}
+        ) is None
+        [lock] = self.backend.get("127.0.0.1")
+        assert lock["device_ip"] == "127.0.0.1"
+        assert lock["feature"] == "vlan"
+        assert lock["state"] == str(State.CONFIG_IN_PROGRESS)
+        assert lock["last_updated_time"]
+        self.backend.release([("127.0.0.1", "vlan"), ("127.0.0.2", "vlan")])
+        assert self.backend.get("127.0.0.1") == []
+        assert self.backend.get("127.0.0.2") == []
+
+    def test_conflict_locks_nothing(self):
+        assert self.backend.acquire({("127.0.0.2", "bgp"): State.DISCOVERY_IN_PROGRESS}) is None
+        busy_lock = self.backend.acquire(
+            {("127.0.0.1", "bgp"): State.CONFIG_IN_PROGRESS, ("127.0.0.2", "bgp"): State.CONFIG_IN_PROGRESS}
+        )
+        assert busy_lock["device_ip"] == "127.0.0.2"
+        assert busy_lock["state"] == str(State.DISCOVERY_IN_PROGRESS)
+        assert self.backend.get("127.0.0.1") == []
+        assert [i["state"] for i in self.backend.get("127.0.0.2")] == [str(State.DISCOVERY_IN_PROGRESS)]
+
+    def test_features_lock_separately(self):
+        assert self.backend.acquire({("127.0.0.1", "bgp"): State.CONFIG_IN_PROGRESS}) is None
+        assert self.backend.acquire({("127.0.0.1", "vlan"): State.CONFIG_IN_PROGRESS}) is None
+        assert self.backend.acquire({("127.0.0.1", "vlan"): State.CONFIG_IN_PROGRESS})["feature"] == "vlan"
+        assert sorted(i["feature"] for i in self.backend.get("127.0.0.1")) == ["bgp", "vlan"]
+
+    def test_clear(self):
+        assert self.backend.acquire({("127.0.0.1", "stp"): State.INSTALL_IN_PROGRESS}) is None
+        self.backend.clear()
+        assert self.backend.get("127.0.0.1") == []
+
+
+class TestInMemoryLockBackend(LockBackendTests, TestCommon):
+
+    def get_backend(self):
+        return InMemoryLockBackend()
+
+    def test_lock_expires(self):
+        assert self.backend.acquire({("127.0.0.1", "vlan"): State.CONFIG_IN_PROGRESS}) is None
+        with override_settings(DEVICE_LOCK_TTL=-1):
+            assert self.backend.get("127.0.0.1") == []
+            assert self.backend.acquire({("127.0.0.1", "vlan"): State.CONFIG_IN_PROGRESS}) is None
+
+
+class TestDatabaseLockBackend(LockBackendTests, TestCommon):
+
+    def get_backend(self):
+        return DatabaseLockBackend()
+
+
+class TestRedisLockBackend(LockBackendTests, TestCommon):
+
+    def get_backend(self):
+        import redis
+        backend = RedisLockBackend()
+        try:
+            backend.get("127.0.0.1")
+        except redis.exceptions.ConnectionError:
+            self.skipTest("Redis server is not reachable.")
+        return backend
+
+
+@override_settings(DEVICE_LOCK_BACKEND="memory")
+class TestDeviceLocks(TestCommon):
+
+    def setUp(self):
+        super().setUp()
+        self.locks = DeviceLocks()
+        self.locks.clear()
+        return self
+
+    def tearDown(self):
+        self.locks.clear()
+
+    def test_no_wait_conflict(self):
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        busy_lock = self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS})
+        assert busy_lock["state"] == str(State.DISCOVERY_IN_PROGRESS)
+
+    def test_wait_timeout(self):
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        start = time.monotonic()
+        busy_lock = self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, timeout=0.2)
+        assert busy_lock["state"] == str(State.DISCOVERY_IN_PROGRESS)
+        assert time.monotonic() - start >= 0.2
+        assert self.locks.get("127.0.0.1")["queue_depth"] == 0
+
+    def test_waiters_run_in_order(self):
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        order = []
+
+        def put(index):
+            assert self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, timeout=10) is None
+            order.append(index)
+            self.locks.release(["127.0.0.1"])
+
+        threads = []
+        for i in range(5):
+            threads.append(threading.Thread(target=put, args=(i,)))
+            threads[-1].start()
+            # wait for the request to be queued before sending the next one
+            while self.locks.get("127.0.0.1")["queue_depth"] <= i:
+                time.sleep(0.01)
+
+        lock = self.locks.get("127.0.0.1")
+        assert lock["queue_depth"] == 5
+        assert lock["wait_time"] > 0
+        self.locks.release(["127.0.0.1"])
+        for thread in threads:
+            thread.join()
+        assert order == list(range(5))
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        assert self.locks.get("127.0.0.1")["avg_wait_time"] > 0
+
+    @override_settings(DEVICE_LOCK_POLL_INTERVAL=0.5)
+    def test_late_arrival_waits_for_queue(self):
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        order = []
+
+        def put(index):
+            assert self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, timeout=10) is None
+            order.append(index)
+            self.locks.release(["127.0.0.1"])
+
+        waiter = threading.Thread(target=put, args=(0,))
+        waiter.start()
+        while self.locks.get("127.0.0.1")["queue_depth"] == 0:
+            time.sleep(0.01)
+        # released by another process, the queued request sees it on its next poll
+        get_lock_backend().release(get_lock_keys(["127.0.0.1"]))
+        busy_lock = self.locks.acquire({"127.0.0.1": State.INSTALL_IN_PROGRESS})
+        assert busy_lock["state"] == str(State.CONFIG_IN_PROGRESS)
+        late = threading.Thread(target=put, args=(1,))
+        late.start()
+        waiter.join()
+        late.join()
+        assert order == [0, 1]
+
+    @override_settings(DEVICE_LOCK_POLL_INTERVAL=0.05)
+    def test_wait_for_release_by_other_process(self):
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        # released directly in the backend, as another process would do
+        timer = threading.Timer(0.2, get_lock_backend().release, args=(get_lock_keys(["127.0.0.1"]),))
+        timer.start()
+        assert self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, timeout=5) is None
+        timer.join()
+
+    def test_feature_locks(self):
+        assert self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, features=["bgp"]) is None
+        # disjoint features of a device are locked concurrently
+        assert self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, features=["vlan", "stp"]) is None
+        busy_lock = self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, features=["bgp", "interface"])
+        assert busy_lock["feature"] == "bgp"
+        assert self.locks.get("127.0.0.1")["features"] == {
+            "bgp": str(State.CONFIG_IN_PROGRESS),
+            "vlan": str(State.CONFIG_IN_PROGRESS),
+            "stp": str(State.CONFIG_IN_PROGRESS),
+        }
+        # the whole device waits for all the features
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is not None
+        self.locks.release(["127.0.0.1"], ["bgp", "vlan", "stp"])
+        assert self.locks.get("127.0.0.1") is None
+        assert self.locks.acquire({"127.0.0.1": State.DISCOVERY_IN_PROGRESS}) is None
+        assert self.locks.get("127.0.0.1")["state"] == str(State.DISCOVERY_IN_PROGRESS)
+        busy_lock = self.locks.acquire({"127.0.0.1": State.CONFIG_IN_PROGRESS}, features=["vlan"])
+        assert busy_lock["state"] == str(State.DISCOVERY_IN_PROGRESS)
+
+
+@override_settings(DEVICE_LOCK_BACKEND="database")
+class TestDatabaseDeviceLocks(TestDeviceLocks):
+    """
+    Runs the device lock tests on the database backend, shared by the threads.
+    """
@@ -0,0 +1,69 @@
+import time
+
+from django.db import connection
+from django.http import JsonResponse
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from state_manager.locks import device_locks
+from state_manager.middleware import BlockPutMiddleware
+from state_manager.models import State
+from state_manager.route_locks import get_route_lock, DEFAULT_ROUTE_LOCK
+from state_manager.test.test_common import TestCommon
+
+
+class TestRouteLocks(TestCommon):
+
+    def tearDown(self):
+        device_locks.clear()
+
+    def test_route_lock_registry(self):
+        assert get_route_lock("host_ztp_files") is None
+        assert get_route_lock("rename_ztp_file") is None
+        assert get_route_lock("dhcp_config") is None
+        assert get_route_lock("login") is None
+        assert get_route_lock("unknown_route") is DEFAULT_ROUTE_LOCK
+        assert get_route_lock("vlan_config").features == ("vlan",)
+        assert get_route_lock("discover").get_device_state([{}]) == {"all": State.DISCOVERY_IN_PROGRESS}
+        assert get_route_lock("install_image").get_device_state(
+            [{"device_ips": ["127.0.0.1", "127.0.0.2"]}]
+        ) == {"127.0.0.1": State.INSTALL_IN_PROGRESS, "127.0.0.2": State.INSTALL_IN_PROGRESS}
+        # items without a device do not lock the empty device key
+        assert DEFAULT_ROUTE_LOCK.get_device_state([{"name": "test"}]) == {}
+
+    @override_settings(DEVICE_LOCK_BACKEND="database")
+    def test_file_server_put_skips_busy_state(self):
+        def file_stub(req):
+            # concurrent file server PUTs do not block each other
+            response = BlockPutMiddleware(lambda r: JsonResponse({}))(
+                self.factory.put(path=reverse("rename_ztp_file"), data={"filename": "b"}, format="json")
+            )
+            assert response.status_code == 200
+            return JsonResponse({})
+
+        middleware = BlockPutMiddleware(file_stub)
+        request = self.factory.put(path=reverse("host_ztp_files"), data={"filename": "a"}, format="json")
+        with CaptureQueriesContext(connection) as ctx:
+            response = middleware(request)
+        assert response.status_code == 200
+        assert not [i for i in ctx.captured_queries if "orcabusystate" in i["sql"].lower()]
+
+    def test_middleware_overhead(self):
+        middleware = BlockPutMiddleware(lambda req: JsonResponse({}))
+        routes = {
+            "host_ztp_files": {"filename": "ztp.json"},
+            "dhcp_config": {"device_ip": "127.0.0.1"},
+            "vlan_config": {"mgt_ip": "127.0.0.1", "name": "Vlan1"},
+            "bgp_nbr": {"mgt_ip": "127.0.0.1"},
+            "discover_by_feature": {"mgt_ip": "127.0.0.1"},
+        }
+        overheads = {}
+        for url_name, data in routes.items():
+            requests = [self.factory.put(path=reverse(url_name), data=data, format="json") for _ in range(200)]
+            start = time.perf_counter()
+            for request in requests:
+                assert middleware(request).status_code == 200
+            overheads[url_name] = (time.perf_counter() - start) / len(requests)
+            print(f"{url_name}: overhead/request={overheads[url_name] * 1000:.3f}ms")
+        assert max(overheads["host_ztp_files"], overheads["dhcp_config"]) < overheads["discover_by_feature"]
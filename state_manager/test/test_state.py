@@ -12,8 +12,9 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 
 from network.scheduler import scheduler
+from state_manager.locks import device_locks
 from state_manager.middleware import BlockPutMiddleware
-from state_manager.models import State, ORCABusyState
+from state_manager.models import State
 from state_manager.test.test_common import TestCommon
 
 
@@ -65,7 +66,7 @@ def feature_discovery_stub(request, client=None):
 class TestState(TestCommon):
 
     def tearDown(self):
-        ORCABusyState.objects.all().delete()
+        device_locks.clear()
 
     @classmethod
     def tearDownClass(cls):
@@ -108,6 +109,25 @@ class TestState(TestCommon):
         response = self.client.get(reverse("orca_state", kwargs={"device_ip": "127.0.0.1"}), )
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
 
+    def test_feature_config_state(self):
+        def bgp_stub(req):
+            # a vlan PUT on the device runs while the bgp PUT is in progress
+            vlan_request = self.factory.put(path=reverse('vlan_config'), data={"mgt_ip": "127.0.0.1"}, format="json")
+            vlan_response = BlockPutMiddleware(lambda r: put_stub(r, self.client))(vlan_request)
+            assert vlan_response.status_code == status.HTTP_200_OK
+            # a bgp PUT on the device is blocked
+            bgp_request = self.factory.put(path=reverse('bgp_nbr'), data={"mgt_ip": "127.0.0.1"}, format="json")
+            bgp_response = BlockPutMiddleware(lambda r: put_stub(r, self.client))(bgp_request)
+            assert bgp_response.status_code == status.HTTP_409_CONFLICT
+            return put_stub(req, self.client)
+
+        request = self.factory.put(path=reverse('bgp_global'), data={"mgt_ip": "127.0.0.1"}, format="json")
+        response = BlockPutMiddleware(bgp_stub)(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(reverse("orca_state", kwargs={"device_ip": "127.0.0.1"}), )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
     @pytest.mark.django_db
     def test_schedule_discovery_state(self):
         response = self.client.get(reverse("device"))
@@ -1,10 +1,9 @@
-from django.forms import model_to_dict
 from rest_framework import status
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
 from log_manager.logger import get_backend_logger
-from state_manager.models import ORCABusyState
+from state_manager.locks import device_locks
 
 _logger = get_backend_logger()
 
@@ -28,9 +27,9 @@ def get_orca_state(request, device_ip):
                 {"result": "Required field device mgt_ip not found."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        data = ORCABusyState.objects.filter(device_ip=device_ip).first()
+        data = device_locks.get(device_ip)
         return (
-            Response(model_to_dict(data), status=status.HTTP_200_OK)
+            Response(data, status=status.HTTP_200_OK)
             if data
             else Response({}, status=status.HTTP_204_NO_CONTENT)
         )